@@ -1,11 +1,15 @@
+import hashlib
 import typing as t
 
 import typing_extensions as te
 
 from .exception import LtiException
 from .grade import Grade
+from .grade_outbox.base import GradeOutbox
+from .launch_data_storage.base import LaunchDataStorage
 from .lineitem import LineItem, TLineItem
 from .service_connector import ServiceConnector, TServiceConnectorResponse
+from .utils import DEFAULT_MAX_WORKERS, map_concurrently
 
 TAssignmentsGradersData = te.TypedDict(
     "TAssignmentsGradersData",
@@ -24,14 +28,51 @@ TAssignmentsGradersData = te.TypedDict(
     total=False,
 )
 
+TPutGradeResult = te.TypedDict(
+    "TPutGradeResult",
+    {
+        "grade": Grade,
+        "lineitem": t.Optional[LineItem],
+        "response": t.Optional[TServiceConnectorResponse],
+        "error": t.Optional[Exception],
+    },
+)
+
 
 class AssignmentsGradesService:
     _service_connector: ServiceConnector
     _service_data: TAssignmentsGradersData
+    _grade_outbox: t.Optional[GradeOutbox] = None
+    _score_fingerprints_data_storage: t.Optional[LaunchDataStorage[t.Any]] = None
+    _score_fingerprints_lifetime: t.Optional[int] = None
 
     def __init__(self, service_connector: ServiceConnector, service_data: TAssignmentsGradersData):
         self._service_connector = service_connector
         self._service_data = service_data
+        self._grade_outbox = None
+        self._score_fingerprints_data_storage = None
+        self._score_fingerprints_lifetime = None
+
+    def set_grade_outbox(self, grade_outbox: GradeOutbox) -> "AssignmentsGradesService":
+        self._grade_outbox = grade_outbox
+        return self
+
+    def set_score_deduplication(
+        self, data_storage: LaunchDataStorage[t.Any], cache_lifetime: int = 86400 * 30
+    ) -> "AssignmentsGradesService":
+        """
+        Skip sending of the grades which are the same as the last grades sent for the same line item and user
+        (timestamp is ignored). Fingerprints of the sent grades are saved in the data storage.
+        put_grade returns response with empty body and headers for the skipped grades.
+
+        :param data_storage: LaunchDataStorage instance (i.e. cache data storage)
+        :param cache_lifetime: how long (in seconds) fingerprints are kept
+        :return: AssignmentsGradesService
+        """
+        # the last sent score is looked up by any launch (or background job) of the same line item and user
+        self._score_fingerprints_data_storage = data_storage.copy_without_session_id()
+        self._score_fingerprints_lifetime = cache_lifetime
+        return self
 
     def can_read_lineitem(self) -> bool:
         return (
@@ -60,6 +101,127 @@ class AssignmentsGradesService:
         if not self.can_put_grade():
             raise LtiException("Can't put grade: Missing required scope")
 
+        score_url = self._get_score_url(lineitem)
+        return self._post_score(score_url, grade)
+
+    def put_grades(
+        self,
+        grades: t.Iterable[t.Tuple[Grade, t.Optional[LineItem]]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> t.List[TPutGradeResult]:
+        """
+        Send many grades to the LTI platform concurrently.
+        Every distinct line item is resolved only once and all requests share the same access token
+        and HTTP session. Failed items don't stop the others from being sent.
+
+        :param grades: iterable with (Grade instance, LineItem instance or None) pairs
+        :param max_workers: max number of concurrent HTTP requests
+        :return: list of dicts with grade, lineitem, response and error (in the input order)
+        """
+
+        if not self.can_put_grade():
+            raise LtiException("Can't put grade: Missing required scope")
+
+        grades_lst = list(grades)
+        lineitems: t.Dict[t.Hashable, t.Optional[LineItem]] = {}
+        for _, lineitem in grades_lst:
+            lineitems.setdefault(self._get_lineitem_key(lineitem), lineitem)
+
+        # line items without ID are found by tag (or created) using one scan of the line items list
+        unresolved_keys = [
+            key
+            for key, lineitem in lineitems.items()
+            if lineitem and not lineitem.get_id()
+        ]
+        resolved: t.Dict[t.Hashable, t.Any] = {}
+        if unresolved_keys:
+            try:
+                resolved_lineitems = self._find_or_create_lineitems(
+                    [t.cast(LineItem, lineitems[key]) for key in unresolved_keys],
+                    "tag",
+                    max_workers,
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                resolved_lineitems = [e] * len(unresolved_keys)
+            resolved = dict(zip(unresolved_keys, resolved_lineitems))
+
+        score_urls: t.Dict[t.Hashable, t.Any] = {}
+        for key, lineitem in lineitems.items():
+            lineitem = resolved.get(key, lineitem)
+            if isinstance(lineitem, Exception):
+                score_urls[key] = lineitem
+                continue
+            try:
+                score_urls[key] = self._get_score_url(lineitem)
+            except Exception as e:  # pylint: disable=broad-except
+                score_urls[key] = e
+
+        def send(
+            item: t.Tuple[Grade, t.Optional[LineItem]],
+        ) -> TServiceConnectorResponse:
+            score_url = score_urls[self._get_lineitem_key(item[1])]
+            if isinstance(score_url, Exception):
+                raise score_url
+            return self._post_score(score_url, item[0])
+
+        responses = map_concurrently(
+            send, grades_lst, max_workers=max_workers, return_exceptions=True
+        )
+        return [
+            {
+                "grade": grade,
+                "lineitem": lineitem,
+                "response": None if isinstance(response, Exception) else response,
+                "error": response if isinstance(response, Exception) else None,
+            }
+            for (grade, lineitem), response in zip(grades_lst, responses)
+        ]
+
+    def enqueue_grade(
+        self, grade: Grade, lineitem: t.Optional[LineItem] = None
+    ) -> None:
+        """
+        Put grade into the outbox instead of sending it to the LTI platform right now.
+        The outbox is drained by the GradeOutboxDrainer. Pending grades for the same line item and user
+        are coalesced, so only the latest one will be sent.
+        Pass line item with ID (or nothing for the default line item) to avoid any HTTP requests here.
+
+        :param grade: Grade instance
+        :param lineitem: LineItem instance
+        :return: None
+        """
+
+        if not self._grade_outbox:
+            raise LtiException("Grade outbox is not set")
+        if not self.can_put_grade():
+            raise LtiException("Can't put grade: Missing required scope")
+
+        registration = self._service_connector.get_registration()
+        iss = registration.get_issuer()
+        client_id = registration.get_client_id()
+        assert (
+            iss is not None and client_id is not None
+        ), "Registration should be set at this point"
+
+        self._grade_outbox.enqueue(
+            iss,
+            client_id,
+            self._get_score_url(lineitem),
+            self._service_data["scope"],
+            grade.get_user_id(),
+            grade.get_value(),
+        )
+
+    def _get_lineitem_key(self, lineitem: t.Optional[LineItem]) -> t.Hashable:
+        if not lineitem:
+            return None
+        if lineitem.get_id():
+            return "id", lineitem.get_id()
+        if lineitem.get_tag():
+            return "tag", lineitem.get_tag()
+        return "object", id(lineitem)
+
+    def _get_score_url(self, lineitem: t.Optional[LineItem]) -> str:
         if lineitem:
             if not lineitem.get_id():
                 lineitem = self.find_or_create_lineitem(lineitem)
@@ -70,8 +232,22 @@ class AssignmentsGradesService:
             raise LtiException("Can't find lineitem to put grade")
 
         assert score_url is not None
-        score_url = self._add_url_path_ending(score_url, "scores")
-        return self._service_connector.make_service_request(
+        return self._add_url_path_ending(score_url, "scores")
+
+    def _post_score(self, score_url: str, grade: Grade) -> TServiceConnectorResponse:
+        data_storage = self._score_fingerprints_data_storage
+        fingerprint_key = fingerprint = None
+        if data_storage:
+            fingerprint_key_str = score_url + "|" + (grade.get_user_id() or "")
+            fingerprint_key = (
+                "score-fingerprint-"
+                + hashlib.md5(fingerprint_key_str.encode("utf-8")).hexdigest()
+            )
+            fingerprint = grade.get_fingerprint()
+            if data_storage.get_value(fingerprint_key) == fingerprint:
+                return {"headers": {}, "body": None, "next_page_url": None}
+
+        response = self._service_connector.make_service_request(
             self._service_data["scope"],
             score_url,
             method="POST",
@@ -79,6 +255,12 @@ class AssignmentsGradesService:
             content_type="application/vnd.ims.lis.v1.score+json",
         )
 
+        if data_storage and fingerprint_key:
+            data_storage.set_value(
+                fingerprint_key, fingerprint, self._score_fingerprints_lifetime
+            )
+        return response
+
     def get_lineitem(self, lineitem_url: t.Optional[str] = None):
         """
         Retrieves an individual lineitem. By default, retrieves the lineitem associated with the LTI message.
@@ -119,6 +301,7 @@ class AssignmentsGradesService:
             content_type="application/vnd.ims.lis.v2.lineitem+json",
             accept="application/vnd.ims.lis.v2.lineitem+json",
         )
+        self._service_connector.invalidate_cached_responses()
         return LineItem(t.cast(TLineItem, lineitem_response["body"]))
 
     def delete_lineitem(self, lineitem_url: t.Optional[str]):
@@ -138,6 +321,7 @@ class AssignmentsGradesService:
             content_type="application/vnd.ims.lis.v2.lineitem+json",
             accept="application/vnd.ims.lis.v2.lineitem+json",
         )
+        self._service_connector.invalidate_cached_responses()
 
     def get_lineitems_page(self, lineitems_url: t.Optional[str] = None) -> t.Tuple[list, t.Optional[str]]:
         """
@@ -267,6 +451,97 @@ class AssignmentsGradesService:
         if not self.can_create_lineitem():
             raise LtiException("Can't create lineitem: Missing required scope")
 
+        created_lineitem = self._create_lineitem(new_lineitem)
+        self._service_connector.invalidate_cached_responses()
+        return created_lineitem
+
+    def find_or_create_lineitems(
+        self,
+        new_lineitems: t.Iterable[LineItem],
+        find_by: str = "tag",
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> t.List[LineItem]:
+        """
+        Bulk version of find_or_create_lineitem. Existing line items are found using one scan of the line items
+        list, missing ones are created concurrently (line items with the same search value are created once).
+
+        :param new_lineitems: iterable with LineItem instances
+        :param find_by: str ("tag"/"id"/"resource_link_id"/"resource_id")
+        :param max_workers: max number of concurrent HTTP requests
+        :return: list of LineItem instances (in the input order)
+        """
+        results = self._find_or_create_lineitems(new_lineitems, find_by, max_workers)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def _find_or_create_lineitems(
+        self,
+        new_lineitems: t.Iterable[LineItem],
+        find_by: str,
+        max_workers: int,
+    ) -> t.List[t.Any]:
+        # returns LineItem instance or exception for every passed line item
+        find_props = {
+            "tag": ("tag", LineItem.get_tag, "Tag"),
+            "id": ("id", LineItem.get_id, "ID"),
+            "resource_link_id": (
+                "resourceLinkId",
+                LineItem.get_resource_link_id,
+                "Resource Link ID",
+            ),
+            "resource_id": ("resourceId", LineItem.get_resource_id, "Resource ID"),
+        }
+        if find_by not in find_props:
+            raise LtiException('Invalid "find_by" value: ' + str(find_by))
+        prop_name, get_prop_value, prop_title = find_props[find_by]
+
+        new_lineitems_lst = list(new_lineitems)
+        if not new_lineitems_lst:
+            return []
+        prop_values = [get_prop_value(lineitem) for lineitem in new_lineitems_lst]
+
+        wanted = set(prop_values)
+        results: t.Dict[t.Any, t.Any] = {}
+        for lineitem_data in self.get_lineitems():
+            prop_value = lineitem_data.get(prop_name)
+            if prop_value and prop_value in wanted and prop_value not in results:
+                results[prop_value] = LineItem(lineitem_data)
+
+        missing: t.Dict[t.Any, LineItem] = {}
+        for lineitem, prop_value in zip(new_lineitems_lst, prop_values):
+            if prop_value and prop_value not in results:
+                missing.setdefault(prop_value, lineitem)
+
+        if missing:
+            missing_values = list(missing)
+            if self.can_create_lineitem():
+                created = map_concurrently(
+                    lambda val: self._create_lineitem(missing[val]),
+                    missing_values,
+                    max_workers=max_workers,
+                    return_exceptions=True,
+                )
+                self._service_connector.invalidate_cached_responses()
+            else:
+                # every slot gets its own exception (traceback is attached when it is raised)
+                created = [
+                    LtiException("Can't create lineitem: Missing required scope")
+                    for _ in missing_values
+                ]
+            results.update(zip(missing_values, created))
+
+        return [
+            (
+                results[prop_value]
+                if prop_value
+                else LtiException(prop_title + " value is not specified")
+            )
+            for prop_value in prop_values
+        ]
+
+    def _create_lineitem(self, new_lineitem: LineItem) -> LineItem:
         created_lineitem = self._service_connector.make_service_request(
             self._service_data["scope"],
             self._service_data["lineitems"],
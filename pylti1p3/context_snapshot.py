@@ -0,0 +1,74 @@
+import typing as t
+
+import typing_extensions as te
+
+from .course_groups import CourseGroupsIndex, TGroup, TSet
+from .lineitem import LineItem, TLineItem
+from .names_roles import TMember
+from .roster import Roster
+
+
+class ContextService:
+    NRPS: te.Final = "nrps"
+    CGS: te.Final = "cgs"
+    AGS: te.Final = "ags"
+
+
+TContextSnapshotData = te.TypedDict(
+    "TContextSnapshotData",
+    {
+        "members": t.Optional[t.List[TMember]],
+        "sets": t.Optional[t.List[TSet]],
+        "groups": t.Optional[t.List[TGroup]],
+        "lineitems": t.Optional[t.List[TLineItem]],
+    },
+    total=False,
+)
+
+
+class ContextSnapshot:
+    """
+    Data of the course context fetched from the several LTI services at once.
+    Data of the services which were not requested is None.
+    """
+
+    _data: TContextSnapshotData
+
+    def __init__(self, data: t.Optional[TContextSnapshotData] = None):
+        self._data = data if data else {}
+
+    def get_data(self) -> TContextSnapshotData:
+        """
+        Plain (JSON-serializable) snapshot data. Snapshot could be restored using ContextSnapshot(data).
+        """
+        return self._data
+
+    def has_members(self) -> bool:
+        return self._data.get("members") is not None
+
+    def get_members(self) -> t.List[TMember]:
+        return self._data.get("members") or []
+
+    def get_roster(self) -> Roster:
+        return Roster(self.get_members())
+
+    def has_groups(self) -> bool:
+        return self._data.get("groups") is not None
+
+    def get_sets(self) -> t.List[TSet]:
+        return self._data.get("sets") or []
+
+    def get_groups(self) -> t.List[TGroup]:
+        return self._data.get("groups") or []
+
+    def get_groups_index(self) -> CourseGroupsIndex:
+        index = CourseGroupsIndex(self.get_sets(), self.get_groups())
+        if self.has_members():
+            index.add_members(self.get_members())
+        return index
+
+    def has_lineitems(self) -> bool:
+        return self._data.get("lineitems") is not None
+
+    def get_lineitems(self) -> t.List[LineItem]:
+        return [LineItem(ln) for ln in self._data.get("lineitems") or []]
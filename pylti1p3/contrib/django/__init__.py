@@ -2,4 +2,6 @@
 from .message_launch import DjangoMessageLaunch
 from .oidc_login import DjangoOIDCLogin
 from .launch_data_storage.cache import DjangoCacheDataStorage
-from .lti1p3_tool_config import DjangoDbToolConf
+from .lti1p3_tool_config import DjangoDbToolConf, DjangoCachedDbToolConf
+from .lti1p3_grade_outbox import DjangoDbGradeOutbox
+from .jwks import DjangoJwksPublisher
@@ -0,0 +1,18 @@
+from django.http import HttpResponse  # type: ignore
+
+from pylti1p3.jwks import JwksPublisher
+
+
+class DjangoJwksPublisher(JwksPublisher):
+    def do_response(self, request, iss=None, client_id=None):
+        res = self.get_response(request.headers.get("If-None-Match"), iss, client_id)
+        response = HttpResponse(res["body"], status=res["status"])
+        for header_name, header_value in res["headers"].items():
+            response[header_name] = header_value
+        return response
+
+    def as_view(self):
+        def jwks_view(request):
+            return self.do_response(request)
+
+        return jwks_view
@@ -0,0 +1,106 @@
+import datetime
+import time
+import uuid
+
+from django.db import connections, transaction  # type: ignore
+
+from pylti1p3.grade_outbox.base import GradeOutbox
+from pylti1p3.json_codec import json_dumps, json_loads
+
+default_app_config = (
+    "pylti1p3.contrib.django.lti1p3_grade_outbox.apps.PyLTI1p3GradeOutboxConfig"
+)
+
+
+class DjangoDbGradeOutbox(GradeOutbox):
+    _items_cls = None
+
+    def __init__(self):
+        # pylint: disable=import-outside-toplevel
+        from .models import LtiGradeOutboxItem
+
+        self._items_cls = LtiGradeOutboxItem
+
+    @staticmethod
+    def _to_datetime(timestamp):
+        if timestamp is None:
+            return None
+        return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+
+    def enqueue(self, iss, client_id, score_url, scope, user_id, payload):
+        # pylint: disable=no-member
+        self._items_cls.objects.update_or_create(
+            key=self.get_item_key(iss, client_id, score_url, user_id),
+            defaults={
+                "token": uuid.uuid4().hex,
+                "issuer": iss,
+                "client_id": client_id,
+                "score_url": score_url,
+                "scope": json_dumps(list(scope)),
+                "user_id": user_id,
+                "payload": payload,
+                "attempts": 0,
+                "next_attempt_at": self._to_datetime(time.time()),
+                "last_error": None,
+            },
+        )
+
+    def get_due_items(self, limit, now, lease_time=None):
+        # pylint: disable=no-member
+        qs = self._items_cls.objects.filter(
+            next_attempt_at__lte=self._to_datetime(now)
+        ).order_by("next_attempt_at")
+        if lease_time is None:
+            items = list(qs[:limit])
+        else:
+            lease_until = self._to_datetime(now + lease_time)
+            locked_qs = qs.select_for_update(skip_locked=True)
+            if connections[locked_qs.db].features.has_select_for_update_skip_locked:
+                # rows locked by the other drainers are skipped, the claimed ones are updated at once
+                with transaction.atomic(using=locked_qs.db):
+                    items = list(locked_qs[:limit])
+                    if items:
+                        self._items_cls.objects.filter(
+                            pk__in=[item.pk for item in items]
+                        ).update(next_attempt_at=lease_until)
+            else:
+                # compare-and-set: the item is claimed only by the drainer which has updated it first
+                items = [
+                    item
+                    for item in qs[:limit]
+                    if self._items_cls.objects.filter(
+                        pk=item.pk,
+                        token=item.token,
+                        next_attempt_at=item.next_attempt_at,
+                    ).update(next_attempt_at=lease_until)
+                ]
+            for item in items:
+                item.next_attempt_at = lease_until
+        return [
+            {
+                "key": item.key,
+                "token": item.token,
+                "iss": item.issuer,
+                "client_id": item.client_id,
+                "score_url": item.score_url,
+                "scope": json_loads(item.scope),
+                "user_id": item.user_id,
+                "payload": item.payload,
+                "attempts": item.attempts,
+                "next_attempt_at": item.next_attempt_at.timestamp(),
+                "last_error": item.last_error,
+            }
+            for item in items
+        ]
+
+    def mark_sent(self, item):
+        # pylint: disable=no-member
+        self._items_cls.objects.filter(key=item["key"], token=item["token"]).delete()
+
+    def mark_failed(self, item, error, next_attempt_at):
+        # pylint: disable=no-member
+        self._items_cls.objects.filter(key=item["key"], token=item["token"]).update(
+            attempts=item["attempts"] + 1,
+            next_attempt_at=self._to_datetime(next_attempt_at),
+            last_error=error,
+        )
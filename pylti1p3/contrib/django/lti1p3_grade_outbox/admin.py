@@ -0,0 +1,21 @@
+# mypy: ignore-errors
+from django.contrib import admin
+
+from .models import LtiGradeOutboxItem
+
+
+class LtiGradeOutboxItemAdmin(admin.ModelAdmin):
+    """Admin for LTI Grade Outbox Item"""
+
+    search_fields = ("issuer", "client_id", "score_url", "user_id")
+    list_display = (
+        "id",
+        "issuer",
+        "client_id",
+        "user_id",
+        "attempts",
+        "next_attempt_at",
+    )
+
+
+admin.site.register(LtiGradeOutboxItem, LtiGradeOutboxItemAdmin)
@@ -0,0 +1,6 @@
+from django.apps import AppConfig  # type: ignore
+
+
+class PyLTI1p3GradeOutboxConfig(AppConfig):
+    name = "pylti1p3.contrib.django.lti1p3_grade_outbox"
+    verbose_name = "PyLTI 1.3 Grade Outbox"
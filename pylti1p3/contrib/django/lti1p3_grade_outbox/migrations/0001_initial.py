@@ -0,0 +1,63 @@
+# mypy: ignore-errors
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="LtiGradeOutboxItem",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        help_text="Hash of (issuer, client_id, score url, user id)",
+                        max_length=32,
+                        unique=True,
+                    ),
+                ),
+                ("token", models.CharField(max_length=32)),
+                ("issuer", models.CharField(max_length=255)),
+                ("client_id", models.CharField(max_length=255)),
+                ("score_url", models.CharField(max_length=1024)),
+                (
+                    "scope",
+                    models.TextField(help_text="JSON list with the AGS scopes"),
+                ),
+                (
+                    "user_id",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("payload", models.TextField(help_text="Score JSON")),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(
+                        blank=True,
+                        db_index=True,
+                        help_text="Empty value means that score will not be sent anymore",
+                        null=True,
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "lti 1.3 grade outbox item",
+                "verbose_name_plural": "lti 1.3 grade outbox items",
+                "db_table": "lti1p3_grade_outbox",
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# mypy: ignore-errors
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class LtiGradeOutboxItem(models.Model):
+    key = models.CharField(
+        max_length=32,
+        unique=True,
+        help_text=_("Hash of (issuer, client_id, score url, user id)"),
+    )
+    token = models.CharField(max_length=32)
+    issuer = models.CharField(max_length=255)
+    client_id = models.CharField(max_length=255)
+    score_url = models.CharField(max_length=1024)
+    scope = models.TextField(help_text=_("JSON list with the AGS scopes"))
+    user_id = models.CharField(max_length=255, null=True, blank=True)
+    payload = models.TextField(help_text=_("Score JSON"))
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text=_("Empty value means that score will not be sent anymore"),
+    )
+    last_error = models.TextField(null=True, blank=True)
+
+    def __str__(self):
+        # pylint: disable=no-member
+        return f"<LtiGradeOutboxItem id={self.id}, user_id={self.user_id}>"
+
+    class Meta:
+        db_table = "lti1p3_grade_outbox"
+        verbose_name = "lti 1.3 grade outbox item"
+        verbose_name_plural = "lti 1.3 grade outbox items"
@@ -1,11 +1,13 @@
-import json
+import threading
+import time
+import uuid
 
 from pylti1p3.deployment import Deployment
 from pylti1p3.exception import LtiException
+from pylti1p3.json_codec import json_loads
 from pylti1p3.registration import Registration
 from pylti1p3.tool_config.abstract import ToolConfAbstract
 
-
 default_app_config = (
     "pylti1p3.contrib.django.lti1p3_tool_config.apps.PyLTI1p3ToolConfig"
 )
@@ -50,6 +52,7 @@ class DjangoDbToolConf(ToolConfAbstract):
                 pass
 
         if lti_tool is None:
+            self.remember_registration_miss(iss, client_id)
             raise LtiException(
                 f"iss {iss} [client_id={client_id}] not found in settings"
             )
@@ -73,9 +76,17 @@ class DjangoDbToolConf(ToolConfAbstract):
         pass
 
     def find_registration_by_params(self, iss, client_id, *args, **kwargs):
+        return self.get_cached_registration(
+            iss, client_id, lambda: self._get_registration(iss, client_id)
+        )
+
+    def _get_registration(self, iss, client_id):
         lti_tool = self.get_lti_tool(iss, client_id)
+        key_set = json_loads(lti_tool.key_set) if lti_tool.key_set else None
+        return self._make_registration(lti_tool, key_set)
+
+    def _make_registration(self, lti_tool, key_set):
         auth_audience = lti_tool.auth_audience if lti_tool.auth_audience else None
-        key_set = json.loads(lti_tool.key_set) if lti_tool.key_set else None
         key_set_url = lti_tool.key_set_url if lti_tool.key_set_url else None
         tool_public_key = (
             lti_tool.tool_key.public_key if lti_tool.tool_key.public_key else None
@@ -105,7 +116,7 @@ class DjangoDbToolConf(ToolConfAbstract):
     def find_deployment_by_params(self, iss, deployment_id, client_id, *args, **kwargs):
         lti_tool = self.get_lti_tool(iss, client_id)
         deployment_ids = (
-            json.loads(lti_tool.deployment_ids) if lti_tool.deployment_ids else []
+            json_loads(lti_tool.deployment_ids) if lti_tool.deployment_ids else []
         )
         if deployment_id not in deployment_ids:
             return None
@@ -132,8 +143,154 @@ class DjangoDbToolConf(ToolConfAbstract):
         for key in qs:
             if key.public_key and key.public_key not in public_key_lst:
                 if key.public_jwk:
-                    jwks.append(json.loads(key.public_jwk))
+                    jwks.append(json_loads(key.public_jwk))
                 else:
                     jwks.append(Registration.get_jwk(key.public_key))
                 public_key_lst.append(key.public_key)
         return {"keys": jwks}
+
+
+class _CachedLtiTool:
+    __slots__ = ("lti_tool", "key_set", "deployment_ids", "registration")
+
+    def __init__(self, lti_tool):
+        self.lti_tool = lti_tool
+        self.key_set = json_loads(lti_tool.key_set) if lti_tool.key_set else None
+        self.deployment_ids = frozenset(
+            json_loads(lti_tool.deployment_ids) if lti_tool.deployment_ids else []
+        )
+        self.registration = None
+
+
+class _LtiToolsSnapshot:
+    __slots__ = ("version", "tools", "default_tools")
+
+    def __init__(self, version, lti_tools):
+        self.version = version
+        self.tools = {}
+        self.default_tools = {}
+        for lti_tool in lti_tools:
+            cached_tool = _CachedLtiTool(lti_tool)
+            self.tools[(lti_tool.issuer, lti_tool.client_id)] = cached_tool
+            self.default_tools.setdefault(lti_tool.issuer, cached_tool)
+
+
+class DjangoCachedDbToolConf(DjangoDbToolConf):
+    """
+    DjangoDbToolConf which keeps all active LTI tools (with keys and parsed JSON fields) in the memory of the process.
+    The snapshot is reloaded after the LtiTool / LtiToolKey objects are saved or deleted (post_save / post_delete
+    signals). Other processes find out about the changes from the version key stored in the Django cache, it is
+    rechecked not more often than once per version_check_interval seconds.
+    """
+
+    cache_alias = "default"
+    version_cache_key = "lti1p3-tool-conf-version"
+    version_check_interval: float = 1
+    _snapshot = None
+    _snapshot_lock = threading.Lock()
+
+    def __init__(self):
+        super().__init__()
+        self._instance_snapshot = None
+        self._version_checked_at = None
+
+    @classmethod
+    def invalidate_cache(cls):
+        # pylint: disable=import-outside-toplevel
+        from django.core.cache import caches  # type: ignore
+
+        caches[cls.cache_alias].set(cls.version_cache_key, uuid.uuid4().hex, None)
+        with cls._snapshot_lock:
+            DjangoCachedDbToolConf._snapshot = None
+
+    @classmethod
+    def _get_version(cls):
+        # pylint: disable=import-outside-toplevel
+        from django.core.cache import caches  # type: ignore
+
+        cache = caches[cls.cache_alias]
+        version = cache.get(cls.version_cache_key)
+        if version is None:
+            # key was evicted from the cache (or it is the first run)
+            cache.add(cls.version_cache_key, uuid.uuid4().hex, None)
+            version = cache.get(cls.version_cache_key)
+        return version
+
+    def _get_snapshot(self):
+        # tool conf could be used longer than one request, so the version is rechecked
+        # not more often than once per version_check_interval seconds
+        now = time.monotonic()
+        instance_snapshot = self._instance_snapshot
+        if (
+            instance_snapshot is not None
+            and now - self._version_checked_at < self.version_check_interval
+        ):
+            return instance_snapshot
+
+        version = self._get_version()
+        self._version_checked_at = now
+        if instance_snapshot is not None and instance_snapshot.version == version:
+            return instance_snapshot
+
+        snapshot = DjangoCachedDbToolConf._snapshot
+        if snapshot is None or snapshot.version != version:
+            with self._snapshot_lock:
+                snapshot = DjangoCachedDbToolConf._snapshot
+                if snapshot is None or snapshot.version != version:
+                    # pylint: disable=no-member
+                    lti_tools = (
+                        self._tools_cls.objects.filter(is_active=True)
+                        .select_related("tool_key")
+                        .order_by("use_by_default", "pk")
+                    )
+                    snapshot = _LtiToolsSnapshot(version, lti_tools)
+                    DjangoCachedDbToolConf._snapshot = snapshot
+        if instance_snapshot is not None:
+            # unknown clients were remembered for the previous snapshot
+            self.invalidate_registrations_cache()
+        self._instance_snapshot = snapshot
+        return snapshot
+
+    def get_known_issuers(self):
+        return self._get_snapshot().default_tools
+
+    def get_jwks_version(self):
+        # tool conf could be used longer than one request (e.g. by JWKS publisher),
+        # so current version is always taken from the cache
+        return self._get_version()
+
+    def _get_cached_lti_tool(self, iss, client_id):
+        snapshot = self._get_snapshot()
+        cached_tool = (
+            snapshot.default_tools.get(iss)
+            if client_id is None
+            else snapshot.tools.get((iss, client_id))
+        )
+        if cached_tool is None:
+            self.remember_registration_miss(iss, client_id)
+            raise LtiException(
+                f"iss {iss} [client_id={client_id}] not found in settings"
+            )
+        return cached_tool
+
+    def get_lti_tool(self, iss, client_id):
+        return self._get_cached_lti_tool(iss, client_id).lti_tool
+
+    def find_registration_by_params(self, iss, client_id, *args, **kwargs):
+        # registration is kept by the snapshot, so it is dropped together with the snapshot
+        return self._get_registration(iss, client_id)
+
+    def _get_registration(self, iss, client_id):
+        cached_tool = self._get_cached_lti_tool(iss, client_id)
+        if cached_tool.registration is None:
+            cached_tool.registration = self._make_registration(
+                cached_tool.lti_tool, cached_tool.key_set
+            )
+        return cached_tool.registration
+
+    def find_deployment_by_params(self, iss, deployment_id, client_id, *args, **kwargs):
+        cached_tool = self._get_cached_lti_tool(iss, client_id)
+        if deployment_id not in cached_tool.deployment_ids:
+            return None
+        d = Deployment()
+        return d.set_deployment_id(deployment_id)
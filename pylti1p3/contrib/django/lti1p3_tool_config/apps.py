@@ -4,3 +4,7 @@ from django.apps import AppConfig  # type: ignore
 class PyLTI1p3ToolConfig(AppConfig):
     name = "pylti1p3.contrib.django.lti1p3_tool_config"
     verbose_name = "PyLTI 1.3 Tool Config"
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel,unused-import
+        from . import signals  # noqa: F401
@@ -1,10 +1,10 @@
 # mypy: ignore-errors
-import json
 
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from pylti1p3.json_codec import json_dumps, json_loads
 from pylti1p3.registration import Registration
 
 
@@ -33,7 +33,7 @@ class LtiToolKey(models.Model):
     ):  # pylint: disable=arguments-differ,signature-differs
         if self.public_key:
             public_jwk_dict = Registration.get_jwk(self.public_key)
-            self.public_jwk = json.dumps(public_jwk_dict)
+            self.public_jwk = json_dumps(public_jwk_dict)
         else:
             self.public_key = None
             self.public_jwk = None
@@ -137,7 +137,7 @@ class LtiTool(models.Model):
         if self.key_set:
             key_set_valid = False
             try:
-                key_set_data = json.loads(self.key_set)
+                key_set_data = json_loads(self.key_set)
                 if isinstance(key_set_data, dict):
                     key_set_valid = True
             except ValueError:
@@ -147,7 +147,7 @@ class LtiTool(models.Model):
 
         deployment_ids_valid = False
         try:
-            deployment_ids_data = json.loads(self.deployment_ids)
+            deployment_ids_data = json_loads(self.deployment_ids)
             if isinstance(deployment_ids_data, list):
                 deployment_ids_valid = True
         except ValueError:
@@ -169,8 +169,8 @@ class LtiTool(models.Model):
             "auth_token_url": self.auth_token_url,
             "auth_audience": self.auth_audience,
             "key_set_url": self.key_set_url,
-            "key_set": json.loads(self.key_set) if self.key_set else None,
-            "deployment_ids": json.loads(self.deployment_ids)
+            "key_set": json_loads(self.key_set) if self.key_set else None,
+            "deployment_ids": json_loads(self.deployment_ids)
             if self.deployment_ids
             else [],
         }
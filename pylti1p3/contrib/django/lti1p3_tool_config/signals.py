@@ -0,0 +1,16 @@
+from django.db import transaction  # type: ignore
+from django.db.models.signals import post_delete, post_save  # type: ignore
+from django.dispatch import receiver  # type: ignore
+
+from . import DjangoCachedDbToolConf
+from .models import LtiTool, LtiToolKey
+
+
+@receiver([post_save, post_delete], sender=LtiTool)
+@receiver([post_save, post_delete], sender=LtiToolKey)
+def invalidate_tool_conf_cache(sender, **kwargs):
+    # pylint: disable=unused-argument
+    # other processes shouldn't reload the tools before the changes are committed
+    transaction.on_commit(
+        DjangoCachedDbToolConf.invalidate_cache, using=kwargs.get("using")
+    )
@@ -0,0 +1,19 @@
+from flask import make_response, request as flask_request  # type: ignore
+
+from pylti1p3.jwks import JwksPublisher
+
+
+class FlaskJwksPublisher(JwksPublisher):
+    def do_response(self, iss=None, client_id=None):
+        res = self.get_response(
+            flask_request.headers.get("If-None-Match"), iss, client_id
+        )
+        response = make_response(res["body"], res["status"])
+        response.headers.update(res["headers"])
+        return response
+
+    def as_view(self):
+        def jwks_view():
+            return self.do_response()
+
+        return jwks_view
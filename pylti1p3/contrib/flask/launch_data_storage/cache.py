@@ -1,3 +1,5 @@
+import typing as t
+
 from pylti1p3.launch_data_storage.cache import CacheDataStorage
 
 
@@ -7,3 +9,12 @@ class FlaskCacheDataStorage(CacheDataStorage):
     def __init__(self, cache, **kwargs):
         self._cache = cache
         super().__init__(cache, **kwargs)
+
+    # Flask-Caching takes keys as positional arguments and returns list of values
+
+    def get_many(self, keys: t.Sequence[str]) -> t.Dict[str, t.Any]:
+        values = self._get_cache().get_many(*[self._prepare_key(key) for key in keys])
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def delete_many(self, keys: t.Sequence[str]) -> None:
+        self._get_cache().delete_many(*[self._prepare_key(key) for key in keys])
@@ -0,0 +1,135 @@
+import typing as t
+
+import numpy as np  # type: ignore
+
+from pylti1p3.assignments_grades import AssignmentsGradesService
+from pylti1p3.gradebook import GradebookExporter, TGradebookRow
+from pylti1p3.utils import DEFAULT_MAX_WORKERS
+
+
+class GradebookMatrix:
+    """
+    Dense users x line items matrices with resultScore / resultMaximum values.
+    Missing results are presented as NaN.
+    """
+
+    user_ids: t.List[str]
+    lineitem_ids: t.List[str]
+    user_index: t.Dict[str, int]
+    lineitem_index: t.Dict[str, int]
+    scores: np.ndarray
+    maximums: np.ndarray
+
+    def __init__(
+        self,
+        user_ids: t.List[str],
+        lineitem_ids: t.List[str],
+        scores: np.ndarray,
+        maximums: np.ndarray,
+    ):
+        self.user_ids = user_ids
+        self.lineitem_ids = lineitem_ids
+        self.user_index = {user_id: i for i, user_id in enumerate(user_ids)}
+        self.lineitem_index = {ln_id: i for i, ln_id in enumerate(lineitem_ids)}
+        self.scores = scores
+        self.maximums = maximums
+
+    @classmethod
+    def from_rows(cls, rows: t.Iterable[TGradebookRow]) -> "GradebookMatrix":
+        """
+        Build matrix from the gradebook rows (see GradebookExporter.iter_rows).
+        Only the indexes and the values are collected in Python, the matrices are filled in one step.
+        """
+        user_index: t.Dict[str, int] = {}
+        lineitem_index: t.Dict[str, int] = {}
+        row_idx: t.List[int] = []
+        col_idx: t.List[int] = []
+        scores: t.List[float] = []
+        maximums: t.List[float] = []
+        nan = float("nan")
+
+        for row in rows:
+            user_id = row["user_id"]
+            lineitem_id = row["lineitem_id"]
+            if user_id is None or lineitem_id is None:
+                continue
+            row_idx.append(user_index.setdefault(user_id, len(user_index)))
+            col_idx.append(lineitem_index.setdefault(lineitem_id, len(lineitem_index)))
+            score = row["result_score"]
+            maximum = row["result_maximum"]
+            scores.append(nan if score is None else score)
+            maximums.append(nan if maximum is None else maximum)
+
+        shape = (len(user_index), len(lineitem_index))
+        scores_matrix = np.full(shape, np.nan, dtype=np.float64)
+        maximums_matrix = np.full(shape, np.nan, dtype=np.float64)
+        if row_idx:
+            rows_arr = np.fromiter(row_idx, dtype=np.intp, count=len(row_idx))
+            cols_arr = np.fromiter(col_idx, dtype=np.intp, count=len(col_idx))
+            scores_matrix[rows_arr, cols_arr] = np.fromiter(
+                scores, dtype=np.float64, count=len(scores)
+            )
+            maximums_matrix[rows_arr, cols_arr] = np.fromiter(
+                maximums, dtype=np.float64, count=len(maximums)
+            )
+
+        return cls(
+            list(user_index), list(lineitem_index), scores_matrix, maximums_matrix
+        )
+
+    @classmethod
+    def from_ags(
+        cls, ags: AssignmentsGradesService, max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> "GradebookMatrix":
+        return cls.from_rows(
+            GradebookExporter(ags, max_workers=max_workers).iter_rows()
+        )
+
+    def get_user_scores(self, user_id: str) -> np.ndarray:
+        return self.scores[self.user_index[user_id]]
+
+    def get_lineitem_scores(self, lineitem_id: str) -> np.ndarray:
+        return self.scores[:, self.lineitem_index[lineitem_id]]
+
+    def normalized(self) -> np.ndarray:
+        """
+        resultScore / resultMaximum for every cell (NaN if any of the values is missing or maximum is 0).
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            res = self.scores / self.maximums
+        res[~np.isfinite(res)] = np.nan
+        return res
+
+    def zscores(self) -> np.ndarray:
+        """
+        Normalized scores standardized per line item (column).
+        """
+        norm = self.normalized()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            res = (norm - self._nan_reduce(np.nanmean, norm)) / self._nan_reduce(
+                np.nanstd, norm
+            )
+        res[~np.isfinite(res)] = np.nan
+        return res
+
+    def lineitem_stats(self, normalize: bool = True) -> t.Dict[str, np.ndarray]:
+        """
+        Per line item statistics. Every value is array aligned with lineitem_ids.
+        """
+        data = self.normalized() if normalize else self.scores
+        return {
+            "count": np.sum(~np.isnan(data), axis=0),
+            "mean": self._nan_reduce(np.nanmean, data)[0],
+            "std": self._nan_reduce(np.nanstd, data)[0],
+            "min": self._nan_reduce(np.nanmin, data)[0],
+            "max": self._nan_reduce(np.nanmax, data)[0],
+            "median": self._nan_reduce(np.nanmedian, data)[0],
+        }
+
+    @staticmethod
+    def _nan_reduce(func: t.Callable, data: np.ndarray) -> np.ndarray:
+        res = np.full((1, data.shape[1]), np.nan, dtype=np.float64)
+        has_values = ~np.all(np.isnan(data), axis=0)
+        if data.shape[0] and np.any(has_values):
+            res[0, has_values] = func(data[:, has_values], axis=0)
+        return res
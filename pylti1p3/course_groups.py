@@ -1,6 +1,6 @@
 import typing as t
 import typing_extensions as te
-from .utils import add_param_to_url
+from .utils import add_param_to_url, map_concurrently
 from .service_connector import ServiceConnector
 
 TGroupsServiceData = te.TypedDict(
@@ -46,6 +46,77 @@ TSet = te.TypedDict(
 )
 
 
+TGroupId = t.Union[str, int]
+
+
+class CourseGroupsIndex:
+    """
+    Sets and groups of the course linked with each other (and optionally with users).
+    """
+
+    _sets: t.List[TSet]
+    _groups: t.List[TGroup]
+    _sets_by_id: t.Dict[TGroupId, TSet]
+    _groups_by_id: t.Dict[TGroupId, TGroup]
+    _groups_by_set_id: t.Dict[TGroupId, t.List[TGroup]]
+    _groups_by_user_id: t.Dict[str, t.List[TGroup]]
+
+    def __init__(self, sets: t.List[TSet], groups: t.List[TGroup]):
+        self._sets = sets
+        self._groups = groups
+        self._sets_by_id = {s["id"]: s for s in sets}
+        self._groups_by_id = {g["id"]: g for g in groups}
+        self._groups_by_set_id = {set_id: [] for set_id in self._sets_by_id}
+        self._groups_by_user_id = {}
+        for group in groups:
+            set_id = group.get("set_id")
+            if set_id and set_id in self._groups_by_set_id:
+                self._groups_by_set_id[set_id].append(group)
+
+    def add_members(
+        self, members: t.Iterable[t.Mapping[str, t.Any]]
+    ) -> "CourseGroupsIndex":
+        """
+        Link users with groups using "group_enrollments" from the names and roles service members.
+
+        :param members: list of NRPS members
+        :return: CourseGroupsIndex
+        """
+        for member in members:
+            user_id = member.get("user_id")
+            if not user_id:
+                continue
+            user_groups = self._groups_by_user_id.setdefault(user_id, [])
+            for enrollment in member.get("group_enrollments") or []:
+                group = self._groups_by_id.get(enrollment.get("group_id"))
+                if group is not None and group not in user_groups:
+                    user_groups.append(group)
+        return self
+
+    def get_sets(self) -> t.List[TSet]:
+        return self._sets
+
+    def get_groups(self) -> t.List[TGroup]:
+        return self._groups
+
+    def get_set(self, set_id: TGroupId) -> t.Optional[TSet]:
+        return self._sets_by_id.get(set_id)
+
+    def get_group(self, group_id: TGroupId) -> t.Optional[TGroup]:
+        return self._groups_by_id.get(group_id)
+
+    def get_set_groups(self, set_id: TGroupId) -> t.List[TGroup]:
+        return self._groups_by_set_id.get(set_id, [])
+
+    def get_group_set(self, group_id: TGroupId) -> t.Optional[TSet]:
+        group = self._groups_by_id.get(group_id)
+        set_id = group.get("set_id") if group else None
+        return self._sets_by_id.get(set_id) if set_id else None
+
+    def get_user_groups(self, user_id: str) -> t.List[TGroup]:
+        return self._groups_by_user_id.get(user_id, [])
+
+
 class CourseGroupsService:
     _service_connector: ServiceConnector
     _service_data: TGroupsServiceData
@@ -91,7 +162,7 @@ class CourseGroupsService:
     def has_sets(self):
         return "context_group_sets_url" in self._service_data
 
-    def get_sets(self, include_groups=False):
+    def _get_sets_list(self):
         sets_res_lst = []
         sets_url = self._service_data.get("context_group_sets_url")
 
@@ -99,17 +170,47 @@ class CourseGroupsService:
             sets, sets_url = self.get_page(sets_url, data_key="sets")
             sets_res_lst.extend(sets)
 
-        if include_groups and sets_res_lst:
-            set_id_to_index = {}
-            for i, s in enumerate(sets_res_lst):
-                set_id_to_index[s["id"]] = i
-                sets_res_lst[i]["groups"] = []
-
-            groups = self.get_groups()
-            for group in groups:
-                set_id = group.get("set_id")
-                if set_id and set_id in set_id_to_index:
-                    index = set_id_to_index[set_id]
-                    sets_res_lst[index]["groups"].append(group)
+        return sets_res_lst
+
+    def get_sets_and_groups(self) -> t.Tuple[t.List[TSet], t.List[TGroup]]:
+        """
+        Fetch all sets and all groups (both streams are fetched concurrently).
+
+        :return: tuple in format: (list with sets, list with groups)
+        """
+        if not self.has_sets():
+            return [], self.get_groups()
+        sets, groups = map_concurrently(
+            lambda func: func(), [self._get_sets_list, self.get_groups], max_workers=2
+        )
+        return sets, groups
+
+    def get_index(
+        self, members: t.Optional[t.Iterable[t.Mapping[str, t.Any]]] = None
+    ) -> CourseGroupsIndex:
+        """
+        Fetch sets and groups concurrently and link them with each other.
+
+        :param members: list of NRPS members (optional) to link users with their groups
+        :return: CourseGroupsIndex
+        """
+        sets, groups = self.get_sets_and_groups()
+        index = CourseGroupsIndex(sets, groups)
+        if members is not None:
+            index.add_members(members)
+        return index
+
+    def get_sets(self, include_groups=False):
+        if not include_groups:
+            return self._get_sets_list()
+        if not self.has_sets():
+            # groups would be fetched only to be thrown away
+            return []
+
+        sets_res_lst, groups = self.get_sets_and_groups()
+        if sets_res_lst:
+            index = CourseGroupsIndex(sets_res_lst, groups)
+            for s in sets_res_lst:
+                s["groups"] = index.get_set_groups(s["id"])
 
         return sets_res_lst
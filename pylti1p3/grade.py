@@ -1,20 +1,64 @@
+import copy
+import hashlib
 import json
 import typing as t
 from .exception import LtiException
+from .json_codec import json_dumps
 
 
 TExtaClaims = t.Mapping[str, t.Any]
 
 
 class Grade:
-    _score_given: t.Optional[float] = None
-    _score_maximum: t.Optional[float] = None
-    _activity_progress: t.Optional[str] = None
-    _grading_progress: t.Optional[str] = None
-    _timestamp: t.Optional[str] = None
-    _user_id: t.Optional[str] = None
-    _comment: t.Optional[str] = None
-    _extra_claims: t.Optional[TExtaClaims] = None
+    __slots__ = (
+        "_score_given",
+        "_score_maximum",
+        "_activity_progress",
+        "_grading_progress",
+        "_timestamp",
+        "_user_id",
+        "_comment",
+        "_extra_claims",
+        "_value",
+        "_frozen",
+    )
+    _score_given: t.Optional[float]
+    _score_maximum: t.Optional[float]
+    _activity_progress: t.Optional[str]
+    _grading_progress: t.Optional[str]
+    _timestamp: t.Optional[str]
+    _user_id: t.Optional[str]
+    _comment: t.Optional[str]
+    _extra_claims: t.Optional[TExtaClaims]
+    _value: t.Optional[str]
+    _frozen: bool
+
+    def __init__(self) -> None:
+        self._score_given = None
+        self._score_maximum = None
+        self._activity_progress = None
+        self._grading_progress = None
+        self._timestamp = None
+        self._user_id = None
+        self._comment = None
+        self._extra_claims = None
+        self._value = None
+        self._frozen = False
+
+    def _changed(self) -> None:
+        if self._frozen:
+            raise LtiException("Grade is frozen and can't be changed")
+        self._value = None
+
+    def freeze(self) -> "Grade":
+        """
+        Make the grade read-only. Setters of the frozen grade raise LtiException.
+        """
+        self._frozen = True
+        return self
+
+    def is_frozen(self) -> bool:
+        return self._frozen
 
     def _validate_score(self, score_value) -> t.Optional[str]:
         if not isinstance(score_value, (int, float)):
@@ -36,6 +80,7 @@ class Grade:
         err_msg = self._validate_score(value)
         if err_msg is not None:
             raise LtiException("Invalid scoreGiven value: " + err_msg)
+        self._changed()
         self._score_given = value
         return self
 
@@ -52,6 +97,7 @@ class Grade:
         err_msg = self._validate_score(value)
         if err_msg is not None:
             raise LtiException("Invalid scoreMaximum value: " + err_msg)
+        self._changed()
         self._score_maximum = value
         return self
 
@@ -65,6 +111,7 @@ class Grade:
         """
         https://www.imsglobal.org/spec/lti-ags/v2p0/#activityprogress
         """
+        self._changed()
         self._activity_progress = value
         return self
 
@@ -78,6 +125,7 @@ class Grade:
         """
         https://www.imsglobal.org/spec/lti-ags/v2p0/#gradingprogress
         """
+        self._changed()
         self._grading_progress = value
         return self
 
@@ -91,6 +139,7 @@ class Grade:
         """
         https://www.imsglobal.org/spec/lti-ags/v2p0/#timestamp
         """
+        self._changed()
         self._timestamp = value
         return self
 
@@ -104,6 +153,7 @@ class Grade:
         """
         https://www.imsglobal.org/spec/lti-ags/v2p0/#userid-0
         """
+        self._changed()
         self._user_id = value
         return self
 
@@ -117,17 +167,20 @@ class Grade:
         """
         https://www.imsglobal.org/spec/lti-ags/v2p0/#comment-0
         """
+        self._changed()
         self._comment = value
         return self
 
     def set_extra_claims(self, value: TExtaClaims) -> "Grade":
-        self._extra_claims = value
+        self._changed()
+        # copy keeps the cached value in sync with the claims if the caller changes its mapping later
+        self._extra_claims = copy.deepcopy(value)
         return self
 
     def get_extra_claims(self) -> t.Optional[TExtaClaims]:
         return self._extra_claims
 
-    def get_value(self) -> str:
+    def get_data(self) -> t.Dict[str, t.Any]:
         data = {
             "scoreGiven": self._score_given,
             "scoreMaximum": self._score_maximum,
@@ -140,4 +193,28 @@ class Grade:
         if self._extra_claims is not None:
             data.update(self._extra_claims)
 
-        return json.dumps({k: v for k, v in data.items() if v is not None})
+        return {k: v for k, v in data.items() if v is not None}
+
+    def get_value(self) -> str:
+        """
+        JSON with the grade data. The result is cached until the grade is changed using setters.
+        """
+        if self._value is None:
+            self._value = json_dumps(self.get_data())
+        return self._value
+
+    def get_fingerprint(self) -> str:
+        """
+        Hash of the normalized grade data (without timestamp). Is used to detect unchanged grades.
+        """
+        data = {
+            k: (
+                float(v)
+                if isinstance(v, (int, float)) and not isinstance(v, bool)
+                else v
+            )
+            for k, v in self.get_data().items()
+            if k != "timestamp"
+        }
+        data_str = json.dumps(data, sort_keys=True, default=str)
+        return hashlib.md5(data_str.encode("utf-8")).hexdigest()
@@ -0,0 +1,85 @@
+import hashlib
+import typing as t
+from abc import ABCMeta, abstractmethod
+
+import typing_extensions as te
+
+TGradeOutboxItem = te.TypedDict(
+    "TGradeOutboxItem",
+    {
+        # unique key of the pending score: (iss, client_id, score_url, user_id)
+        "key": str,
+        # changes on every enqueue so the drainer never removes a newer score sent in the meantime
+        "token": str,
+        "iss": str,
+        "client_id": str,
+        "score_url": str,
+        "scope": t.List[str],
+        "user_id": t.Optional[str],
+        "payload": str,
+        "attempts": int,
+        "next_attempt_at": float,
+        "last_error": t.Optional[str],
+    },
+    total=False,
+)
+
+
+class GradeOutbox:
+    """
+    Durable local queue with the scores which should be sent to the LTI platforms.
+    Pending scores for the same (lineitem, userId) are coalesced, so only the latest one will be sent.
+    """
+
+    __metaclass__ = ABCMeta
+
+    @staticmethod
+    def get_item_key(
+        iss: str, client_id: str, score_url: str, user_id: t.Optional[str]
+    ) -> str:
+        key = "|".join([iss, client_id, score_url, user_id or ""])
+        return hashlib.md5(key.encode("utf-8")).hexdigest()
+
+    @abstractmethod
+    def enqueue(
+        self,
+        iss: str,
+        client_id: str,
+        score_url: str,
+        scope: t.Sequence[str],
+        user_id: t.Optional[str],
+        payload: str,
+    ) -> None:
+        """
+        Add score to the queue. Pending score with the same key must be replaced.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_due_items(
+        self, limit: int, now: float, lease_time: t.Optional[float] = None
+    ) -> t.List[TGradeOutboxItem]:
+        """
+        Return pending scores which should be sent at the moment (ordered by next_attempt_at).
+        If lease_time is passed the returned scores must be claimed atomically: their next_attempt_at
+        is moved to now + lease_time, so the other drainers don't get them until the lease expires
+        (the returned scores have the leased next_attempt_at).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_sent(self, item: TGradeOutboxItem) -> None:
+        """
+        Remove score from the queue (only if it wasn't replaced by the newer one).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_failed(
+        self, item: TGradeOutboxItem, error: str, next_attempt_at: t.Optional[float]
+    ) -> None:
+        """
+        Schedule next attempt to send the score. next_attempt_at = None means the score
+        will not be sent anymore (it stays in the queue for the inspection).
+        """
+        raise NotImplementedError
@@ -0,0 +1,158 @@
+import threading
+import time
+import typing as t
+
+import requests
+
+from ..exception import LtiServiceException
+from ..registration import Registration
+from ..service_connector import ServiceConnector, make_requests_session
+from ..tool_config import ToolConfAbstract
+from ..utils import DEFAULT_MAX_WORKERS, map_concurrently
+from .base import GradeOutbox, TGradeOutboxItem
+
+
+class GradeOutboxDrainer:
+    """
+    Sends the scores queued in the GradeOutbox to the LTI platforms.
+    Could be called periodically (drain) or started in the background thread (start/stop).
+    """
+
+    _outbox: GradeOutbox
+    _tool_config: ToolConfAbstract
+    _batch_size: int = 100
+    _max_attempts: int = 8
+    _retry_delay: int = 30
+    _lease_time: int = 300
+    _max_workers: int = DEFAULT_MAX_WORKERS
+    _thread: t.Optional[threading.Thread] = None
+    _stop_event: threading.Event
+
+    def __init__(
+        self,
+        outbox: GradeOutbox,
+        tool_config: ToolConfAbstract,
+        requests_session: t.Optional[requests.Session] = None,
+        batch_size: int = 100,
+        max_attempts: int = 8,
+        retry_delay: int = 30,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        lease_time: int = 300,
+    ):
+        """
+        :param outbox: GradeOutbox instance
+        :param tool_config: tool config which is used to find registrations of the queued scores
+        :param requests_session: requests.Session (optional)
+        :param batch_size: max number of scores processed in one pass
+        :param max_attempts: number of attempts to send score before giving up
+        :param retry_delay: delay (in seconds) before the first retry, it doubles after every next attempt
+        :param max_workers: max number of concurrent HTTP requests
+        :param lease_time: time (in seconds) while the scores taken by this drainer are hidden from the other
+            drainers (e.g. one per web worker process), they are sent again if the drainer dies in the meantime
+        """
+        self._outbox = outbox
+        self._tool_config = tool_config
+        self._batch_size = batch_size
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay
+        self._max_workers = max_workers
+        self._lease_time = lease_time
+        self._stop_event = threading.Event()
+        if requests_session:
+            self._requests_session = requests_session
+        else:
+            self._requests_session = make_requests_session()
+
+    def _get_registration(self, iss: str, client_id: str) -> Registration:
+        if self._tool_config.check_iss_has_one_client(iss):
+            return self._tool_config.find_registration(iss)
+        return self._tool_config.find_registration_by_params(iss, client_id)
+
+    def _is_permanent_error(self, error: Exception) -> bool:
+        if isinstance(error, LtiServiceException):
+            status_code = error.response.status_code
+            return 400 <= status_code < 500 and status_code not in (408, 429)
+        return False
+
+    def drain(self) -> int:
+        """
+        Make one pass over the due scores.
+
+        :return: number of successfully sent scores
+        """
+        now = time.time()
+        items = self._outbox.get_due_items(self._batch_size, now, self._lease_time)
+        # connectors are created before the fan-out so all scores of one registration share the access token
+        connectors: t.Dict[t.Tuple[str, str], t.Union[ServiceConnector, Exception]] = {}
+        for item in items:
+            connector_key = (item["iss"], item["client_id"])
+            if connector_key not in connectors:
+                try:
+                    registration = self._get_registration(*connector_key)
+                    connectors[connector_key] = ServiceConnector(
+                        registration, self._requests_session
+                    )
+                except Exception as e:  # pylint: disable=broad-except
+                    connectors[connector_key] = e
+
+        def send(item: TGradeOutboxItem) -> None:
+            connector = connectors[(item["iss"], item["client_id"])]
+            if isinstance(connector, Exception):
+                raise connector
+            connector.make_service_request(
+                item["scope"],
+                item["score_url"],
+                method="POST",
+                data=item["payload"],
+                content_type="application/vnd.ims.lis.v1.score+json",
+            )
+
+        results = map_concurrently(
+            send, items, max_workers=self._max_workers, return_exceptions=True
+        )
+
+        sent = 0
+        for item, error in zip(items, results):
+            if error is None:
+                self._outbox.mark_sent(item)
+                sent += 1
+                continue
+            attempts = item["attempts"] + 1
+            if attempts >= self._max_attempts or self._is_permanent_error(error):
+                next_attempt_at = None
+            else:
+                next_attempt_at = now + self._retry_delay * 2 ** (attempts - 1)
+            self._outbox.mark_failed(item, str(error), next_attempt_at)
+        return sent
+
+    def start(self, interval: int = 10) -> "GradeOutboxDrainer":
+        """
+        Start draining the outbox in the background (daemon) thread.
+
+        :param interval: pause (in seconds) between the passes
+        """
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop_event.clear()
+
+        def run() -> None:
+            while not self._stop_event.is_set():
+                try:
+                    sent = self.drain()
+                except Exception:  # pylint: disable=broad-except
+                    sent = 0
+                # don't wait if the whole batch was sent, there might be more due scores
+                if sent < self._batch_size:
+                    self._stop_event.wait(interval)
+
+        self._thread = threading.Thread(
+            target=run, name="lti1p3-grade-outbox-drainer", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: t.Optional[float] = None) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
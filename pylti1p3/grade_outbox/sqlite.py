@@ -0,0 +1,130 @@
+import sqlite3
+import time
+import typing as t
+import uuid
+
+from ..json_codec import json_dumps, json_loads
+from ..utils import sqlite_connection
+from .base import GradeOutbox, TGradeOutboxItem
+
+
+class SqliteGradeOutbox(GradeOutbox):
+    _db_path: str
+    _table_name: str
+
+    _fields = (
+        "key",
+        "token",
+        "iss",
+        "client_id",
+        "score_url",
+        "scope",
+        "user_id",
+        "payload",
+        "attempts",
+        "next_attempt_at",
+        "last_error",
+    )
+
+    def __init__(self, db_path: str, table_name: str = "lti1p3_grade_outbox"):
+        self._db_path = db_path
+        self._table_name = table_name
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._table_name} ("
+                "key TEXT PRIMARY KEY, "
+                "token TEXT NOT NULL, "
+                "iss TEXT NOT NULL, "
+                "client_id TEXT NOT NULL, "
+                "score_url TEXT NOT NULL, "
+                "scope TEXT NOT NULL, "
+                "user_id TEXT, "
+                "payload TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "next_attempt_at REAL, "
+                "last_error TEXT)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self._table_name}_next_attempt_at "
+                f"ON {self._table_name} (next_attempt_at)"
+            )
+
+    def _connect(self) -> t.ContextManager[sqlite3.Connection]:
+        # grades are enqueued by the request threads while the drainer thread (or process) claims them,
+        # the busy timeout covers the short write locks taken by the other side
+        return sqlite_connection(self._db_path)
+
+    def enqueue(
+        self,
+        iss: str,
+        client_id: str,
+        score_url: str,
+        scope: t.Sequence[str],
+        user_id: t.Optional[str],
+        payload: str,
+    ) -> None:
+        key = self.get_item_key(iss, client_id, score_url, user_id)
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self._table_name} "
+                f"({', '.join(self._fields)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, NULL)",
+                (
+                    key,
+                    uuid.uuid4().hex,
+                    iss,
+                    client_id,
+                    score_url,
+                    json_dumps(list(scope)),
+                    user_id,
+                    payload,
+                    time.time(),
+                ),
+            )
+
+    def get_due_items(
+        self, limit: int, now: float, lease_time: t.Optional[float] = None
+    ) -> t.List[TGradeOutboxItem]:
+        with self._connect() as conn:
+            if lease_time is not None:
+                # write lock is taken before the select, so the drainers of the other processes
+                # wait here and don't claim the same scores
+                conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                f"SELECT {', '.join(self._fields)} FROM {self._table_name} "
+                "WHERE next_attempt_at IS NOT NULL AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            if lease_time is not None:
+                conn.executemany(
+                    f"UPDATE {self._table_name} SET next_attempt_at = ? WHERE key = ?",
+                    [(now + lease_time, row[0]) for row in rows],
+                )
+
+        items = []
+        for row in rows:
+            item = t.cast(TGradeOutboxItem, dict(zip(self._fields, row)))
+            item["scope"] = json_loads(t.cast(str, item["scope"]))
+            if lease_time is not None:
+                item["next_attempt_at"] = now + lease_time
+            items.append(item)
+        return items
+
+    def mark_sent(self, item: TGradeOutboxItem) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                f"DELETE FROM {self._table_name} WHERE key = ? AND token = ?",
+                (item["key"], item["token"]),
+            )
+
+    def mark_failed(
+        self, item: TGradeOutboxItem, error: str, next_attempt_at: t.Optional[float]
+    ) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE {self._table_name} "
+                "SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? "
+                "WHERE key = ? AND token = ?",
+                (next_attempt_at, error, item["key"], item["token"]),
+            )
@@ -0,0 +1,148 @@
+import csv
+import typing as t
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import typing_extensions as te
+
+from .assignments_grades import AssignmentsGradesService
+from .json_codec import json_dumps
+from .lineitem import LineItem, TLineItem
+from .utils import DEFAULT_MAX_WORKERS
+
+TGradebookRow = te.TypedDict(
+    "TGradebookRow",
+    {
+        "lineitem_id": t.Optional[str],
+        "lineitem_label": t.Optional[str],
+        "lineitem_tag": t.Optional[str],
+        "user_id": t.Optional[str],
+        "result_score": t.Optional[float],
+        "result_maximum": t.Optional[float],
+        "comment": t.Optional[str],
+    },
+)
+
+TProgressCallback = t.Callable[[int, int], None]
+
+GRADEBOOK_FIELDS = [
+    "lineitem_id",
+    "lineitem_label",
+    "lineitem_tag",
+    "user_id",
+    "result_score",
+    "result_maximum",
+    "comment",
+]
+
+
+class GradebookExporter:
+    """
+    Fetches results of many line items concurrently and streams them as flat rows.
+    Memory usage is bounded: not more than max_workers line items are loaded at the same time.
+    """
+
+    _ags: AssignmentsGradesService
+    _max_workers: int
+    _progress_callback: t.Optional[TProgressCallback] = None
+
+    def __init__(
+        self,
+        ags: AssignmentsGradesService,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        progress_callback: t.Optional[TProgressCallback] = None,
+    ):
+        """
+        :param ags: AssignmentsGradesService instance
+        :param max_workers: max number of line items fetched at the same time
+        :param progress_callback: callable which accepts (number of processed line items, total number)
+        """
+        self._ags = ags
+        self._max_workers = max(max_workers, 1)
+        self._progress_callback = progress_callback
+
+    def _get_rows(self, lineitem: LineItem) -> t.List[TGradebookRow]:
+        return [
+            {
+                "lineitem_id": lineitem.get_id(),
+                "lineitem_label": lineitem.get_label(),
+                "lineitem_tag": lineitem.get_tag(),
+                "user_id": result.get("userId"),
+                "result_score": result.get("resultScore"),
+                "result_maximum": result.get("resultMaximum"),
+                "comment": result.get("comment"),
+            }
+            for result in self._ags.get_grades(lineitem)
+        ]
+
+    def iter_rows(
+        self, lineitems: t.Optional[t.Sequence[t.Union[LineItem, TLineItem]]] = None
+    ) -> t.Iterator[TGradebookRow]:
+        """
+        Yield gradebook rows (line items are processed in the order of completion).
+
+        :param lineitems: list of LineItem instances or dicts (all available line items by default)
+        :return: iterator
+        """
+        if lineitems is None:
+            lineitems = self._ags.get_lineitems()
+        lineitems_lst = [
+            ln if isinstance(ln, LineItem) else LineItem(ln) for ln in lineitems
+        ]
+        total = len(lineitems_lst)
+        pending = iter(lineitems_lst)
+        processed = 0
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            in_flight: t.Set[Future] = set()
+            for lineitem in pending:
+                in_flight.add(executor.submit(self._get_rows, lineitem))
+                if len(in_flight) >= self._max_workers:
+                    break
+
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rows = future.result()
+                    processed += 1
+                    next_lineitem = next(pending, None)
+                    if next_lineitem is not None:
+                        in_flight.add(executor.submit(self._get_rows, next_lineitem))
+                    if self._progress_callback:
+                        self._progress_callback(processed, total)
+                    yield from rows
+
+    def export_csv(
+        self,
+        fileobj: t.TextIO,
+        lineitems: t.Optional[t.Sequence[t.Union[LineItem, TLineItem]]] = None,
+        write_header: bool = True,
+    ) -> int:
+        """
+        Write gradebook into the file-like object in CSV format.
+
+        :return: number of written rows
+        """
+        writer = csv.DictWriter(fileobj, fieldnames=GRADEBOOK_FIELDS)
+        if write_header:
+            writer.writeheader()
+        rows_count = 0
+        for row in self.iter_rows(lineitems):
+            writer.writerow(row)
+            rows_count += 1
+        return rows_count
+
+    def export_jsonl(
+        self,
+        fileobj: t.TextIO,
+        lineitems: t.Optional[t.Sequence[t.Union[LineItem, TLineItem]]] = None,
+    ) -> int:
+        """
+        Write gradebook into the file-like object in JSON Lines format.
+
+        :return: number of written rows
+        """
+        rows_count = 0
+        for row in self.iter_rows(lineitems):
+            fileobj.write(json_dumps(row) + "\n")
+            rows_count += 1
+        return rows_count
@@ -0,0 +1,272 @@
+import os
+import threading
+import typing as t
+
+import requests
+import typing_extensions as te
+
+from .assignments_grades import AssignmentsGradesService
+from .course_groups import CourseGroupsService
+from .exception import LtiException
+from .json_codec import json_dumps, json_loads
+from .names_roles import NamesRolesProvisioningService
+from .registration import Registration
+from .service_connector import ServiceConnector, make_requests_session
+from .utils import DEFAULT_MAX_WORKERS, map_concurrently
+
+NRPS_CLAIM = "https://purl.imsglobal.org/spec/lti-nrps/claim/namesroleservice"
+AGS_CLAIM = "https://purl.imsglobal.org/spec/lti-ags/claim/endpoint"
+CGS_CLAIM = "https://purl.imsglobal.org/spec/lti-gs/claim/groupsservice"
+
+TServiceJobRunResult = te.TypedDict(
+    "TServiceJobRunResult",
+    {
+        # job results by target key (including results restored from the checkpoint)
+        "results": t.Dict[str, t.Any],
+        # errors by target key
+        "errors": t.Dict[str, Exception],
+        # keys of the targets which were completed by the previous (interrupted) run
+        "resumed": t.List[str],
+    },
+)
+
+
+class ServiceJobTarget:
+    """
+    One course context the job is run for: platform registration and the service claims
+    (i.e. saved from the launch data).
+    """
+
+    _key: str
+    _registration: Registration
+    _service_claims: t.Mapping[str, t.Any]
+
+    def __init__(
+        self,
+        key: str,
+        registration: Registration,
+        service_claims: t.Mapping[str, t.Any],
+    ):
+        """
+        :param key: unique key of the target (used in the checkpoint)
+        :param registration: Registration instance
+        :param service_claims: dict with NRPS / AGS / CGS claims (launch data could be passed as is)
+        """
+        self._key = key
+        self._registration = registration
+        self._service_claims = service_claims
+
+    def get_key(self) -> str:
+        return self._key
+
+    def get_registration(self) -> Registration:
+        return self._registration
+
+    def get_platform(self) -> str:
+        issuer = self._registration.get_issuer()
+        assert issuer is not None, "Registration issuer should be set"
+        return issuer
+
+    def has_nrps(self) -> bool:
+        return bool(
+            self._service_claims.get(NRPS_CLAIM, {}).get("context_memberships_url")
+        )
+
+    def get_nrps(
+        self, service_connector: ServiceConnector
+    ) -> NamesRolesProvisioningService:
+        if not self.has_nrps():
+            raise LtiException(
+                f"namesroleservice is not set for the target {self._key}"
+            )
+        return NamesRolesProvisioningService(
+            service_connector, self._service_claims[NRPS_CLAIM]
+        )
+
+    def has_ags(self) -> bool:
+        return bool(self._service_claims.get(AGS_CLAIM))
+
+    def get_ags(self, service_connector: ServiceConnector) -> AssignmentsGradesService:
+        if not self.has_ags():
+            raise LtiException(f"endpoint is not set for the target {self._key}")
+        return AssignmentsGradesService(
+            service_connector, self._service_claims[AGS_CLAIM]
+        )
+
+    def has_cgs(self) -> bool:
+        return bool(self._service_claims.get(CGS_CLAIM, {}).get("context_groups_url"))
+
+    def get_cgs(self, service_connector: ServiceConnector) -> CourseGroupsService:
+        if not self.has_cgs():
+            raise LtiException(f"groupsservice is not set for the target {self._key}")
+        return CourseGroupsService(service_connector, self._service_claims[CGS_CLAIM])
+
+
+class ServiceJobRunner:
+    """
+    Runs the job (roster pull, gradebook export, line items cleanup, ...) for many course contexts
+    of many registrations concurrently. Number of concurrent jobs per platform (issuer) is limited.
+    Progress could be saved into the checkpoint file, so the interrupted run could be resumed:
+    targets completed before are skipped, failed ones are run again.
+    """
+
+    _max_workers: int = DEFAULT_MAX_WORKERS
+    _max_workers_per_platform: int = 2
+    _checkpoint_path: t.Optional[str] = None
+    _checkpoint_lock: threading.Lock
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_workers_per_platform: int = 2,
+        checkpoint_path: t.Optional[str] = None,
+        requests_session: t.Optional[requests.Session] = None,
+    ):
+        """
+        :param max_workers: max number of concurrently running jobs
+        :param max_workers_per_platform: max number of concurrently running jobs for one platform (issuer)
+        :param checkpoint_path: path to the JSON Lines file with the progress (optional), one line
+            is appended per completed target. Results of the job must be JSON-serializable if it is used,
+            otherwise the target is reported as failed.
+        :param requests_session: requests.Session (optional)
+        """
+        self._max_workers = max_workers
+        self._max_workers_per_platform = max_workers_per_platform
+        self._checkpoint_path = checkpoint_path
+        self._checkpoint_lock = threading.Lock()
+        if requests_session:
+            self._requests_session = requests_session
+        else:
+            self._requests_session = make_requests_session()
+
+    def run(
+        self,
+        job: t.Callable[[ServiceJobTarget, ServiceConnector], t.Any],
+        targets: t.Iterable[ServiceJobTarget],
+    ) -> TServiceJobRunResult:
+        """
+        Run the job for every target. Errors of one target don't stop the others.
+
+        :param job: callable which accepts target and service connector of the target's registration
+        :param targets: iterable with ServiceJobTarget instances
+        :return: dict with results, errors and keys of the resumed targets
+        """
+        done = self._load_checkpoint()
+        resumed = []
+        pending: t.List[ServiceJobTarget] = []
+        keys = set()
+        for target in targets:
+            key = target.get_key()
+            if key in keys:
+                raise LtiException(f"Duplicate target key: {key}")
+            keys.add(key)
+            if key in done:
+                resumed.append(key)
+            else:
+                pending.append(target)
+
+        results: t.Dict[str, t.Any] = {key: done[key] for key in resumed}
+        # all targets of one registration share the access tokens
+        connectors: t.Dict[
+            t.Tuple[t.Optional[str], t.Optional[str]], ServiceConnector
+        ] = {}
+        semaphores: t.Dict[str, threading.BoundedSemaphore] = {}
+        for target in pending:
+            registration = target.get_registration()
+            connector_key = (registration.get_issuer(), registration.get_client_id())
+            if connector_key not in connectors:
+                connectors[connector_key] = ServiceConnector(
+                    registration, self._requests_session
+                )
+            if target.get_platform() not in semaphores:
+                semaphores[target.get_platform()] = threading.BoundedSemaphore(
+                    self._max_workers_per_platform
+                )
+
+        def run_target(target: ServiceJobTarget) -> t.Any:
+            registration = target.get_registration()
+            connector = connectors[
+                (registration.get_issuer(), registration.get_client_id())
+            ]
+            with semaphores[target.get_platform()]:
+                result = job(target, connector)
+            # serialized before the target is counted as completed
+            checkpoint_line = self._get_checkpoint_line(target.get_key(), result)
+            with self._checkpoint_lock:
+                self._append_checkpoint(checkpoint_line)
+                results[target.get_key()] = result
+            return result
+
+        pending = self._interleave_platforms(pending)
+        responses = map_concurrently(
+            run_target,
+            pending,
+            max_workers=self._max_workers,
+            return_exceptions=True,
+        )
+        errors = {
+            target.get_key(): response
+            for target, response in zip(pending, responses)
+            if isinstance(response, Exception)
+        }
+        return {"results": results, "errors": errors, "resumed": resumed}
+
+    def reset_checkpoint(self) -> None:
+        """
+        Remove the checkpoint file, so the next run will start from scratch.
+        """
+        if self._checkpoint_path and os.path.exists(self._checkpoint_path):
+            os.remove(self._checkpoint_path)
+
+    @staticmethod
+    def _interleave_platforms(
+        targets: t.List[ServiceJobTarget],
+    ) -> t.List[ServiceJobTarget]:
+        # round-robin over the platforms, so workers don't wait for the per-platform limit
+        # while targets of the other platforms are pending
+        by_platform: t.Dict[str, t.List[ServiceJobTarget]] = {}
+        for target in targets:
+            by_platform.setdefault(target.get_platform(), []).append(target)
+        queues = list(by_platform.values())
+        res = []
+        for i in range(max((len(q) for q in queues), default=0)):
+            for queue in queues:
+                if i < len(queue):
+                    res.append(queue[i])
+        return res
+
+    def _load_checkpoint(self) -> t.Dict[str, t.Any]:
+        if not self._checkpoint_path or not os.path.exists(self._checkpoint_path):
+            return {}
+        done = {}
+        with open(self._checkpoint_path, "rb") as f:
+            lines = f.read().split(b"\n")
+        offset = 0
+        for i, line in enumerate(lines):
+            try:
+                if line:
+                    item = json_loads(line)
+                    done[item["key"]] = item["result"]
+            except (ValueError, KeyError, TypeError) as e:
+                if i < len(lines) - 1:
+                    raise LtiException(
+                        f"Invalid checkpoint file: {self._checkpoint_path}"
+                    ) from e
+                # the last line was written partially (the run was interrupted): it is dropped
+                # and the target is run again
+                with open(self._checkpoint_path, "r+b") as f:
+                    f.truncate(offset)
+            offset += len(line) + 1
+        return done
+
+    def _get_checkpoint_line(self, key: str, result: t.Any) -> t.Optional[str]:
+        if not self._checkpoint_path:
+            return None
+        return json_dumps({"key": key, "result": result}) + "\n"
+
+    def _append_checkpoint(self, line: t.Optional[str]) -> None:
+        if not line:
+            return
+        assert self._checkpoint_path is not None
+        with open(self._checkpoint_path, "a", encoding="utf-8") as f:
+            f.write(line)
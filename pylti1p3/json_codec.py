@@ -0,0 +1,104 @@
+import json
+import typing as t
+
+
+class JsonCodec:
+    """
+    Encodes / decodes JSON of the launches, service requests and stored data.
+    """
+
+    name: str = "json"
+
+    def loads(self, data: t.Union[str, bytes]) -> t.Any:
+        return json.loads(data)
+
+    def dumps(self, obj: t.Any) -> str:
+        return json.dumps(obj)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson  # type: ignore # pylint: disable=import-outside-toplevel,import-error
+
+        self._orjson = orjson
+
+    def loads(self, data: t.Union[str, bytes]) -> t.Any:
+        return self._orjson.loads(data)  # pylint: disable=no-member
+
+    def dumps(self, obj: t.Any) -> str:
+        return self._orjson.dumps(obj).decode("utf-8")  # pylint: disable=no-member
+
+
+class UjsonCodec(JsonCodec):
+    name = "ujson"
+
+    def __init__(self) -> None:
+        import ujson  # type: ignore # pylint: disable=import-outside-toplevel,import-error
+
+        self._ujson = ujson
+
+    def loads(self, data: t.Union[str, bytes]) -> t.Any:
+        return self._ujson.loads(data)
+
+    def dumps(self, obj: t.Any) -> str:
+        return self._ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+
+
+_codecs: t.Dict[str, t.Type[JsonCodec]] = {
+    JsonCodec.name: JsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+}
+_codec: JsonCodec = JsonCodec()
+
+
+def set_json_codec(codec: t.Union[str, JsonCodec]) -> JsonCodec:
+    """
+    Set JSON codec used by the library (process-wide).
+
+    :param codec: JsonCodec instance or name: "json" (stdlib, default), "orjson", "ujson"
+        or "auto" (the fastest installed one)
+    :return: JsonCodec instance which is used now
+    """
+    global _codec  # pylint: disable=global-statement
+    if isinstance(codec, JsonCodec):
+        _codec = codec
+    elif codec == "auto":
+        for codec_cls in (OrjsonCodec, UjsonCodec):
+            try:
+                _codec = codec_cls()
+                break
+            except ImportError:
+                continue
+        else:
+            _codec = JsonCodec()
+    elif codec in _codecs:
+        _codec = _codecs[codec]()
+    else:
+        raise ValueError(f"Unknown JSON codec: {codec}")
+    return _codec
+
+
+def get_json_codec() -> JsonCodec:
+    return _codec
+
+
+def json_loads(data: t.Union[str, bytes]) -> t.Any:
+    return _codec.loads(data)
+
+
+def json_dumps(obj: t.Any) -> str:
+    return _codec.dumps(obj)
+
+
+def json_loads_response(response: t.Any) -> t.Any:
+    """
+    Decode body of the requests.Response. Body is passed to the codec as is (bytes) if it is UTF-8
+    or charset isn't set, otherwise it is decoded using the charset of the response.
+    """
+    encoding = (response.encoding or "").lower().replace("_", "-")
+    if encoding and encoding not in ("utf-8", "utf8"):
+        return json_loads(response.text)
+    return json_loads(response.content)
@@ -0,0 +1,110 @@
+import hashlib
+import threading
+import time
+import typing as t
+
+import typing_extensions as te
+
+from .json_codec import json_dumps
+from .tool_config import ToolConfAbstract
+
+TJwksResponse = te.TypedDict(
+    "TJwksResponse",
+    {
+        "status": int,
+        "body": bytes,
+        "headers": t.Dict[str, str],
+    },
+)
+
+
+class _JwksPayload:
+    __slots__ = ("version", "built_at", "body", "etag")
+
+    def __init__(self, version: t.Hashable, body: bytes):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+class JwksPublisher:
+    """
+    Serves the tool's JWKS. Key set is serialized once (with a strong ETag) and rebuilt only after the keys
+    were changed in the tool config. In case if the tool config can't say whether its keys were changed
+    (get_jwks_version() returns None) the key set is rebuilt every refresh_interval seconds.
+    """
+
+    _tool_conf: ToolConfAbstract
+    _max_age: int
+    _refresh_interval: int
+    _payloads: t.Dict[t.Tuple[t.Optional[str], t.Optional[str]], _JwksPayload]
+
+    def __init__(
+        self,
+        tool_conf: ToolConfAbstract,
+        max_age: int = 3600,
+        refresh_interval: int = 60,
+    ):
+        self._tool_conf = tool_conf
+        self._max_age = max_age
+        self._refresh_interval = refresh_interval
+        self._payloads = {}
+        self._lock = threading.Lock()
+
+    def get_tool_conf(self) -> ToolConfAbstract:
+        return self._tool_conf
+
+    def get_payload(
+        self, iss: t.Optional[str] = None, client_id: t.Optional[str] = None
+    ) -> t.Tuple[bytes, str]:
+        """
+        Serialized JWKS and its ETag.
+        """
+        key = (iss, client_id)
+        version = self._tool_conf.get_jwks_version()
+        payload = self._payloads.get(key)
+        if payload is not None and payload.version == version:
+            if (
+                version is not None
+                or time.monotonic() - payload.built_at < self._refresh_interval
+            ):
+                return payload.body, payload.etag
+
+        with self._lock:
+            jwks = self._tool_conf.get_jwks(iss, client_id)
+            payload = _JwksPayload(version, json_dumps(jwks).encode("utf-8"))
+            self._payloads[key] = payload
+        return payload.body, payload.etag
+
+    def get_response(
+        self,
+        if_none_match: t.Optional[str] = None,
+        iss: t.Optional[str] = None,
+        client_id: t.Optional[str] = None,
+    ) -> TJwksResponse:
+        """
+        Response for the JWKS endpoint: 304 (with empty body) if the If-None-Match header matches the ETag.
+
+        :param if_none_match: value of the If-None-Match request header
+        :return: dict with status, body and headers
+        """
+        body, etag = self.get_payload(iss, client_id)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={self._max_age}",
+        }
+        if if_none_match and self._etag_matches(if_none_match, etag):
+            return {"status": 304, "body": b"", "headers": headers}
+        headers["Content-Type"] = "application/json"
+        return {"status": 200, "body": body, "headers": headers}
+
+    @staticmethod
+    def _etag_matches(if_none_match: str, etag: str) -> bool:
+        for val in if_none_match.split(","):
+            val = val.strip()
+            if val.startswith("W/"):
+                val = val[2:]
+            if val in ("*", etag):
+                return True
+        return False
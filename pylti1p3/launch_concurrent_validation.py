@@ -0,0 +1,86 @@
+import threading
+import typing as t
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+
+from .utils import DEFAULT_MAX_WORKERS
+
+T = t.TypeVar("T", bound="LaunchConcurrentValidationMixin")
+
+
+class LaunchConcurrentValidationMixin:
+    """
+    Validation with the independent I/O run concurrently (part of MessageLaunch).
+    """
+
+    _concurrent_validation: bool = False
+    _validation_executor: t.Optional[Executor] = None
+    _default_validation_executor: t.Optional[Executor] = None
+    _default_validation_executor_lock = threading.Lock()
+
+    if t.TYPE_CHECKING:
+        # implemented by MessageLaunch
+
+        def _validate_state_param_and_jwt_format(self) -> str:
+            raise NotImplementedError
+
+        def validate_registration(self) -> t.Any:
+            raise NotImplementedError
+
+        def validate_state_and_nonce(self) -> t.Any:
+            raise NotImplementedError
+
+        def get_public_key(self) -> t.Tuple[str, str]:
+            raise NotImplementedError
+
+        def validate_jwt_signature(
+            self, public_key_with_alg: t.Optional[t.Tuple[str, str]] = None
+        ) -> t.Any:
+            raise NotImplementedError
+
+    def set_concurrent_validation(
+        self: T, enable: bool = True, executor: t.Optional[Executor] = None
+    ) -> T:
+        """
+        Run the independent I/O of the validation concurrently: the platform's key resolution (possibly JWKS fetch)
+        is done in background while state and nonce are checked in the current thread (launch data storage may be
+        bound to the request), they are joined before the signature check. Registration is looked up in the current
+        thread too, so the tool config's database connections aren't used by the executor's threads. Public key cache
+        storage is used by the executor's threads, so it shouldn't be bound to the thread (e.g. Django cache with the
+        database backend, as close_old_connections() isn't called for these threads).
+
+        :param enable: enable / disable concurrent validation
+        :param executor: concurrent.futures.Executor (by default: process-wide thread pool)
+        :return: MessageLaunch
+        """
+        self._concurrent_validation = enable
+        self._validation_executor = executor
+        return self
+
+    def _get_validation_executor(self) -> Executor:
+        if self._validation_executor is not None:
+            return self._validation_executor
+        with LaunchConcurrentValidationMixin._default_validation_executor_lock:
+            if LaunchConcurrentValidationMixin._default_validation_executor is None:
+                LaunchConcurrentValidationMixin._default_validation_executor = (
+                    ThreadPoolExecutor(
+                        max_workers=DEFAULT_MAX_WORKERS,
+                        thread_name_prefix="lti1p3-validation",
+                    )
+                )
+            return LaunchConcurrentValidationMixin._default_validation_executor
+
+    def _validate_concurrently(self: T) -> T:
+        # key resolution needs decoded JWT, registration could be looked up in the tool config's
+        # database, so it is done in the current thread
+        self._validate_state_param_and_jwt_format()
+        self.validate_registration()
+
+        future = self._get_validation_executor().submit(self.get_public_key)
+        try:
+            self.validate_state_and_nonce()
+        finally:
+            # task uses the launch object, so it is joined even in case of error
+            wait([future])
+
+        self.validate_jwt_signature(future.result())
+        return self
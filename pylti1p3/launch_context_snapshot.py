@@ -0,0 +1,206 @@
+import threading
+import typing as t
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+from .context_snapshot import ContextService, ContextSnapshot, TContextSnapshotData
+from .exception import LtiException
+from .launch_data_storage.session import SessionDataStorage
+from .service_connector import ServiceConnector
+from .session import SessionService
+from .utils import DEFAULT_MAX_WORKERS, map_concurrently
+
+if t.TYPE_CHECKING:
+    from .assignments_grades import AssignmentsGradesService
+    from .course_groups import CourseGroupsService
+    from .names_roles import NamesRolesProvisioningService
+
+T = t.TypeVar("T", bound="LaunchContextSnapshotMixin")
+
+
+class LaunchContextSnapshotMixin:
+    """
+    Context snapshot of the launch: data of the several services fetched concurrently, possibly in background
+    right after the launch validation (part of MessageLaunch).
+    """
+
+    _session_service: SessionService
+    _launch_id: str
+    _prefetch_services: t.Optional[t.List[str]] = None
+    _prefetch_executor: t.Optional[Executor] = None
+    _prefetch_future: t.Optional["Future[ContextSnapshot]"] = None
+    _default_prefetch_executor: t.Optional[Executor] = None
+    _default_prefetch_executor_lock = threading.Lock()
+
+    if t.TYPE_CHECKING:
+        # implemented by MessageLaunch
+
+        def get_service_connector(self) -> ServiceConnector:
+            raise NotImplementedError
+
+        def has_nrps(self) -> bool:
+            raise NotImplementedError
+
+        def has_ags(self) -> bool:
+            raise NotImplementedError
+
+        def has_cgs(self) -> bool:
+            raise NotImplementedError
+
+        def get_nrps(
+            self, service_connector: t.Optional[ServiceConnector] = None
+        ) -> "NamesRolesProvisioningService":
+            raise NotImplementedError
+
+        def get_ags(
+            self, service_connector: t.Optional[ServiceConnector] = None
+        ) -> "AssignmentsGradesService":
+            raise NotImplementedError
+
+        def get_cgs(
+            self, service_connector: t.Optional[ServiceConnector] = None
+        ) -> "CourseGroupsService":
+            raise NotImplementedError
+
+    def get_context_snapshot(
+        self, services: t.Optional[t.Sequence[str]] = None
+    ) -> ContextSnapshot:
+        """
+        Fetches data of the several services (members, groups, line items) concurrently.
+        All requests share one service connector (access tokens and HTTP connections).
+
+        :param services: list with ContextService values (by default: all services available for the current launch)
+        :return: ContextSnapshot
+        """
+        connector = self.get_service_connector()
+        if services is None:
+            services = self._get_available_context_services(connector)
+
+        fetchers: t.Dict[str, t.Callable[[], t.Any]] = {
+            ContextService.NRPS: lambda: self.get_nrps(connector).get_members(),
+            ContextService.CGS: lambda: self.get_cgs(connector).get_sets_and_groups(),
+            ContextService.AGS: lambda: self.get_ags(connector).get_lineitems(),
+        }
+        for service in services:
+            if service not in fetchers:
+                raise LtiException(f"Unknown service: {service}")
+
+        results = dict(
+            zip(
+                services,
+                map_concurrently(
+                    lambda service: fetchers[service](),
+                    services,
+                    max_workers=len(services),
+                ),
+            )
+        )
+
+        data: TContextSnapshotData = {}
+        if ContextService.NRPS in results:
+            data["members"] = results[ContextService.NRPS]
+        if ContextService.CGS in results:
+            data["sets"], data["groups"] = results[ContextService.CGS]
+        if ContextService.AGS in results:
+            data["lineitems"] = results[ContextService.AGS]
+        return ContextSnapshot(data)
+
+    def _get_available_context_services(
+        self, service_connector: t.Optional[ServiceConnector] = None
+    ) -> t.List[str]:
+        services = []
+        if self.has_nrps():
+            services.append(ContextService.NRPS)
+        if self.has_cgs():
+            services.append(ContextService.CGS)
+        if self.has_ags() and self.get_ags(service_connector).can_read_lineitem():
+            services.append(ContextService.AGS)
+        return services
+
+    def set_prefetch_policy(
+        self: T,
+        services: t.Optional[t.Sequence[str]] = None,
+        executor: t.Optional[Executor] = None,
+    ) -> T:
+        """
+        Start fetching of the context snapshot in background right after the successful launch validation.
+        The snapshot is saved into the launch data storage and could be taken by the next request
+        using MessageLaunch.from_cache(...).get_prefetched_context_snapshot().
+        Launch data storage must be shared between the requests (cache) and set before the prefetch policy,
+        session storage isn't supported.
+
+        :param services: list with ContextService values (by default: all services available for the launch)
+        :param executor: concurrent.futures.Executor (by default: process-wide thread pool)
+        :return: MessageLaunch
+        """
+        if isinstance(self._session_service.data_storage, SessionDataStorage):
+            raise LtiException(
+                "Prefetch requires launch data storage shared between requests (e.g. cache)"
+            )
+        self._prefetch_services = (
+            list(services) if services is not None else self._get_all_context_services()
+        )
+        self._prefetch_executor = executor
+        return self
+
+    @staticmethod
+    def _get_all_context_services() -> t.List[str]:
+        return [ContextService.NRPS, ContextService.CGS, ContextService.AGS]
+
+    def _get_prefetch_executor(self) -> Executor:
+        if self._prefetch_executor is not None:
+            return self._prefetch_executor
+        with LaunchContextSnapshotMixin._default_prefetch_executor_lock:
+            if LaunchContextSnapshotMixin._default_prefetch_executor is None:
+                LaunchContextSnapshotMixin._default_prefetch_executor = (
+                    ThreadPoolExecutor(
+                        max_workers=DEFAULT_MAX_WORKERS,
+                        thread_name_prefix="lti1p3-prefetch",
+                    )
+                )
+            return LaunchContextSnapshotMixin._default_prefetch_executor
+
+    def start_prefetch(self) -> t.Optional["Future[ContextSnapshot]"]:
+        """
+        Submits fetching of the context snapshot to the prefetch executor. It is called automatically
+        after validation if the prefetch policy is set. Errors are kept in the returned future only,
+        the next request could always fall back to MessageLaunch.get_context_snapshot().
+
+        :return: Future (or None if no one service is available for the launch or launch data storage
+            isn't shared between requests)
+        """
+        if isinstance(self._session_service.data_storage, SessionDataStorage):
+            # snapshot couldn't be taken by the next request, validation shouldn't fail because of it
+            return None
+        prefetch_services = (
+            self._prefetch_services
+            if self._prefetch_services is not None
+            else self._get_all_context_services()
+        )
+        available_services = self._get_available_context_services()
+        services = [s for s in prefetch_services if s in available_services]
+        if not services:
+            return None
+
+        session_service = self._session_service
+        launch_id = self._launch_id
+
+        def prefetch() -> ContextSnapshot:
+            snapshot = self.get_context_snapshot(services)
+            session_service.save_context_snapshot(launch_id, snapshot.get_data())
+            return snapshot
+
+        self._prefetch_future = self._get_prefetch_executor().submit(prefetch)
+        return self._prefetch_future
+
+    def get_prefetch_future(self) -> t.Optional["Future[ContextSnapshot]"]:
+        return self._prefetch_future
+
+    def get_prefetched_context_snapshot(self) -> t.Optional[ContextSnapshot]:
+        """
+        Returns context snapshot prefetched in background for the current launch
+        (None if it wasn't prefetched or isn't ready yet).
+
+        :return: ContextSnapshot
+        """
+        data = self._session_service.get_context_snapshot(self._launch_id)
+        return ContextSnapshot(data) if data else None
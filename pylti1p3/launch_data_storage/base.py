@@ -1,3 +1,4 @@
+import copy
 import typing as t
 from abc import ABCMeta, abstractmethod
 from ..request import Request
@@ -30,6 +31,15 @@ class LaunchDataStorage(t.Generic[T]):
     def remove_session_id(self) -> None:
         self._session_id = None
 
+    def copy_without_session_id(self) -> "LaunchDataStorage[T]":
+        """
+        Copy of the storage with the keys which are not bound to the user's session.
+        The original storage (which could be used by the launch) keeps its session id.
+        """
+        storage = copy.copy(self)
+        storage.remove_session_id()
+        return storage
+
     def _prepare_key(self, key: str) -> str:
         if self._session_id:
             if key.startswith(self._prefix):
@@ -55,6 +65,33 @@ class LaunchDataStorage(t.Generic[T]):
     def check_value(self, key: str) -> bool:
         raise NotImplementedError
 
+    def delete_value(self, key: str) -> None:
+        """
+        Storages which are able to delete the keys should override it.
+        By default the value is replaced with None (get_many() skips the keys with None values).
+        """
+        self.set_value(key, t.cast(T, None), exp=1)
+
+    def get_many(self, keys: t.Sequence[str]) -> t.Dict[str, T]:
+        """
+        Values of the found keys (keys with None values are skipped).
+        Storages which are able to get many keys per one round trip should override it.
+        """
+        res = {}
+        for key in keys:
+            value = self.get_value(key)
+            if value is not None:
+                res[key] = value
+        return res
+
+    def set_many(self, data: t.Mapping[str, T], exp: t.Optional[int] = None) -> None:
+        for key, value in data.items():
+            self.set_value(key, value, exp=exp)
+
+    def delete_many(self, keys: t.Sequence[str]) -> None:
+        for key in keys:
+            self.delete_value(key)
+
 
 class DisableSessionId:
     _session_id: t.Optional[str] = None
@@ -39,5 +39,37 @@ class CacheDataStorage(LaunchDataStorage[T], t.Generic[T]):
         key = self._prepare_key(key)
         return self._get_cache().get(key) is not None
 
+    def delete_value(self, key: str) -> None:
+        key = self._prepare_key(key)
+        self._get_cache().delete(key)
+
+    def get_many(self, keys: t.Sequence[str]) -> t.Dict[str, T]:
+        cache = self._get_cache()
+        if not hasattr(cache, "get_many"):
+            return super().get_many(keys)
+        prepared_keys = {self._prepare_key(key): key for key in keys}
+        values = cache.get_many(list(prepared_keys))
+        return {
+            prepared_keys[key]: value
+            for key, value in values.items()
+            if value is not None
+        }
+
+    def set_many(self, data: t.Mapping[str, T], exp: t.Optional[int] = None) -> None:
+        cache = self._get_cache()
+        if not hasattr(cache, "set_many"):
+            super().set_many(data, exp)
+            return
+        cache.set_many(
+            {self._prepare_key(key): value for key, value in data.items()}, exp
+        )
+
+    def delete_many(self, keys: t.Sequence[str]) -> None:
+        cache = self._get_cache()
+        if not hasattr(cache, "delete_many"):
+            super().delete_many(keys)
+            return
+        cache.delete_many([self._prepare_key(key) for key in keys])
+
     def can_set_keys_expiration(self) -> bool:
         return True
@@ -25,5 +25,9 @@ class SessionDataStorage(LaunchDataStorage[T], t.Generic[T]):
         assert self._request is not None, "Request should be set at this point"
         return key in self._request.session
 
+    def delete_value(self, key: str) -> None:
+        assert self._request is not None, "Request should be set at this point"
+        self._request.session.pop(key, None)
+
     def can_set_keys_expiration(self) -> bool:
         return False
@@ -0,0 +1,100 @@
+import time
+import typing as t
+
+from .exception import LtiException
+from .tool_config import ToolConfAbstract
+
+T = t.TypeVar("T", bound="LaunchPreValidationMixin")
+
+
+class LaunchPreValidationMixin:
+    """
+    Cheap checks of the launch before the lookups in the storage and the signature check (part of MessageLaunch).
+    """
+
+    _tool_config: ToolConfAbstract
+    _jwt_verify_options: t.Dict[str, bool]
+    _pre_validation: bool = False
+    _max_id_token_size: int = 65536
+    _time_claims_leeway: int = 0
+
+    if t.TYPE_CHECKING:
+        # implemented by MessageLaunch
+
+        def get_iss(self) -> str:
+            raise NotImplementedError
+
+        def get_client_id(self) -> str:
+            raise NotImplementedError
+
+        def _get_id_token(self) -> str:
+            raise NotImplementedError
+
+        def _get_jwt_body(self) -> t.Mapping[str, t.Any]:
+            raise NotImplementedError
+
+        def validate_jwt_format(self) -> t.Any:
+            raise NotImplementedError
+
+        def validate_message(self) -> t.Any:
+            raise NotImplementedError
+
+    def set_pre_validation(
+        self: T,
+        enable: bool = True,
+        max_id_token_size: int = 65536,
+        time_claims_leeway: int = 0,
+    ) -> T:
+        """
+        Run cheap checks (id_token size, exp / iat / nbf, message claims and iss / aud unknown to the tool config
+        without the lookups in its storage) before the state / nonce lookups in the storage and the signature check.
+        Junk launches are rejected without I/O and crypto, the claims are trusted only after the signature check
+        anyway. Deployment is checked after the signature check as it could require a lookup in the tool config.
+
+        :param enable: enable / disable pre-validation
+        :param max_id_token_size: max length of id_token
+        :param time_claims_leeway: leeway (in seconds) for exp / iat / nbf checks
+        :return: MessageLaunch
+        """
+        self._pre_validation = enable
+        self._max_id_token_size = max_id_token_size
+        self._time_claims_leeway = time_claims_leeway
+        return self
+
+    def validate_pre_checks(self: T) -> T:
+        if len(self._get_id_token()) > self._max_id_token_size:
+            raise LtiException("id_token is too large")
+        self.validate_jwt_format()
+        self.validate_time_claims()
+
+        iss = self.get_iss()
+        client_id = self.get_client_id()
+        if self._tool_config.check_registration_is_unknown(iss, client_id):
+            raise LtiException("Registration not found.")
+
+        self.validate_message()
+        return self
+
+    def validate_time_claims(self: T) -> T:
+        # the same checks as during the signature check (if they are enabled in the jwt verify options)
+        verify_signature = self._jwt_verify_options.get("verify_signature", True)
+        jwt_body = self._get_jwt_body()
+        now = time.time()
+        leeway = self._time_claims_leeway
+
+        exp = jwt_body.get("exp")
+        if self._jwt_verify_options.get("verify_exp", verify_signature):
+            if isinstance(exp, (int, float)) and exp <= now - leeway:
+                raise LtiException("id_token has expired")
+
+        nbf = jwt_body.get("nbf")
+        if self._jwt_verify_options.get("verify_nbf", verify_signature):
+            if isinstance(nbf, (int, float)) and nbf > now + leeway:
+                raise LtiException("id_token is not yet valid")
+
+        iat = jwt_body.get("iat")
+        if self._jwt_verify_options.get("verify_iat", verify_signature):
+            if isinstance(iat, (int, float)) and iat > now + leeway:
+                raise LtiException("id_token is not yet valid")
+
+        return self
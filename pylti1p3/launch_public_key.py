@@ -0,0 +1,160 @@
+import hashlib
+import time
+import typing as t
+
+import requests
+from jwcrypto.jwk import JWK  # type: ignore
+
+from .exception import LtiException
+from .json_codec import json_dumps, json_loads_response
+from .launch_data_storage.base import LaunchDataStorage
+from .registration import Registration, TKeySet
+
+T = t.TypeVar("T", bound="LaunchPublicKeyMixin")
+
+
+class LaunchPublicKeyMixin:
+    """
+    Resolution of the platform's public key used to sign the launch JWT (part of MessageLaunch).
+    """
+
+    _registration: t.Optional[Registration]
+    _jwt: t.Mapping[str, t.Any]
+    _requests_session: requests.Session
+    _public_key_cache_data_storage: t.Optional[LaunchDataStorage[t.Any]] = None
+    _public_key_cache_lifetime: t.Optional[int] = None
+    _key_set_refetch_interval: int = 60
+    _key_set_max_age: int = 7200
+
+    def set_public_key_caching(
+        self, data_storage: LaunchDataStorage[t.Any], cache_lifetime: int = 7200
+    ):
+        # key set is the same for all users of the platform, launch's storage keeps its session id
+        # (key set could be fetched concurrently with the state / nonce checks)
+        self._public_key_cache_data_storage = data_storage.copy_without_session_id()
+        self._public_key_cache_lifetime = cache_lifetime
+
+    def set_key_set_refetch_interval(self: T, interval: int) -> T:
+        """
+        Min number of seconds between the refetches of the platform's key set when the JWT is signed
+        with an unknown key (i.e. platform has rotated its keys).
+        """
+        self._key_set_refetch_interval = interval
+        return self
+
+    def set_key_set_max_age(self: T, max_age: int) -> T:
+        """
+        Max number of seconds the fetched platform's key set is kept by the registration (i.e. revoked keys
+        are accepted no longer than this). Public key cache lifetime is used instead if the caching is set.
+        """
+        self._key_set_max_age = max_age
+        return self
+
+    def _is_key_set_stale(self) -> bool:
+        assert self._registration is not None, "Registration not yet set"
+        fetched_at = self._registration.get_key_set_fetched_at()
+        if fetched_at is None:
+            # key set is set in the tool config
+            return False
+        max_age = (
+            self._public_key_cache_lifetime
+            if self._public_key_cache_data_storage
+            and self._public_key_cache_lifetime is not None
+            else self._key_set_max_age
+        )
+        return time.time() - fetched_at >= max_age
+
+    def fetch_public_key(self, key_set_url: str, use_cache: bool = True) -> TKeySet:
+        cache_key = (
+            "key-set-url-" + hashlib.md5(key_set_url.encode("utf-8")).hexdigest()
+        )
+
+        if self._public_key_cache_data_storage and use_cache:
+            public_key = self._public_key_cache_data_storage.get_value(cache_key)
+            if public_key:
+                return public_key
+
+        try:
+            resp = self._requests_session.get(key_set_url)
+        except requests.exceptions.RequestException as e:
+            raise LtiException(f"Error during fetch URL {key_set_url}: {str(e)}") from e
+        try:
+            public_key = json_loads_response(resp)
+            if self._public_key_cache_data_storage:
+                self._public_key_cache_data_storage.set_value(
+                    cache_key, public_key, self._public_key_cache_lifetime
+                )
+            return public_key
+        except ValueError as e:
+            raise LtiException(
+                f"Invalid response from {key_set_url}. Must be JSON: {resp.text}"
+            ) from e
+
+    def _find_public_key(
+        self, public_key_set: TKeySet, kid: str, alg: str
+    ) -> t.Optional[t.Tuple[str, str]]:
+        for key in public_key_set["keys"]:
+            key_kid = key.get("kid")
+            key_alg = key.get("alg", "RS256")
+            if key_kid and key_kid == kid and key_alg == alg:
+                try:
+                    key_json = json_dumps(key)
+                    jwk_obj = JWK.from_json(key_json)
+                    public_key = jwk_obj.export_to_pem()
+                    return public_key, key_alg
+                except (ValueError, TypeError) as e:
+                    raise LtiException("Can't convert JWT key to PEM format") from e
+        return None
+
+    def get_public_key(self) -> t.Tuple[str, str]:
+        assert self._registration is not None, "Registration not yet set"
+        public_key_set = self._registration.get_key_set()
+        key_set_url = self._registration.get_key_set_url()
+
+        if not public_key_set or self._is_key_set_stale():
+            assert (
+                key_set_url is not None
+            ), "If public_key_set is not set, public_set_url should be set"
+            if key_set_url.startswith(("http://", "https://")):
+                public_key_set = self.fetch_public_key(key_set_url)
+                self._registration.set_key_set(public_key_set)
+                self._registration.set_key_set_fetched_at(time.time())
+            else:
+                raise LtiException("Invalid URL: " + key_set_url)
+
+        # Find key used to sign the JWT (matches the KID in the header)
+        kid = self._jwt.get("header", {}).get("kid", None)
+        alg = self._jwt.get("header", {}).get("alg", None)
+
+        if not kid:
+            raise LtiException("JWT KID not found")
+        if not alg:
+            raise LtiException("JWT ALG not found")
+
+        # Registration could be kept by the tool config between the launches,
+        # so the key could be already converted to PEM format
+        public_key_pem = self._registration.get_public_key_pem(kid, alg)
+        if public_key_pem:
+            return public_key_pem, alg
+
+        res = self._find_public_key(public_key_set, kid, alg)
+
+        fetched_at = self._registration.get_key_set_fetched_at()
+        if (
+            res is None
+            and key_set_url
+            and fetched_at is not None
+            and time.time() - fetched_at >= self._key_set_refetch_interval
+        ):
+            # Platform could rotate its keys after the key set was fetched
+            public_key_set = self.fetch_public_key(key_set_url, use_cache=False)
+            self._registration.set_key_set(public_key_set)
+            self._registration.set_key_set_fetched_at(time.time())
+            res = self._find_public_key(public_key_set, kid, alg)
+
+        if res is None:
+            # Could not find public key with a matching kid and alg.
+            raise LtiException("Unable to find public key")
+
+        self._registration.set_public_key_pem(kid, alg, res[0])
+        return res
@@ -1,7 +1,7 @@
-import json
 import typing as t
 import typing_extensions as te
 from .exception import LtiException
+from .json_codec import json_dumps
 
 
 TSubmissionReview = te.TypedDict(
@@ -48,19 +48,38 @@ TLineItem = te.TypedDict(
 
 
 class LineItem:
-    _id: str | None = None
-    _score_maximum: float | None = None
-    _label: str | None = None
-    _resource_id: str | None = None
-    _resource_link_id: str | None = None
-    _tag: str | None = None
-    _start_date_time: str | None = None
-    _end_date_time: str | None = None
-    _grades_released: bool | None = None
-    _submission_review: TSubmissionReview | None = None
-    _submission_type: TSubmissionType | None = None
+    __slots__ = (
+        "_id",
+        "_score_maximum",
+        "_label",
+        "_resource_id",
+        "_resource_link_id",
+        "_tag",
+        "_start_date_time",
+        "_end_date_time",
+        "_grades_released",
+        "_submission_review",
+        "_submission_type",
+        "_value",
+        "_frozen",
+    )
+    _id: str | None
+    _score_maximum: float | None
+    _label: str | None
+    _resource_id: str | None
+    _resource_link_id: str | None
+    _tag: str | None
+    _start_date_time: str | None
+    _end_date_time: str | None
+    _grades_released: bool | None
+    _submission_review: TSubmissionReview | None
+    _submission_type: TSubmissionType | None
+    _value: str | None
+    _frozen: bool
 
     def __init__(self, lineitem: TLineItem | None = None):
+        self._value = None
+        self._frozen = False
         if not lineitem:
             lineitem = {}
         self._id = lineitem.get("id")
@@ -75,10 +94,26 @@ class LineItem:
         self._submission_review = lineitem.get("submissionReview")
         self._submission_type = lineitem.get(CANVAS_SUBMISSION_TYPE)
 
+    def _changed(self) -> None:
+        if self._frozen:
+            raise LtiException("Line item is frozen and can't be changed")
+        self._value = None
+
+    def freeze(self) -> "LineItem":
+        """
+        Make the line item read-only. Setters of the frozen line item raise LtiException.
+        """
+        self._frozen = True
+        return self
+
+    def is_frozen(self) -> bool:
+        return self._frozen
+
     def get_id(self) -> str | None:
         return self._id
 
     def set_id(self, value: str | None) -> "LineItem":
+        self._changed()
         self._id = value
         return self
 
@@ -92,6 +127,7 @@ class LineItem:
         """
         https://www.imsglobal.org/spec/lti-ags/v2p0/#label
         """
+        self._changed()
         self._label = value
         return self
 
@@ -114,6 +150,8 @@ class LineItem:
                 "Invalid scoreMaximum value: score must be non null value, strictly greater than 0"
             )
 
+        self._changed()
+
         self._score_maximum = value
         return self
 
@@ -127,6 +165,7 @@ class LineItem:
         """
         https://www.imsglobal.org/spec/lti-ags/v2p0/#tool-resource-identifier-resourceid
         """
+        self._changed()
         self._resource_id = value
         return self
 
@@ -140,6 +179,7 @@ class LineItem:
         """
         https://www.imsglobal.org/spec/lti-ags/v2p0#resourcelinkid-and-binding-a-line-item-to-a-resource-link
         """
+        self._changed()
         self._resource_link_id = value
         return self
 
@@ -153,6 +193,7 @@ class LineItem:
         """
         https://www.imsglobal.org/spec/lti-ags/v2p0/#tag
         """
+        self._changed()
         self._tag = value
         return self
 
@@ -166,6 +207,7 @@ class LineItem:
         """
         https://www.imsglobal.org/spec/lti-ags/v2p0/#startdatetime
         """
+        self._changed()
         self._start_date_time = value
         return self
 
@@ -179,12 +221,14 @@ class LineItem:
         """
         https://www.imsglobal.org/spec/lti-ags/v2p0/#enddatetime
         """
+        self._changed()
         self._end_date_time = value
         return self
 
     def set_grades_released(self, value: bool | None) -> "LineItem":
         if value is not None and not isinstance(value, bool):
             raise ValueError("grades_released must be a boolean value")
+        self._changed()
         self._grades_released = value
         return self
 
@@ -204,15 +248,16 @@ class LineItem:
         if not isinstance(reviewable_status, list):
             raise Exception('Invalid "reviewable_status" argument')
 
+        self._changed()
         self._submission_review: TSubmissionReview = {
-            "reviewableStatus": reviewable_status
+            "reviewableStatus": list(reviewable_status)
         }
         if label:
             self._submission_review["label"] = label
         if url:
             self._submission_review["url"] = url
         if custom:
-            self._submission_review["custom"] = custom
+            self._submission_review["custom"] = dict(custom)
 
         return self
     
@@ -223,6 +268,7 @@ class LineItem:
         """This is a Canvas extension to support creating assignments linked to the external tools."""
         if _type not in ["none", "external_tool"]:
             raise Exception('Invalid "type" argument. Must be "none" or "external_tool"')
+        self._changed()
         if _type == "none":
             self._submission_type = TSubmissionType(type=_type)
         else:
@@ -241,7 +287,11 @@ class LineItem:
         `null` values in the JSON.
         https://www.imsglobal.org/spec/lti-ags/v2p0/#updating-a-line-item
         https://www.imsglobal.org/spec/lti-ags/v2p0/openapi/#/default
+
+        The result is cached until the line item is changed using setters.
         """
+        if self._value is not None:
+            return self._value
         data = {
             "scoreMaximum": self._score_maximum,
             "label": self._label,
@@ -254,4 +304,5 @@ class LineItem:
             "submissionReview": self._submission_review,
             CANVAS_SUBMISSION_TYPE: self._submission_type,
         }
-        return json.dumps(data)
+        self._value = json_dumps(data)
+        return self._value
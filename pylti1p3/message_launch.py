@@ -1,6 +1,5 @@
 import base64
 import hashlib
-import json
 import typing as t
 import uuid
 from abc import ABCMeta, abstractmethod
@@ -8,7 +7,6 @@ from abc import ABCMeta, abstractmethod
 import jwt  # type: ignore
 import requests
 import typing_extensions as te
-from jwcrypto.jwk import JWK  # type: ignore
 
 from .actions import Action
 from .assignments_grades import AssignmentsGradesService, TAssignmentsGradersData
@@ -16,7 +14,12 @@ from .cookie import CookieService
 from .course_groups import CourseGroupsService, TGroupsServiceData
 from .deep_link import DeepLink, TDeepLinkData
 from .exception import LtiException
-from .launch_data_storage.base import DisableSessionId, LaunchDataStorage
+from .json_codec import json_loads
+from .launch_concurrent_validation import LaunchConcurrentValidationMixin
+from .launch_context_snapshot import LaunchContextSnapshotMixin
+from .launch_data_storage.base import LaunchDataStorage
+from .launch_pre_validation import LaunchPreValidationMixin
+from .launch_public_key import LaunchPublicKeyMixin
 from .message_validators import get_validators
 from .message_validators.deep_link import DeepLinkMessageValidator
 from .message_validators.privacy_launch import PrivacyLaunchValidator
@@ -32,11 +35,12 @@ from .roles import (
     ObserverRole,
     TransientRole,
 )
-from .registration import Registration, TKeySet
+from .registration import Registration
 from .request import Request
 from .session import SessionService
-from .service_connector import ServiceConnector, REQUESTS_USER_AGENT
+from .service_connector import ServiceConnector, make_requests_session
 from .tool_config import ToolConfAbstract
+from .utils import is_overridden
 
 
 TResourceLinkClaim = te.TypedDict(
@@ -139,7 +143,10 @@ TLaunchData = te.TypedDict(
         "https://purl.imsglobal.org/spec/lti/claim/resource_link": TResourceLinkClaim,
         "https://purl.imsglobal.org/spec/lti/claim/roles": t.List[str],
         "sub": str,
+        "exp": int,
+        "iat": int,
         # Optional data
+        "nbf": int,
         "given_name": str,
         "family_name": str,
         "name": str,
@@ -183,7 +190,13 @@ SES = t.TypeVar("SES", bound=SessionService)
 COOK = t.TypeVar("COOK", bound=CookieService)
 
 
-class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
+class MessageLaunch(
+    LaunchPublicKeyMixin,
+    LaunchContextSnapshotMixin,
+    LaunchPreValidationMixin,
+    LaunchConcurrentValidationMixin,
+    t.Generic[REQ, TCONF, SES, COOK],
+):
     __metaclass__ = ABCMeta
     _request: REQ
     _tool_config: TCONF
@@ -197,8 +210,9 @@ class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
     _auto_validation: bool = True
     _restored: bool = False
     _id_token_hash: t.Optional[str]
-    _public_key_cache_data_storage: t.Optional[LaunchDataStorage[t.Any]] = None
-    _public_key_cache_lifetime: t.Optional[int] = None
+    _coalesce_service_requests: bool = False
+    _service_response_cache_data_storage: t.Optional[LaunchDataStorage[t.Any]] = None
+    _service_response_cache_ttls: t.Optional[t.Dict[str, int]] = None
 
     def __init__(
         self,
@@ -226,11 +240,16 @@ class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
         self._restored = False
         self._public_key_cache_data_storage = None
         self._public_key_cache_lifetime = None
+        self._coalesce_service_requests = False
+        self._service_response_cache_data_storage = None
+        self._service_response_cache_ttls = None
+        self._prefetch_services = None
+        self._prefetch_executor = None
+        self._prefetch_future = None
         if requests_session:
             self._requests_session = requests_session
         else:
-            self._requests_session = requests.Session()
-            self._requests_session.headers["User-Agent"] = REQUESTS_USER_AGENT
+            self._requests_session = make_requests_session()
 
         if launch_data_storage:
             self.set_launch_data_storage(launch_data_storage)
@@ -311,19 +330,27 @@ class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
             raise LtiException("Can't validate restored launch")
         self._validated = True
         try:
-            return (
-                self.validate_state()
-                .validate_jwt_format()
-                .validate_nonce()
-                .validate_registration()
-                .validate_jwt_signature()
-                .validate_deployment()
-                .validate_message()
-                .save_launch_data()
-            )
+            if self._pre_validation:
+                self.validate_pre_checks()
+            if self._concurrent_validation:
+                self._validate_concurrently()
+            else:
+                (
+                    self.validate_state_and_nonce()
+                    .validate_registration()
+                    .validate_jwt_signature()
+                )
+            # deployment could be looked up in the tool config's database, so it isn't a pre-check
+            self.validate_deployment()
+            if not self._pre_validation:
+                self.validate_message()
+            self.save_launch_data()
         except Exception:
             self._validated = False
             raise
+        if self._prefetch_services is not None:
+            self.start_prefetch()
+        return self
 
     def _get_jwt_body(self) -> TLaunchData:
         if not self._validated and self._auto_validation:
@@ -357,9 +384,36 @@ class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
             raise LtiException("deployment_id is not set in jwt body")
         return deployment_id
 
+    def set_coalesce_service_requests(self, enable: bool = True) -> "MessageLaunch":
+        """
+        Coalesce identical concurrent GET requests to the platform services (see ServiceConnector).
+        """
+        self._coalesce_service_requests = enable
+        return self
+
+    def set_service_response_cache(
+        self,
+        data_storage: LaunchDataStorage[t.Any],
+        ttls: t.Optional[t.Dict[str, int]] = None,
+    ) -> "MessageLaunch":
+        """
+        Cache responses of the platform services in the shared data storage (see ServiceConnector).
+        """
+        self._service_response_cache_data_storage = data_storage
+        self._service_response_cache_ttls = ttls
+        return self
+
     def get_service_connector(self) -> ServiceConnector:
         assert self._registration is not None, "Registration not yet set"
-        return ServiceConnector(self._registration, self._requests_session)
+        connector = ServiceConnector(
+            self._registration, self._requests_session
+        ).set_coalesce_requests(self._coalesce_service_requests)
+        if self._service_response_cache_data_storage:
+            connector.set_response_cache(
+                self._service_response_cache_data_storage,
+                self._service_response_cache_ttls,
+            )
+        return connector
 
     def has_nrps(self) -> bool:
         """
@@ -374,14 +428,17 @@ class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
             is not None
         )
 
-    def get_nrps(self) -> NamesRolesProvisioningService:
+    def get_nrps(
+        self, service_connector: t.Optional[ServiceConnector] = None
+    ) -> NamesRolesProvisioningService:
         """
         Fetches an instance of the names and roles service for the current launch.
 
+        :param service_connector: ServiceConnector instance (optional, a new one is created by default)
         :return: NamesRolesProvisioningService
         """
         assert self._registration is not None, "Registration not yet set"
-        connector = self.get_service_connector()
+        connector = service_connector or self.get_service_connector()
         names_role_service = self._get_jwt_body().get(
             "https://purl.imsglobal.org/spec/lti-nrps/claim/namesroleservice"
         )
@@ -402,14 +459,17 @@ class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
             is not None
         )
 
-    def get_ags(self) -> AssignmentsGradesService:
+    def get_ags(
+        self, service_connector: t.Optional[ServiceConnector] = None
+    ) -> AssignmentsGradesService:
         """
         Fetches an instance of the assignments and grades service for the current launch.
 
+        :param service_connector: ServiceConnector instance (optional, a new one is created by default)
         :return: AssignmentsGradesService
         """
         assert self._registration is not None, "Registration not yet set"
-        connector = self.get_service_connector()
+        connector = service_connector or self.get_service_connector()
         endpoint = self._get_jwt_body().get(
             "https://purl.imsglobal.org/spec/lti-ags/claim/endpoint"
         )
@@ -428,14 +488,17 @@ class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
         )
         return groups_service_data.get("context_groups_url", None) is not None
 
-    def get_cgs(self) -> CourseGroupsService:
+    def get_cgs(
+        self, service_connector: t.Optional[ServiceConnector] = None
+    ) -> CourseGroupsService:
         """
         Fetches an instance of the course groups service for the current launch.
 
+        :param service_connector: ServiceConnector instance (optional, a new one is created by default)
         :return:
         """
         assert self._registration is not None, "Registration not yet set"
-        connector = self.get_service_connector()
+        connector = service_connector or self.get_service_connector()
         groups_service_data = self._get_jwt_body().get(
             "https://purl.imsglobal.org/spec/lti-gs/claim/groupsservice"
         )
@@ -548,80 +611,6 @@ class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
         tmp = val.translate(str.maketrans("-_", "+/"))  # type: ignore
         return base64.b64decode(tmp).decode("utf-8")  # type: ignore
 
-    def set_public_key_caching(
-        self, data_storage: LaunchDataStorage[t.Any], cache_lifetime: int = 7200
-    ):
-        self._public_key_cache_data_storage = data_storage
-        self._public_key_cache_lifetime = cache_lifetime
-
-    def fetch_public_key(self, key_set_url: str) -> TKeySet:
-        cache_key = (
-            "key-set-url-" + hashlib.md5(key_set_url.encode("utf-8")).hexdigest()
-        )
-
-        with DisableSessionId(self._public_key_cache_data_storage):
-            if self._public_key_cache_data_storage:
-                public_key = self._public_key_cache_data_storage.get_value(cache_key)
-                if public_key:
-                    return public_key
-
-            try:
-                resp = self._requests_session.get(key_set_url)
-            except requests.exceptions.RequestException as e:
-                raise LtiException(
-                    f"Error during fetch URL {key_set_url}: {str(e)}"
-                ) from e
-            try:
-                public_key = resp.json()
-                if self._public_key_cache_data_storage:
-                    self._public_key_cache_data_storage.set_value(
-                        cache_key, public_key, self._public_key_cache_lifetime
-                    )
-                return public_key
-            except ValueError as e:
-                raise LtiException(
-                    f"Invalid response from {key_set_url}. Must be JSON: {resp.text}"
-                ) from e
-
-    def get_public_key(self) -> t.Tuple[str, str]:
-        assert self._registration is not None, "Registration not yet set"
-        public_key_set = self._registration.get_key_set()
-        key_set_url = self._registration.get_key_set_url()
-
-        if not public_key_set:
-            assert (
-                key_set_url is not None
-            ), "If public_key_set is not set, public_set_url should be set"
-            if key_set_url.startswith(("http://", "https://")):
-                public_key_set = self.fetch_public_key(key_set_url)
-                self._registration.set_key_set(public_key_set)
-            else:
-                raise LtiException("Invalid URL: " + key_set_url)
-
-        # Find key used to sign the JWT (matches the KID in the header)
-        kid = self._jwt.get("header", {}).get("kid", None)
-        alg = self._jwt.get("header", {}).get("alg", None)
-
-        if not kid:
-            raise LtiException("JWT KID not found")
-        if not alg:
-            raise LtiException("JWT ALG not found")
-
-        for key in public_key_set["keys"]:
-            key_kid = key.get("kid")
-            key_alg = key.get("alg", "RS256")
-            if key_kid and key_kid == kid and key_alg == alg:
-                try:
-                    key_json = json.dumps(key)
-                    jwk_obj = JWK.from_json(key_json)
-                    public_key = jwk_obj.export_to_pem()
-                    return public_key, key_alg
-                except (ValueError, TypeError) as e:
-                    raise LtiException("Can't convert JWT key to PEM format") from e
-
-        # Could not find public key with a matching kid and alg.
-        raise LtiException("Unable to find public key")
-
     def validate_state(self) -> "MessageLaunch":
         # Check State for OIDC.
         state_from_request = self._get_request_param("state")
@@ -632,10 +621,59 @@ class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
         if not self._session_service.check_state_is_valid(
             state_from_request, id_token_hash
         ):
-            state_from_cookie = self._cookie_service.get_cookie(state_from_request)
-            if state_from_request != state_from_cookie:
-                # Error if state doesn't match.
-                raise LtiException("State not found")
+            self._validate_state_cookie(state_from_request)
+
+        return self
+
+    def _validate_state_cookie(self, state_from_request: str) -> None:
+        state_from_cookie = self._cookie_service.get_cookie(state_from_request)
+        if state_from_request != state_from_cookie:
+            # Error if state doesn't match.
+            raise LtiException("State not found")
+
+    def _validate_state_param_and_jwt_format(self) -> str:
+        state_from_request = self._get_request_param("state")
+        if not state_from_request:
+            raise LtiException("Missing state param")
+
+        if not self._pre_validation and "body" not in self._jwt:
+            try:
+                self.validate_jwt_format()
+            except LtiException:
+                # invalid state is reported first
+                self.validate_state()
+                raise
+        return state_from_request
+
+    def validate_state_and_nonce(self) -> "MessageLaunch":
+        """
+        Same as validate_state(), validate_jwt_format() and validate_nonce() (and the same errors in the same
+        order) but state and nonce are looked up in the launch data storage with the one get_many() call
+        (unless these methods are overridden).
+        """
+        if is_overridden(
+            self,
+            MessageLaunch,
+            "validate_state",
+            "validate_jwt_format",
+            "validate_nonce",
+        ):
+            return self.validate_state().validate_jwt_format().validate_nonce()
+
+        state_from_request = self._validate_state_param_and_jwt_format()
+
+        nonce = self._get_jwt_body().get("nonce")
+        if not nonce:
+            self.validate_state()
+            raise LtiException('"nonce" is empty')
+
+        state_is_valid, nonce_is_valid = self._session_service.check_state_and_nonce(
+            state_from_request, self._get_id_token_hash(), nonce
+        )
+        if not state_is_valid:
+            self._validate_state_cookie(state_from_request)
+        if not nonce_is_valid:
+            raise LtiException("Invalid Nonce")
 
         return self
 
@@ -650,11 +688,11 @@ class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
         try:
             # Decode JWT headers.
             header = self.urlsafe_b64decode(jwt_parts[0])
-            self._jwt["header"] = json.loads(header)
+            self._jwt["header"] = json_loads(header)
 
             # Decode JWT body.
             body = self.urlsafe_b64decode(jwt_parts[1])
-            self._jwt["body"] = json.loads(body)
+            self._jwt["body"] = json_loads(body)
         except Exception as e:
             raise LtiException("Invalid JWT format, can't be decoded") from e
 
@@ -682,6 +720,10 @@ class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
         config: ToolConfAbstract[REQ] = self._tool_config
         req: REQ = self._request
 
+        # Reject unknown platforms without lookups in the tool config storage
+        if config.check_registration_is_unknown(iss, client_id):
+            raise LtiException("Registration not found.")
+
         # Find registration
         if config.check_iss_has_one_client(iss):
             self._registration = config.find_registration(
@@ -705,11 +747,13 @@ class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
 
         return self
 
-    def validate_jwt_signature(self) -> "MessageLaunch":
+    def validate_jwt_signature(
+        self, public_key_with_alg: t.Optional[t.Tuple[str, str]] = None
+    ) -> "MessageLaunch":
         id_token = self._get_id_token()
 
         # Fetch public key object
-        public_key, key_alg = self.get_public_key()
+        public_key, key_alg = public_key_with_alg or self.get_public_key()
 
         try:
             jwt.decode(
@@ -787,8 +831,9 @@ class MessageLaunch(t.Generic[REQ, TCONF, SES, COOK]):
         state_from_request = self._get_request_param("state")
         id_token_hash = self._get_id_token_hash()
 
-        self._session_service.save_launch_data(self._launch_id, self._jwt["body"])
-        self._session_service.set_state_valid(state_from_request, id_token_hash)
+        self._session_service.save_launch_data_and_state_valid(
+            self._launch_id, self._jwt["body"], state_from_request, id_token_hash
+        )
         return self
 
     def get_params_from_login(self):
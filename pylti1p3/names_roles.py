@@ -1,6 +1,7 @@
 import typing as t
 import typing_extensions as te
 from .utils import add_param_to_url
+from .roster import Roster
 from .service_connector import ServiceConnector
 
 TNamesAndRolesData = te.TypedDict(
@@ -26,6 +27,7 @@ TMember = te.TypedDict(
         "roles": t.List[str],
         "message": t.Union[t.List[t.Dict[str, object]], t.Dict[str, object]],
         "lti11_legacy_user_id": t.Optional[str],
+        "group_enrollments": t.List[t.Dict[str, str]],
     },
     total=False,
 )
@@ -75,6 +77,28 @@ class NamesRolesProvisioningService:
         :return: list
         """
         members_res_lst: t.List[TMember] = []
+        for members in self._iter_members_pages(resource_link_id):
+            members_res_lst.extend(members)
+        return members_res_lst
+
+    def get_roster(
+        self, resource_link_id: t.Optional[str] = None, keep_messages: bool = False
+    ) -> Roster:
+        """
+        Get all users as Roster (compact storage with the fast lookups by user_id and role).
+
+        :param resource_link_id: resource link id (optional)
+        :param keep_messages: keep "message" claims of the users
+        :return: Roster
+        """
+        roster = Roster(keep_messages=keep_messages)
+        for members in self._iter_members_pages(resource_link_id):
+            roster.extend(members)
+        return roster
+
+    def _iter_members_pages(
+        self, resource_link_id: t.Optional[str] = None
+    ) -> t.Iterator[t.List[TMember]]:
         members_url: t.Optional[str] = self._service_data["context_memberships_url"]
 
         if members_url and resource_link_id:
@@ -82,9 +106,7 @@ class NamesRolesProvisioningService:
 
         while members_url:
             members, members_url = self.get_members_page(members_url)
-            members_res_lst.extend(members)
-
-        return members_res_lst
+            yield members
 
     def get_context(self):
         """
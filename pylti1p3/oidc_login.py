@@ -104,9 +104,9 @@ class OIDCLogin(t.Generic[REQ, TCONF, SES, COOK, RED]):
 
         # generate nonce
         nonce = self._generate_nonce()
-        self._session_service.save_nonce(nonce)
-        if self._state_params:
-            self._session_service.save_state_params(state, self._state_params)
+        self._session_service.save_nonce_and_state_params(
+            nonce, state, self._state_params
+        )
 
         # build Response
         client_id = self._registration.get_client_id()  # Registered client id
@@ -176,6 +176,10 @@ class OIDCLogin(t.Generic[REQ, TCONF, SES, COOK, RED]):
 
         client_id = self._get_request_param("client_id")
 
+        # reject unknown platforms without lookups in the tool config storage
+        if self._tool_config.check_registration_is_unknown(iss, client_id or None):
+            raise OIDCException("Could not find registration details")
+
         # fetch registration details
         if self._tool_config.check_iss_has_one_client(iss):
             registration = self._tool_config.find_registration(
@@ -1,7 +1,7 @@
-import json
 import typing as t
 import typing_extensions as te
 from jwcrypto.jwk import JWK  # type: ignore
+from .json_codec import json_loads
 
 
 TKey = te.TypedDict("TKey", {"kid": str, "alg": str}, total=True)
@@ -18,6 +18,9 @@ class Registration:
     _tool_private_key: t.Optional[str] = None
     _auth_audience: t.Optional[str] = None
     _tool_public_key = None
+    _tool_public_jwk: t.Optional[t.Mapping[str, t.Any]] = None
+    _key_set_fetched_at: t.Optional[float] = None
+    _public_keys_pem: t.Optional[t.Dict[t.Tuple[str, str], str]] = None
 
     def get_issuer(self) -> t.Optional[str]:
         return self._issuer
@@ -38,6 +41,29 @@ class Registration:
 
     def set_key_set(self, key_set: t.Optional[TKeySet]) -> "Registration":
         self._key_set = key_set
+        self._public_keys_pem = None
+        return self
+
+    def get_key_set_fetched_at(self) -> t.Optional[float]:
+        """
+        Time when the key set was fetched from the key set URL (None if key set wasn't fetched).
+        """
+        return self._key_set_fetched_at
+
+    def set_key_set_fetched_at(self, fetched_at: t.Optional[float]) -> "Registration":
+        self._key_set_fetched_at = fetched_at
+        return self
+
+    def get_public_key_pem(self, kid: str, alg: str) -> t.Optional[str]:
+        """
+        Platform's public key (from the key set) converted to PEM format before.
+        """
+        return self._public_keys_pem.get((kid, alg)) if self._public_keys_pem else None
+
+    def set_public_key_pem(self, kid: str, alg: str, pem: str) -> "Registration":
+        if self._public_keys_pem is None:
+            self._public_keys_pem = {}
+        self._public_keys_pem[(kid, alg)] = pem
         return self
 
     def get_key_set_url(self) -> t.Optional[str]:
@@ -80,26 +106,32 @@ class Registration:
 
     def set_tool_public_key(self, tool_public_key) -> "Registration":
         self._tool_public_key = tool_public_key
+        self._tool_public_jwk = None
         return self
 
+    def _get_tool_public_jwk(self) -> t.Optional[t.Mapping[str, t.Any]]:
+        public_key = self.get_tool_public_key()
+        if not public_key:
+            return None
+        if self._tool_public_jwk is None:
+            self._tool_public_jwk = Registration.get_jwk(public_key)
+        return self._tool_public_jwk
+
     @classmethod
     def get_jwk(cls, public_key: str) -> t.Mapping[str, t.Any]:
         jwk_obj = JWK.from_pem(public_key.encode("utf-8"))
-        public_jwk = json.loads(jwk_obj.export_public())
+        public_jwk = json_loads(jwk_obj.export_public())
         public_jwk["alg"] = "RS256"
         public_jwk["use"] = "sig"
         return public_jwk
 
     def get_jwks(self) -> t.List[t.Mapping[str, t.Any]]:
-        keys = []
-        public_key = self.get_tool_public_key()
-        if public_key:
-            keys.append(Registration.get_jwk(public_key))
+        keys: t.List[t.Mapping[str, t.Any]] = []
+        jwk = self._get_tool_public_jwk()
+        if jwk:
+            keys.append(dict(jwk))
         return keys
 
     def get_kid(self) -> t.Optional[str]:
-        key = self.get_tool_public_key()
-        if key:
-            jwk = Registration.get_jwk(key)
-            return jwk.get("kid") if jwk else None
-        return None
+        jwk = self._get_tool_public_jwk()
+        return jwk.get("kid") if jwk else None
@@ -0,0 +1,168 @@
+import sys
+import typing as t
+
+from .roles import AbstractRole
+
+if t.TYPE_CHECKING:
+    from .names_roles import TMember
+
+TRoleFilter = t.Union[str, t.Type[AbstractRole]]
+
+ROLES_CLAIM = "https://purl.imsglobal.org/spec/lti/claim/roles"
+
+
+class RosterMember:
+    __slots__ = (
+        "user_id",
+        "status",
+        "name",
+        "given_name",
+        "family_name",
+        "middle_name",
+        "email",
+        "picture",
+        "lis_person_sourcedid",
+        "lti11_legacy_user_id",
+        "message",
+        "roles",
+        "roles_mask",
+    )
+
+    def __init__(
+        self,
+        member: "TMember",
+        roles: t.Tuple[str, ...],
+        roles_mask: int,
+        keep_message: bool = False,
+    ):
+        get = t.cast(t.Callable[[str], t.Any], member.get)
+        self.user_id = get("user_id")
+        status = get("status")
+        self.status = sys.intern(status) if status else status
+        self.name = get("name")
+        self.given_name = get("given_name")
+        self.family_name = get("family_name")
+        self.middle_name = get("middle_name")
+        self.email = get("email")
+        self.picture = get("picture")
+        self.lis_person_sourcedid = get("lis_person_sourcedid")
+        self.lti11_legacy_user_id = get("lti11_legacy_user_id")
+        self.message = get("message") if keep_message else None
+        self.roles = roles
+        self.roles_mask = roles_mask
+
+    def has_role_mask(self, mask: int) -> bool:
+        return bool(self.roles_mask & mask)
+
+    def to_dict(self) -> "TMember":
+        res = {k: getattr(self, k) for k in self.__slots__ if k != "roles_mask"}
+        res["roles"] = list(self.roles)
+        return t.cast("TMember", {k: v for k, v in res.items() if v is not None})
+
+
+class Roster:
+    """
+    Compact NRPS members storage with O(1) lookup by user_id / lis_person_sourcedid.
+    Every distinct role string is stored once and presented as one bit in the member's role mask.
+    """
+
+    _members: t.List[RosterMember]
+    _by_user_id: t.Dict[str, RosterMember]
+    _by_sourcedid: t.Dict[str, RosterMember]
+    _role_bits: t.Dict[str, int]
+    _roles_cache: t.Dict[t.Tuple[str, ...], t.Tuple[t.Tuple[str, ...], int]]
+    _role_cls_masks: t.Dict[t.Type[AbstractRole], t.Tuple[int, int]]
+    _keep_messages: bool
+
+    def __init__(
+        self, members: t.Iterable["TMember"] = (), keep_messages: bool = False
+    ):
+        """
+        :param members: NRPS members
+        :param keep_messages: keep "message" claims of the members (skipped by default to save memory)
+        """
+        self._members = []
+        self._by_user_id = {}
+        self._by_sourcedid = {}
+        self._role_bits = {}
+        self._roles_cache = {}
+        self._role_cls_masks = {}
+        self._keep_messages = keep_messages
+        self.extend(members)
+
+    def _get_roles(self, roles: t.List[str]) -> t.Tuple[t.Tuple[str, ...], int]:
+        roles_key = tuple(roles)
+        cached = self._roles_cache.get(roles_key)
+        if cached is None:
+            mask = 0
+            for role in roles_key:
+                bit = self._role_bits.get(role)
+                if bit is None:
+                    bit = self._role_bits[sys.intern(role)] = 1 << len(self._role_bits)
+                mask |= bit
+            cached = self._roles_cache[roles_key] = (
+                tuple(sys.intern(r) for r in roles_key),
+                mask,
+            )
+        return cached
+
+    def add(self, member: "TMember") -> RosterMember:
+        roles, roles_mask = self._get_roles(member.get("roles", []))
+        roster_member = RosterMember(member, roles, roles_mask, self._keep_messages)
+        self._members.append(roster_member)
+        if roster_member.user_id is not None:
+            self._by_user_id[roster_member.user_id] = roster_member
+        if roster_member.lis_person_sourcedid is not None:
+            self._by_sourcedid[roster_member.lis_person_sourcedid] = roster_member
+        return roster_member
+
+    def extend(self, members: t.Iterable["TMember"]) -> "Roster":
+        for member in members:
+            self.add(member)
+        return self
+
+    def get_by_user_id(self, user_id: str) -> t.Optional[RosterMember]:
+        return self._by_user_id.get(user_id)
+
+    def get_by_sourcedid(self, lis_person_sourcedid: str) -> t.Optional[RosterMember]:
+        return self._by_sourcedid.get(lis_person_sourcedid)
+
+    def get_roles(self) -> t.List[str]:
+        return list(self._role_bits)
+
+    def get_role_mask(self, role: TRoleFilter) -> int:
+        """
+        Mask for the role URI or for the role class (i.e. pylti1p3.roles.StudentRole).
+        """
+        if isinstance(role, str):
+            return self._role_bits.get(role, 0)
+
+        cached = self._role_cls_masks.get(role)
+        if cached and cached[0] == len(self._role_bits):
+            return cached[1]
+        mask = 0
+        for role_str, bit in self._role_bits.items():
+            if role({ROLES_CLAIM: [role_str]}).check():
+                mask |= bit
+        self._role_cls_masks[role] = (len(self._role_bits), mask)
+        return mask
+
+    def filter_by_role(self, *roles: TRoleFilter) -> t.List[RosterMember]:
+        """
+        Members which have at least one of the passed roles.
+        """
+        mask = 0
+        for role in roles:
+            mask |= self.get_role_mask(role)
+        if not mask:
+            return []
+        return [m for m in self._members if m.roles_mask & mask]
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __iter__(self) -> t.Iterator[RosterMember]:
+        return iter(self._members)
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._by_user_id
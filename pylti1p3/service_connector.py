@@ -1,14 +1,20 @@
+import copy
 import hashlib
 import re
+import threading
 import time
 import typing as t
 import uuid
+from concurrent.futures import Future
 
 import jwt  # type: ignore
 import requests
 import typing_extensions as te
+from requests.structures import CaseInsensitiveDict
 
 from .exception import LtiException, LtiServiceException
+from .json_codec import json_loads_response
+from .launch_data_storage.base import LaunchDataStorage
 from .registration import Registration
 
 TServiceConnectorResponse = te.TypedDict(
@@ -23,10 +29,35 @@ TServiceConnectorResponse = te.TypedDict(
 
 REQUESTS_USER_AGENT = "PyLTI1p3-client"
 
+TInflightRequestKey = t.Tuple[t.Optional[str], t.Optional[str], str, str, str, bool]
+
+# How long (in seconds) responses of the services are cached (by media type)
+DEFAULT_RESPONSE_CACHE_TTLS: t.Dict[str, int] = {
+    "application/vnd.ims.lti-nrps.v2.membershipcontainer+json": 300,
+    "application/vnd.ims.lti-gs.v1.contextgroupcontainer+json": 300,
+    "application/vnd.ims.lis.v2.lineitemcontainer+json": 60,
+    "application/vnd.ims.lis.v2.lineitem+json": 60,
+}
+
+
+def make_requests_session() -> requests.Session:
+    requests_session = requests.Session()
+    requests_session.headers["User-Agent"] = REQUESTS_USER_AGENT
+    return requests_session
+
 
 class ServiceConnector:
     _registration: Registration
     _access_tokens: t.Dict[str, str]
+    _access_tokens_lock: threading.Lock
+    _coalesce_requests: bool = False
+    _response_cache_data_storage: t.Optional[LaunchDataStorage[t.Any]] = None
+    _response_cache_ttls: t.Dict[str, int]
+    # GET requests which are being made right now by all connectors of the process
+    _inflight_requests: t.Dict[
+        TInflightRequestKey, "Future[TServiceConnectorResponse]"
+    ] = {}
+    _inflight_requests_lock = threading.Lock()
 
     def __init__(
         self,
@@ -35,11 +66,81 @@ class ServiceConnector:
     ):
         self._registration = registration
         self._access_tokens = {}
+        self._access_tokens_lock = threading.Lock()
+        self._coalesce_requests = False
+        self._response_cache_data_storage = None
+        self._response_cache_ttls = {}
         if requests_session:
             self._requests_session = requests_session
         else:
-            self._requests_session = requests.Session()
-            self._requests_session.headers["User-Agent"] = REQUESTS_USER_AGENT
+            self._requests_session = make_requests_session()
+
+    def get_registration(self) -> Registration:
+        return self._registration
+
+    def set_coalesce_requests(self, enable: bool = True) -> "ServiceConnector":
+        """
+        Identical GET requests (the same registration, URL, scopes and accept header) made concurrently
+        by any connectors of the process are coalesced: only one HTTP request is made and all callers
+        get a copy of its response.
+        """
+        self._coalesce_requests = enable
+        return self
+
+    def set_response_cache(
+        self,
+        data_storage: LaunchDataStorage[t.Any],
+        ttls: t.Optional[t.Dict[str, int]] = None,
+    ) -> "ServiceConnector":
+        """
+        Cache decoded responses of the GET requests in the data storage shared between processes (i.e. cache).
+        Responses are cached per registration, URL, scopes and media type.
+
+        :param data_storage: LaunchDataStorage instance (i.e. cache data storage)
+        :param ttls: dict with cache lifetime (in seconds) by accepted media type,
+            only responses of these media types are cached (DEFAULT_RESPONSE_CACHE_TTLS by default)
+        :return: ServiceConnector
+        """
+        # GET responses are the same for all users of the registration
+        self._response_cache_data_storage = data_storage.copy_without_session_id()
+        self._response_cache_ttls = dict(
+            ttls if ttls is not None else DEFAULT_RESPONSE_CACHE_TTLS
+        )
+        return self
+
+    def invalidate_cached_responses(self) -> None:
+        """
+        Drop all cached responses of the current registration (i.e. after line item was changed).
+        """
+        if self._response_cache_data_storage and self._response_cache_ttls:
+            self._response_cache_data_storage.set_value(
+                self._get_response_cache_generation_key(),
+                uuid.uuid4().hex,
+                max(self._response_cache_ttls.values()),
+            )
+
+    def _get_registration_cache_key(self) -> str:
+        registration_str = "|".join(
+            [
+                self._registration.get_issuer() or "",
+                self._registration.get_client_id() or "",
+            ]
+        )
+        return hashlib.md5(registration_str.encode("utf-8")).hexdigest()
+
+    def _get_response_cache_generation_key(self) -> str:
+        return "service-response-generation-" + self._get_registration_cache_key()
+
+    def _get_response_cache_key(
+        self, scopes: t.Sequence[str], url: str, accept: str
+    ) -> str:
+        key_str = "|".join([url, " ".join(sorted(scopes)), accept])
+        return (
+            "service-response-"
+            + self._get_registration_cache_key()
+            + "-"
+            + hashlib.md5(key_str.encode("utf-8")).hexdigest()
+        )
 
     def get_access_token(self, scopes: t.Sequence[str]) -> str:
         # Don't fetch the same key more than once
@@ -52,6 +153,13 @@ class ServiceConnector:
         if scope_key in self._access_tokens:
             return self._access_tokens[scope_key]
 
+        # Connector could be shared between threads, so only one of them should make a request to the platform
+        with self._access_tokens_lock:
+            if scope_key not in self._access_tokens:
+                self._access_tokens[scope_key] = self._fetch_access_token(scopes)
+        return self._access_tokens[scope_key]
+
+    def _fetch_access_token(self, scopes: t.Sequence[str]) -> str:
         # Build up JWT to exchange for an auth token
         client_id = self._registration.get_client_id()
         assert client_id is not None, "client_id should be set at this point"
@@ -89,10 +197,8 @@ class ServiceConnector:
         r = self._requests_session.post(auth_url, data=auth_request)
         if not r.ok:
             raise LtiServiceException(r)
-        response = r.json()
-
-        self._access_tokens[scope_key] = response["access_token"]
-        return self._access_tokens[scope_key]
+        response = json_loads_response(r)
+        return response["access_token"]
 
     def encode_jwt(
         self,
@@ -114,6 +220,110 @@ class ServiceConnector:
         content_type: str = "application/json",
         accept: str = "application/json",
         case_insensitive_headers: bool = False,
+    ) -> TServiceConnectorResponse:
+        cache_key = None
+        cache_generation = None
+        cache_ttl = self._response_cache_ttls.get(accept) if method == "GET" else None
+        if self._response_cache_data_storage and cache_ttl:
+            cache_key = self._get_response_cache_key(scopes, url, accept)
+            generation_key = self._get_response_cache_generation_key()
+            # generation is changed on invalidation, so the responses cached before it are stale.
+            # It is fetched together with the response (one round trip to the cache)
+            cached = self._response_cache_data_storage.get_many(
+                [generation_key, cache_key]
+            )
+            cache_generation = cached.get(generation_key)
+            cached_response = cached.get(cache_key)
+            if (
+                cached_response
+                and cached_response.get("generation") == cache_generation
+            ):
+                headers = cached_response["headers"]
+                return {
+                    "headers": (
+                        CaseInsensitiveDict(headers)
+                        if case_insensitive_headers
+                        else headers
+                    ),
+                    "body": cached_response["body"],
+                    "next_page_url": cached_response["next_page_url"],
+                }
+
+        if method == "GET" and self._coalesce_requests:
+            response = self._make_coalesced_service_request(
+                scopes, url, accept, case_insensitive_headers
+            )
+        else:
+            response = self._make_service_request(
+                scopes,
+                url,
+                method,
+                data,
+                content_type,
+                accept,
+                case_insensitive_headers,
+            )
+
+        if self._response_cache_data_storage and cache_key:
+            self._response_cache_data_storage.set_value(
+                cache_key,
+                {
+                    "headers": dict(response["headers"]),
+                    "body": response["body"],
+                    "next_page_url": response["next_page_url"],
+                    "generation": cache_generation,
+                },
+                cache_ttl,
+            )
+        return response
+
+    def _make_coalesced_service_request(
+        self,
+        scopes: t.Sequence[str],
+        url: str,
+        accept: str,
+        case_insensitive_headers: bool,
+    ) -> TServiceConnectorResponse:
+        key: TInflightRequestKey = (
+            self._registration.get_issuer(),
+            self._registration.get_client_id(),
+            url,
+            "|".join(sorted(scopes)),
+            accept,
+            case_insensitive_headers,
+        )
+        with ServiceConnector._inflight_requests_lock:
+            future = ServiceConnector._inflight_requests.get(key)
+            is_leader = future is None
+            if future is None:
+                future = Future()
+                ServiceConnector._inflight_requests[key] = future
+
+        if not is_leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            response = self._make_service_request(
+                scopes, url, "GET", None, "", accept, case_insensitive_headers
+            )
+            future.set_result(response)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with ServiceConnector._inflight_requests_lock:
+                del ServiceConnector._inflight_requests[key]
+        return copy.deepcopy(response)
+
+    def _make_service_request(
+        self,
+        scopes: t.Sequence[str],
+        url: str,
+        method: str,
+        data: t.Optional[str],
+        content_type: str,
+        accept: str,
+        case_insensitive_headers: bool,
     ) -> TServiceConnectorResponse:
         access_token = self.get_access_token(scopes)
         headers = {"Authorization": "Bearer " + access_token, "Accept": accept}
@@ -131,7 +341,8 @@ class ServiceConnector:
                 r = self._requests_session.post(url, data=request_data, headers=headers)
             else:
                 raise LtiException(
-                    f"Unsupported method: {method}. Available methods are: " '"GET", "PUT", "POST", "DELETE".'
+                    f"Unsupported method: {method}. Available methods are: "
+                    '"GET", "PUT", "POST", "DELETE".'
                 )
 
         if not r.ok:
@@ -149,6 +360,6 @@ class ServiceConnector:
 
         return {
             "headers": r.headers if case_insensitive_headers else dict(r.headers),
-            "body": r.json() if r.content else None,
+            "body": json_loads_response(r) if r.content else None,
             "next_page_url": next_page_url if next_page_url else None,
         }
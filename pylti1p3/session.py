@@ -2,6 +2,7 @@ import typing as t
 from .launch_data_storage.session import SessionDataStorage
 from .request import Request
 from .launch_data_storage.base import LaunchDataStorage
+from .utils import is_overridden
 
 
 TStateParams = t.Dict[str, object]
@@ -38,6 +39,35 @@ class SessionService:
     def save_launch_data(self, key: str, jwt_body: TJwtBody):
         self._set_value(self._get_key(key, add_prefix=False), jwt_body)
 
+    def save_launch_data_and_state_valid(
+        self, key: str, jwt_body: TJwtBody, state: str, id_token_hash: str
+    ):
+        """
+        Same as save_launch_data() and set_state_valid() but with the one call to the launch data storage
+        (unless these methods are overridden).
+        """
+        if is_overridden(self, SessionService, "save_launch_data", "set_state_valid"):
+            self.save_launch_data(key, jwt_body)
+            self.set_state_valid(state, id_token_hash)
+            return
+        self.data_storage.set_many(
+            {
+                self._get_key(key, add_prefix=False): jwt_body,
+                self._get_key(state + "-id-token-hash"): id_token_hash,
+            },
+            exp=self._launch_data_lifetime,
+        )
+
+    def get_context_snapshot(self, key: str) -> t.Any:
+        return self._get_value(
+            self._get_key(key + "-context-snapshot", add_prefix=False)
+        )
+
+    def save_context_snapshot(self, key: str, data: t.Mapping[str, t.Any]):
+        self._set_value(
+            self._get_key(key + "-context-snapshot", add_prefix=False), data
+        )
+
     def save_nonce(self, nonce: str):
         self._set_value(self._get_key("nonce", nonce), True)
 
@@ -45,6 +75,23 @@ class SessionService:
         nonce_key = self._get_key("nonce", nonce)
         return self.data_storage.check_value(nonce_key)
 
+    def save_nonce_and_state_params(
+        self, nonce: str, state: str, params: t.Optional[TStateParams] = None
+    ):
+        """
+        Same as save_nonce() and save_state_params() but with the one call to the launch data storage
+        (unless these methods are overridden).
+        """
+        if is_overridden(self, SessionService, "save_nonce", "save_state_params"):
+            self.save_nonce(nonce)
+            if params:
+                self.save_state_params(state, params)
+            return
+        data: t.Dict[str, object] = {self._get_key("nonce", nonce): True}
+        if params:
+            data[self._get_key(state)] = params
+        self.data_storage.set_many(data, exp=self._launch_data_lifetime)
+
     def save_state_params(self, state: str, params: TStateParams):
         self._set_value(self._get_key(state), params)
 
@@ -57,6 +104,21 @@ class SessionService:
     def check_state_is_valid(self, state: str, id_token_hash: str) -> bool:
         return self._get_value(self._get_key(state + "-id-token-hash")) == id_token_hash
 
+    def check_state_and_nonce(
+        self, state: str, id_token_hash: str, nonce: str
+    ) -> t.Tuple[bool, bool]:
+        """
+        Same as check_state_is_valid() and check_nonce() but with the one lookup in the launch data storage
+        (unless these methods are overridden).
+        """
+        if is_overridden(self, SessionService, "check_state_is_valid", "check_nonce"):
+            state_is_valid = self.check_state_is_valid(state, id_token_hash)
+            return state_is_valid, self.check_nonce(nonce)
+        state_key = self._get_key(state + "-id-token-hash")
+        nonce_key = self._get_key("nonce", nonce)
+        values = self.data_storage.get_many([state_key, nonce_key])
+        return values.get(state_key) == id_token_hash, nonce_key in values
+
     def set_data_storage(self, data_storage: LaunchDataStorage[t.Any]):
         self.data_storage = data_storage
 
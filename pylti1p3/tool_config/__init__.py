@@ -1,4 +1,5 @@
 # flake8: noqa
 from .abstract import ToolConfAbstract
 from .dict import ToolConfDict
-from .json_file import ToolConfJsonFile
+from .json_file import ToolConfJsonFile, ReloadingToolConfJsonFile
+from .sqlite import ToolConfSqlite
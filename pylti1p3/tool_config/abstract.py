@@ -1,5 +1,8 @@
+import threading
+import time
 import typing as t
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
 import typing_extensions as te
 from ..deployment import Deployment
 from ..registration import Registration
@@ -7,6 +10,7 @@ from ..request import Request
 
 
 REQ = t.TypeVar("REQ", bound=Request)
+TRegistrationsCacheKey = t.Tuple[str, t.Optional[str]]
 
 
 class IssuerToClientRelation:
@@ -17,6 +21,18 @@ class IssuerToClientRelation:
 class ToolConfAbstract(t.Generic[REQ]):
     __metaclass__ = ABCMeta
     issuers_relation_types: t.MutableMapping[str, str] = {}
+    _registrations_cache: t.Optional[
+        "OrderedDict[TRegistrationsCacheKey, Registration]"
+    ] = None
+    _registrations_cache_size: int = 1000
+    _registrations_cache_generation: int = 0
+    _registrations_cache_lock: t.Optional[threading.Lock] = None
+    _registrations_cache_lock_guard = threading.Lock()
+    _registration_misses: t.Optional["OrderedDict[TRegistrationsCacheKey, float]"] = (
+        None
+    )
+    _registration_misses_ttl: float = 60
+    _registration_misses_max_size: int = 10000
 
     def check_iss_has_one_client(self, iss: str) -> bool:
         """
@@ -48,6 +64,132 @@ class ToolConfAbstract(t.Generic[REQ]):
             iss
         ] = IssuerToClientRelation.MANY_CLIENTS_IDS_PER_ISSUER
 
+    def _get_registrations_cache_lock(self) -> threading.Lock:
+        # lock is created per instance (the subclasses aren't required to call __init__),
+        # the class-wide guard is taken only once per instance
+        if self._registrations_cache_lock is None:
+            with ToolConfAbstract._registrations_cache_lock_guard:
+                if self._registrations_cache_lock is None:
+                    self._registrations_cache_lock = threading.Lock()
+        return self._registrations_cache_lock
+
+    def set_registrations_cache_size(self, size: int) -> None:
+        """
+        Max number of Registration instances kept by the tool config (0 disables the cache).
+        """
+        self._registrations_cache_size = size
+        self.invalidate_registrations_cache()
+
+    def invalidate_registrations_cache(self) -> None:
+        """
+        Drop all cached Registration instances. Should be called after the config was changed.
+        """
+        with self._get_registrations_cache_lock():
+            self._registrations_cache = None
+            self._registrations_cache_generation += 1
+            # client could be added to the config
+            self._registration_misses = None
+
+    def set_negative_lookup_cache(self, ttl: float = 60, max_size: int = 10000) -> None:
+        """
+        Unknown issuer / client id pairs are remembered for ttl seconds (0 disables the cache),
+        so the repeated launches from the unknown platforms are rejected without lookups in the storage.
+        """
+        self._registration_misses_ttl = ttl
+        self._registration_misses_max_size = max_size
+        with self._get_registrations_cache_lock():
+            self._registration_misses = None
+
+    def get_known_issuers(self) -> t.Optional[t.Container[str]]:
+        """
+        All issuers from the config if it is cheap to get them (None otherwise).
+        """
+        return None
+
+    def remember_registration_miss(self, iss: str, client_id: t.Optional[str]) -> None:
+        """
+        Should be called by the tool config when registration wasn't found.
+        """
+        if self._registration_misses_ttl <= 0:
+            return
+        key = (iss, client_id)
+        with self._get_registrations_cache_lock():
+            if self._registration_misses is None:
+                self._registration_misses = OrderedDict()
+            self._registration_misses.pop(key, None)
+            self._registration_misses[key] = (
+                time.monotonic() + self._registration_misses_ttl
+            )
+            while len(self._registration_misses) > self._registration_misses_max_size:
+                self._registration_misses.popitem(last=False)
+
+    def check_registration_is_unknown(
+        self, iss: str, client_id: t.Optional[str] = None
+    ) -> bool:
+        """
+        Cheap check (without lookups in the storage) that there is no registration for the issuer / client id.
+        False means that registration may exist.
+        """
+        # base implementation returns None, the subclasses return the issuers
+        known_issuers = self.get_known_issuers()  # pylint: disable=assignment-from-none
+        if known_issuers is not None and iss not in known_issuers:
+            return True
+        if self._registration_misses is None:
+            return False
+        key = (iss, client_id)
+        with self._get_registrations_cache_lock():
+            if self._registration_misses is None:
+                return False
+            expires_at = self._registration_misses.get(key)
+            if expires_at is None:
+                return False
+            if expires_at < time.monotonic():
+                del self._registration_misses[key]
+                return False
+            return True
+
+    def get_cached_registration(
+        self,
+        iss: str,
+        client_id: t.Optional[str],
+        factory: t.Callable[[], Registration],
+    ) -> Registration:
+        """
+        Return the same Registration instance for the same iss and client_id, so the data fetched during
+        the launch (key set, parsed keys) is kept between the launches. Cache is bounded (LRU) and thread-safe.
+
+        :param iss: issuer
+        :param client_id: client id
+        :param factory: callable which creates new Registration instance on cache miss
+        :return: Registration
+        """
+        if self._registrations_cache_size <= 0:
+            return factory()
+        key = (iss, client_id)
+        with self._get_registrations_cache_lock():
+            if self._registrations_cache is None:
+                self._registrations_cache = OrderedDict()
+            reg = self._registrations_cache.get(key)
+            if reg is not None:
+                self._registrations_cache.move_to_end(key)
+                return reg
+            generation = self._registrations_cache_generation
+
+        # factory could be slow (i.e. DB query), so it is called without lock
+        reg = factory()
+
+        with self._get_registrations_cache_lock():
+            if (
+                self._registrations_cache is None
+                or generation != self._registrations_cache_generation
+            ):
+                # config was changed in the meantime
+                return reg
+            cached_reg = self._registrations_cache.setdefault(key, reg)
+            while len(self._registrations_cache) > self._registrations_cache_size:
+                self._registrations_cache.popitem(last=False)
+            return cached_reg
+
     def find_registration(self, iss: str, *args, **kwargs) -> Registration:
         """
         Backward compatibility method
@@ -100,6 +242,13 @@ class ToolConfAbstract(t.Generic[REQ]):
         """
         raise NotImplementedError
 
+    def get_jwks_version(self) -> t.Optional[t.Hashable]:
+        """
+        Value which is changed after the tool's public keys were changed (used to cache JWKS).
+        None means that it is unknown.
+        """
+        return None
+
     def get_jwks(
         self, iss: t.Optional[str] = None, client_id: t.Optional[str] = None, **kwargs
     ):
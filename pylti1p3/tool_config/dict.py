@@ -31,6 +31,10 @@ class ToolConfDict(ToolConfAbstract[Request]):
     _public_key_one_client: t.Dict[str, str]
     _private_key_many_clients: t.Dict[str, t.Dict[str, str]]
     _public_key_many_clients: t.Dict[str, t.Dict[str, str]]
+    _iss_client_index: t.Dict[t.Tuple[str, str], TIssConf]
+    _iss_default_index: t.Dict[str, TIssConf]
+    _deployment_ids_index: t.Dict[t.Tuple[str, str], t.FrozenSet[str]]
+    _jwks_version: int = 0
 
     def __init__(self, json_data: TJsonData):
         """
@@ -99,6 +103,31 @@ class ToolConfDict(ToolConfAbstract[Request]):
         self._private_key_many_clients = {}
         self._public_key_one_client = {}
         self._public_key_many_clients = {}
+        self._build_indexes(json_data)
+
+    def _build_indexes(self, json_data: TJsonData):
+        """
+        Compile config into hash indexes, so the lookups on every launch don't scan issuer's list of clients.
+        Lookup rules are the same as in the list scan: the first matched item wins.
+        """
+        self._iss_client_index = {}
+        self._iss_default_index = {}
+        self._deployment_ids_index = {}
+        for iss, iss_conf in json_data.items():
+            items = iss_conf if isinstance(iss_conf, list) else [iss_conf]
+            for item in items:
+                key = (iss, item["client_id"])
+                if key not in self._iss_client_index:
+                    self._iss_client_index[key] = item
+                    self._deployment_ids_index[key] = frozenset(item["deployment_ids"])
+            if isinstance(iss_conf, list):
+                default_items = [
+                    item for item in iss_conf if item.get("default", False)
+                ]
+                if default_items:
+                    self._iss_default_index[iss] = default_items[0]
+                elif len(iss_conf) == 1:
+                    self._iss_default_index[iss] = iss_conf[0]
 
     def _validate_iss_config_item(self, iss: str, iss_conf: TIssConf):
         if not isinstance(iss_conf, dict):
@@ -143,8 +172,13 @@ class ToolConfDict(ToolConfAbstract[Request]):
             reg.set_tool_public_key(public_key)
         return reg
 
-    def _get_deployment(self, iss_conf: TIssConf, deployment_id: str):
-        if deployment_id not in iss_conf["deployment_ids"]:
+    def _get_deployment(self, iss: str, iss_conf: TIssConf, deployment_id: str):
+        key = (iss, iss_conf["client_id"])
+        deployment_ids = self._deployment_ids_index.get(key)
+        if deployment_ids is None or self._iss_client_index.get(key) is not iss_conf:
+            # item isn't indexed (e.g. default item with the same client_id as the earlier one)
+            deployment_ids = frozenset(iss_conf["deployment_ids"])
+        if deployment_id not in deployment_ids:
             return None
         d = Deployment()
         return d.set_deployment_id(deployment_id)
@@ -152,23 +186,27 @@ class ToolConfDict(ToolConfAbstract[Request]):
     def find_registration_by_issuer(self, iss: str, *args, **kwargs):
         # pylint: disable=unused-argument
         iss_conf = self.get_iss_config(iss)
-        return self._get_registration(iss, iss_conf)
+        return self.get_cached_registration(
+            iss, iss_conf["client_id"], lambda: self._get_registration(iss, iss_conf)
+        )
 
     def find_registration_by_params(self, iss: str, client_id: str, *args, **kwargs):
         # pylint: disable=unused-argument
         iss_conf = self.get_iss_config(iss, client_id)
-        return self._get_registration(iss, iss_conf)
+        return self.get_cached_registration(
+            iss, iss_conf["client_id"], lambda: self._get_registration(iss, iss_conf)
+        )
 
     def find_deployment(self, iss: str, deployment_id: str):
         iss_conf = self.get_iss_config(iss)
-        return self._get_deployment(iss_conf, deployment_id)
+        return self._get_deployment(iss, iss_conf, deployment_id)
 
     def find_deployment_by_params(
         self, iss: str, deployment_id: str, client_id: str, *args, **kwargs
     ):
         # pylint: disable=unused-argument
         iss_conf = self.get_iss_config(iss, client_id)
-        return self._get_deployment(iss_conf, deployment_id)
+        return self._get_deployment(iss, iss_conf, deployment_id)
 
     def set_public_key(
         self, iss: str, key_content: str, client_id: t.Optional[str] = None
@@ -181,6 +219,8 @@ class ToolConfDict(ToolConfAbstract[Request]):
             self._public_key_many_clients[iss][client_id] = key_content
         else:
             self._public_key_one_client[iss] = key_content
+        self._jwks_version += 1
+        self.invalidate_registrations_cache()
 
     def get_public_key(self, iss: str, client_id: t.Optional[str] = None):
         if self.check_iss_has_many_clients(iss):
@@ -203,6 +243,7 @@ class ToolConfDict(ToolConfAbstract[Request]):
             self._private_key_many_clients[iss][client_id] = key_content  # type: ignore
         else:
             self._private_key_one_client[iss] = key_content
+        self.invalidate_registrations_cache()
 
     def get_private_key(self, iss: str, client_id: t.Optional[str] = None):
         if self.check_iss_has_many_clients(iss):
@@ -218,22 +259,70 @@ class ToolConfDict(ToolConfAbstract[Request]):
         if not self._config:
             raise Exception("Config is not set")
         if iss not in self._config:
+            self.remember_registration_miss(iss, client_id)
             raise Exception(f"iss {iss} not found in settings")
         config_iss = self._config[iss]
 
         if isinstance(config_iss, list):
-            items_len = len(config_iss)
-            for subitem in config_iss:
-                # pylint: disable=too-many-boolean-expressions
-                if (
-                    (client_id and subitem["client_id"] == client_id)
-                    or (not client_id and subitem.get("default", False))
-                    or (not client_id and items_len == 1)
-                ):
-                    return subitem
+            if client_id:
+                subitem = self._iss_client_index.get((iss, client_id))
+            else:
+                subitem = self._iss_default_index.get(iss)
+            if subitem is not None:
+                return subitem
+            self.remember_registration_miss(iss, client_id)
             raise Exception(f"iss {iss} [client_id={client_id}] not found in settings")
         return config_iss
 
+    def _get_registration_source(
+        self, iss: str, client_id: str
+    ) -> t.Tuple[t.Dict[str, t.Any], t.Optional[str], t.Optional[str]]:
+        # deployments don't affect Registration object
+        iss_conf = {
+            k: v
+            for k, v in self.get_iss_config(iss, client_id).items()
+            if k not in ("default", "deployment_ids")
+        }
+        return (
+            iss_conf,
+            self.get_private_key(iss, client_id),
+            self.get_public_key(iss, client_id),
+        )
+
+    def keep_registrations(self, prev_tool_conf: "ToolConfDict") -> None:
+        """
+        Take cached Registration objects (with the fetched key sets) from the previous version of the config
+        for all issuers configs and keys which weren't changed.
+        """
+        # pylint: disable=protected-access
+        with prev_tool_conf._get_registrations_cache_lock():
+            prev_registrations = (
+                list(prev_tool_conf._registrations_cache.items())
+                if prev_tool_conf._registrations_cache
+                else []
+            )
+        for (iss, client_id), reg in prev_registrations:
+            if client_id is None:
+                continue
+            try:
+                unchanged = self._get_registration_source(
+                    iss, client_id
+                ) == prev_tool_conf._get_registration_source(iss, client_id)
+            except Exception:  # pylint: disable=broad-except
+                # issuer or client was removed from the config
+                continue
+            if unchanged:
+                # factory is called right away, so the loop variable is safe here
+                self.get_cached_registration(
+                    iss, client_id, lambda: reg  # pylint: disable=cell-var-from-loop
+                )
+
+    def get_known_issuers(self) -> t.Optional[t.Container[str]]:
+        return self._config
+
+    def get_jwks_version(self) -> t.Optional[t.Hashable]:
+        return self._jwks_version
+
     def get_jwks(
         self, iss: t.Optional[str] = None, client_id: t.Optional[str] = None, **kwargs
     ):
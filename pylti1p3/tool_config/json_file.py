@@ -1,12 +1,19 @@
+import threading
+import time
 import typing as t
-import json
 import os
 
+from ..json_codec import json_loads
+from ..request import Request
+from .abstract import ToolConfAbstract
 from .dict import ToolConfDict, TIssConf, TJsonData
 
+TFilesState = t.Tuple[t.Tuple[str, int, int], ...]
+
 
 class ToolConfJsonFile(ToolConfDict):
     _configs_dir: str
+    _files: t.List[str]
 
     def __init__(self, config_file: str):
         """
@@ -63,9 +70,10 @@ class ToolConfJsonFile(ToolConfDict):
         if not os.path.isfile(config_file):
             raise Exception("LTI tool config file not found: " + config_file)
         self._configs_dir = os.path.dirname(config_file)
+        self._files = [config_file]
 
         with open(config_file, encoding="utf-8") as cfg:
-            iss_conf_dict: TJsonData = json.loads(cfg.read())
+            iss_conf_dict: TJsonData = json_loads(cfg.read())
             super().__init__(iss_conf_dict)
 
         for iss in iss_conf_dict:
@@ -88,6 +96,7 @@ class ToolConfJsonFile(ToolConfDict):
         if not private_key_file.startswith("/"):
             private_key_file = self._configs_dir + "/" + private_key_file
 
+        self._files.append(private_key_file)
         with open(private_key_file, encoding="utf-8") as prf:
             self.set_private_key(iss, prf.read(), client_id=client_id)
 
@@ -96,5 +105,168 @@ class ToolConfJsonFile(ToolConfDict):
             if not public_key_file.startswith("/"):
                 public_key_file = self._configs_dir + "/" + public_key_file
 
+            self._files.append(public_key_file)
             with open(public_key_file, encoding="utf-8") as pubf:
                 self.set_public_key(iss, pubf.read(), client_id=client_id)
+
+    def get_files(self) -> t.List[str]:
+        """
+        Config file and all key files used by the config.
+        """
+        return self._files
+
+
+class ReloadingToolConfJsonFile(ToolConfAbstract[Request]):
+    """
+    ToolConfJsonFile which is reloaded without restart of the process after the config file (or any key file)
+    was changed. Files are checked not more often than once per check_interval seconds, the changed config
+    is loaded in the background thread.
+    New config replaces the current one atomically, Registration objects (with the fetched key sets)
+    of the unchanged issuers configs are moved to the new config.
+    """
+
+    _config_file: str
+    _check_interval: float
+    _conf: ToolConfJsonFile
+    _files_state: TFilesState
+    _checked_at: float
+    _reloading: bool = False
+    _version: int = 0
+    _reload_error: t.Optional[Exception] = None
+
+    def __init__(self, config_file: str, check_interval: float = 5):
+        super().__init__()
+        self._config_file = config_file
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._conf, self._files_state = self._load()
+        self._checked_at = time.monotonic()
+
+    def _load(self) -> t.Tuple[ToolConfJsonFile, TFilesState]:
+        # files could be changed during the loading, so state of the config file is taken before
+        files_state = self._get_files_state([self._config_file])
+        conf = ToolConfJsonFile(self._config_file)
+        files_state += self._get_files_state(conf.get_files()[1:])
+        return conf, files_state
+
+    @staticmethod
+    def _get_files_state(files: t.List[str]) -> TFilesState:
+        state = []
+        for file_path in files:
+            try:
+                stat = os.stat(file_path)
+                state.append((file_path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                state.append((file_path, -1, -1))
+        return tuple(state)
+
+    def get_conf(self) -> ToolConfJsonFile:
+        """
+        Current version of the config. Checks files for changes if it is time and starts reload in the background.
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= self._check_interval:
+            with self._lock:
+                start_check = now - self._checked_at >= self._check_interval
+                if start_check:
+                    self._checked_at = now
+            # os.stat of the files is cheap, only the reload is done in the background thread
+            if start_check and self._is_changed():
+                with self._lock:
+                    start_reload = not self._reloading
+                    self._reloading = True
+                if start_reload:
+                    threading.Thread(
+                        target=self._reload_in_background, daemon=True
+                    ).start()
+        return self._conf
+
+    def _is_changed(self) -> bool:
+        files = [file_path for file_path, _, _ in self._files_state]
+        return self._get_files_state(files) != self._files_state
+
+    def _reload_in_background(self) -> None:
+        try:
+            self.reload()
+        except Exception as e:  # pylint: disable=broad-except
+            # keep the current config until the files are fixed
+            self._reload_error = e
+        finally:
+            with self._lock:
+                self._reloading = False
+
+    def reload(self) -> "ReloadingToolConfJsonFile":
+        """
+        Load the config file right now (in the current thread) and replace the current config.
+        """
+        new_conf, files_state = self._load()
+        new_conf.set_negative_lookup_cache(
+            self._registration_misses_ttl, self._registration_misses_max_size
+        )
+        new_conf.keep_registrations(self._conf)
+
+        self._conf = new_conf
+        self._files_state = files_state
+        self._reload_error = None
+        self._version += 1
+        return self
+
+    def get_reload_error(self) -> t.Optional[Exception]:
+        """
+        Error of the last background reload (None if the current config is up to date).
+        """
+        return self._reload_error
+
+    def check_iss_has_one_client(self, iss: str) -> bool:
+        return self.get_conf().check_iss_has_one_client(iss)
+
+    def check_iss_has_many_clients(self, iss: str) -> bool:
+        return self.get_conf().check_iss_has_many_clients(iss)
+
+    def set_registrations_cache_size(self, size: int) -> None:
+        self.get_conf().set_registrations_cache_size(size)
+
+    def invalidate_registrations_cache(self) -> None:
+        self.get_conf().invalidate_registrations_cache()
+
+    def find_registration_by_issuer(self, iss: str, *args, **kwargs):
+        return self.get_conf().find_registration_by_issuer(iss, *args, **kwargs)
+
+    def find_registration_by_params(self, iss: str, client_id: str, *args, **kwargs):
+        return self.get_conf().find_registration_by_params(
+            iss, client_id, *args, **kwargs
+        )
+
+    def find_deployment(self, iss: str, deployment_id: str):
+        return self.get_conf().find_deployment(iss, deployment_id)
+
+    def find_deployment_by_params(
+        self, iss: str, deployment_id: str, client_id: str, *args, **kwargs
+    ):
+        return self.get_conf().find_deployment_by_params(
+            iss, deployment_id, client_id, *args, **kwargs
+        )
+
+    def get_iss_config(self, iss: str, client_id: t.Optional[str] = None):
+        return self.get_conf().get_iss_config(iss, client_id)
+
+    def set_negative_lookup_cache(self, ttl: float = 60, max_size: int = 10000) -> None:
+        super().set_negative_lookup_cache(ttl, max_size)
+        self.get_conf().set_negative_lookup_cache(ttl, max_size)
+
+    def get_known_issuers(self) -> t.Optional[t.Container[str]]:
+        return self.get_conf().get_known_issuers()
+
+    def check_registration_is_unknown(
+        self, iss: str, client_id: t.Optional[str] = None
+    ) -> bool:
+        return self.get_conf().check_registration_is_unknown(iss, client_id)
+
+    def get_jwks_version(self) -> t.Optional[t.Hashable]:
+        conf = self.get_conf()
+        return self._version, conf.get_jwks_version()
+
+    def get_jwks(
+        self, iss: t.Optional[str] = None, client_id: t.Optional[str] = None, **kwargs
+    ):
+        return self.get_conf().get_jwks(iss, client_id, **kwargs)
@@ -0,0 +1,262 @@
+import sqlite3
+import threading
+import typing as t
+from collections import OrderedDict
+
+from ..deployment import Deployment
+from ..exception import LtiException
+from ..json_codec import json_dumps, json_loads
+from ..registration import Registration
+from ..request import Request
+from ..utils import sqlite_connection
+from .abstract import ToolConfAbstract
+from .dict import TIssConf
+
+
+class ToolConfSqlite(ToolConfAbstract[Request]):
+    """
+    Tool config stored in the SQLite database. Nothing is loaded on start: issuers configs are found by the primary
+    key (issuer, client_id) on demand and hydrated Registration objects are kept in the bounded LRU cache,
+    so memory is proportional to the number of the active clients (not to the number of all registrations).
+    Keys are loaded only when Registration object is created.
+
+    Cache isn't invalidated if the table is changed by another process, call invalidate_registrations_cache()
+    in this case.
+    """
+
+    _db_path: str
+    _table_name: str
+    _lookups_cache: "OrderedDict[t.Tuple[str, ...], t.Any]"
+
+    _config_fields = (
+        "auth_login_url",
+        "auth_token_url",
+        "auth_audience",
+        "key_set_url",
+        "key_set",
+    )
+
+    def __init__(
+        self, db_path: str, table_name: str = "lti1p3_tool", cache_size: int = 1000
+    ):
+        super().__init__()
+        self._db_path = db_path
+        self._table_name = table_name
+        self._registrations_cache_size = cache_size
+        # default client ids and deployment ids
+        self._lookups_cache = OrderedDict()
+        self._lookups_cache_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._table_name} ("
+                "issuer TEXT NOT NULL, "
+                "client_id TEXT NOT NULL, "
+                "is_default INTEGER NOT NULL DEFAULT 0, "
+                "auth_login_url TEXT NOT NULL, "
+                "auth_token_url TEXT NOT NULL, "
+                "auth_audience TEXT, "
+                "key_set_url TEXT, "
+                "key_set TEXT, "
+                "deployment_ids TEXT NOT NULL, "
+                "private_key TEXT NOT NULL, "
+                "public_key TEXT, "
+                "PRIMARY KEY (issuer, client_id))"
+            )
+
+    def _connect(self) -> t.ContextManager[sqlite3.Connection]:
+        # one tool conf instance serves all request threads while sqlite3 connections are bound
+        # to the thread which has created them
+        return sqlite_connection(self._db_path)
+
+    def check_iss_has_one_client(self, iss: str) -> bool:
+        return False
+
+    def check_iss_has_many_clients(self, iss: str) -> bool:
+        return True
+
+    def set_iss_config(
+        self,
+        iss: str,
+        iss_conf: TIssConf,
+        private_key: str,
+        public_key: t.Optional[str] = None,
+    ) -> None:
+        """
+        Add or replace the client's config (same format as one item of ToolConfDict config).
+        """
+        key_set = iss_conf.get("key_set")
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self._table_name} "
+                "(issuer, client_id, is_default, auth_login_url, auth_token_url, auth_audience, "
+                "key_set_url, key_set, deployment_ids, private_key, public_key) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    iss,
+                    iss_conf["client_id"],
+                    1 if iss_conf.get("default", False) else 0,
+                    iss_conf["auth_login_url"],
+                    iss_conf["auth_token_url"],
+                    iss_conf.get("auth_audience"),
+                    iss_conf.get("key_set_url"),
+                    json_dumps(key_set) if key_set else None,
+                    json_dumps(list(iss_conf["deployment_ids"])),
+                    private_key,
+                    public_key,
+                ),
+            )
+        self.invalidate_registrations_cache()
+
+    def delete_iss_config(self, iss: str, client_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                f"DELETE FROM {self._table_name} WHERE issuer = ? AND client_id = ?",
+                (iss, client_id),
+            )
+        self.invalidate_registrations_cache()
+
+    def invalidate_registrations_cache(self) -> None:
+        super().invalidate_registrations_cache()
+        with self._lookups_cache_lock:
+            self._lookups_cache = OrderedDict()
+
+    def _get_cached_lookup(self, key: t.Tuple[str, ...]) -> t.Any:
+        with self._lookups_cache_lock:
+            value = self._lookups_cache.get(key)
+            if value is not None:
+                self._lookups_cache.move_to_end(key)
+            return value
+
+    def _set_cached_lookup(self, key: t.Tuple[str, ...], value: t.Any) -> None:
+        if self._registrations_cache_size <= 0:
+            return
+        with self._lookups_cache_lock:
+            self._lookups_cache[key] = value
+            # two lookups per client
+            while len(self._lookups_cache) > 2 * self._registrations_cache_size:
+                self._lookups_cache.popitem(last=False)
+
+    def _not_found(self, iss: str, client_id: t.Optional[str]) -> LtiException:
+        self.remember_registration_miss(iss, client_id)
+        return LtiException(f"iss {iss} [client_id={client_id}] not found in settings")
+
+    def _get_client_id(self, iss: str, client_id: t.Optional[str]) -> str:
+        if client_id:
+            return client_id
+
+        key = ("default-client-id", iss)
+        default_client_id = self._get_cached_lookup(key)
+        if default_client_id is not None:
+            return default_client_id
+
+        # default client: the one marked as default or the only client of the issuer
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT client_id, is_default FROM {self._table_name} "
+                "WHERE issuer = ? ORDER BY is_default DESC LIMIT 2",
+                (iss,),
+            ).fetchall()
+        if rows and (rows[0][1] or len(rows) == 1):
+            self._set_cached_lookup(key, rows[0][0])
+            return rows[0][0]
+        raise self._not_found(iss, client_id)
+
+    def _load_registration(self, iss: str, client_id: str) -> Registration:
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(self._config_fields)}, private_key, public_key "
+                f"FROM {self._table_name} WHERE issuer = ? AND client_id = ?",
+                (iss, client_id),
+            ).fetchone()
+        if row is None:
+            raise self._not_found(iss, client_id)
+        (
+            auth_login_url,
+            auth_token_url,
+            auth_audience,
+            key_set_url,
+            key_set,
+            private_key,
+            public_key,
+        ) = row
+
+        reg = Registration()
+        reg.set_auth_login_url(auth_login_url).set_auth_token_url(
+            auth_token_url
+        ).set_client_id(client_id).set_key_set(
+            json_loads(key_set) if key_set else None
+        ).set_key_set_url(
+            key_set_url
+        ).set_issuer(
+            iss
+        ).set_tool_private_key(
+            private_key
+        )
+        if auth_audience:
+            reg.set_auth_audience(auth_audience)
+        if public_key:
+            reg.set_tool_public_key(public_key)
+        return reg
+
+    def _get_deployment_ids(self, iss: str, client_id: str) -> t.FrozenSet[str]:
+        key = ("deployment-ids", iss, client_id)
+        deployment_ids = self._get_cached_lookup(key)
+        if deployment_ids is not None:
+            return deployment_ids
+
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT deployment_ids FROM {self._table_name} "
+                "WHERE issuer = ? AND client_id = ?",
+                (iss, client_id),
+            ).fetchone()
+        if row is None:
+            raise self._not_found(iss, client_id)
+        deployment_ids = frozenset(json_loads(row[0]))
+        self._set_cached_lookup(key, deployment_ids)
+        return deployment_ids
+
+    def find_registration_by_issuer(self, iss: str, *args, **kwargs):
+        return self.find_registration_by_params(iss, None, *args, **kwargs)
+
+    def find_registration_by_params(
+        self, iss: str, client_id: t.Optional[str], *args, **kwargs
+    ):
+        # pylint: disable=unused-argument
+        client_id = self._get_client_id(iss, client_id)
+        return self.get_cached_registration(
+            iss,
+            client_id,
+            lambda: self._load_registration(iss, t.cast(str, client_id)),
+        )
+
+    def find_deployment(self, iss: str, deployment_id: str):
+        return self.find_deployment_by_params(iss, deployment_id, None)
+
+    def find_deployment_by_params(
+        self,
+        iss: str,
+        deployment_id: str,
+        client_id: t.Optional[str],
+        *args,
+        **kwargs,
+    ):
+        # pylint: disable=unused-argument
+        client_id = self._get_client_id(iss, client_id)
+        if deployment_id not in self._get_deployment_ids(iss, client_id):
+            return None
+        d = Deployment()
+        return d.set_deployment_id(deployment_id)
+
+    def get_jwks(
+        self, iss: t.Optional[str] = None, client_id: t.Optional[str] = None, **kwargs
+    ):
+        if iss:
+            return super().get_jwks(iss, client_id, **kwargs)
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT DISTINCT public_key FROM {self._table_name} "
+                "WHERE public_key IS NOT NULL ORDER BY public_key"
+            ).fetchall()
+        return {"keys": [Registration.get_jwk(row[0]) for row in rows if row[0]]}
@@ -1,6 +1,15 @@
+import sqlite3
+import typing as t
 import urllib.parse as urlparse  # type: ignore
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from urllib.parse import urlencode  # type: ignore
 
+T = t.TypeVar("T")
+R = t.TypeVar("R")
+
+DEFAULT_MAX_WORKERS = 8
+
 
 def add_param_to_url(url: str, param_name: str, param_value: object) -> str:
     url_parts = list(urlparse.urlparse(url))
@@ -8,3 +17,60 @@ def add_param_to_url(url: str, param_name: str, param_value: object) -> str:
     query[str(param_name)] = str(param_value)
     url_parts[4] = urlencode(query)
     return urlparse.urlunparse(url_parts)
+
+
+def is_overridden(obj: object, base_cls: type, *names: str) -> bool:
+    """
+    Checks whether any of the base class methods is overridden by the class of the object.
+    Batched shortcuts use it to call the overridden hooks instead of skipping them.
+    """
+    obj_cls = type(obj)
+    return any(getattr(obj_cls, name) is not getattr(base_cls, name) for name in names)
+
+
+@contextmanager
+def sqlite_connection(
+    db_path: str, timeout: float = 30
+) -> t.Iterator[sqlite3.Connection]:
+    """
+    Short-lived SQLite connection: the transaction is committed (or rolled back) and the connection
+    is closed on exit.
+    """
+    conn = sqlite3.connect(db_path, timeout=timeout)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def map_concurrently(
+    func: t.Callable[[T], R],
+    items: t.Iterable[T],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    return_exceptions: bool = False,
+) -> t.List[t.Any]:
+    """
+    Call func for every item using a bounded pool of threads and return the results in the input order.
+
+    :param func: callable which accepts one item
+    :param items: iterable with items
+    :param max_workers: max number of concurrently running calls
+    :param return_exceptions: put raised exceptions into the result list instead of re-raising the first one
+    :return: list
+    """
+    items_lst = list(items)
+
+    def call(item: T) -> t.Any:
+        if not return_exceptions:
+            return func(item)
+        try:
+            return func(item)
+        except Exception as e:  # pylint: disable=broad-except
+            return e
+
+    if max_workers <= 1 or len(items_lst) <= 1:
+        return [call(item) for item in items_lst]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items_lst))) as executor:
+        return list(executor.map(call, items_lst))
@@ -19,6 +19,12 @@ install_requires = [
     "typing_extensions",
 ]
 
+extras_require = {
+    "numpy": ["numpy"],
+    "orjson": ["orjson"],
+    "ujson": ["ujson"],
+}
+
 with open("README.rst", "rt") as readme:
     long_description = readme.read().strip()
 
@@ -34,6 +40,7 @@ setup(
     maintainer="Dmitry Viskov",
     long_description=long_description,
     install_requires=install_requires,
+    extras_require=extras_require,
     license="MIT",
     url="https://github.com/dmitry-viskov/pylti1.3",
     packages=packages,
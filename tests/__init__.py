@@ -1,10 +1,14 @@
 # flake8: noqa
+from .test_context_snapshot import TestContextSnapshot
 from .test_course_groups import TestCourseGroups
 from .test_deep_link import TestDjangoDeepLink, TestFlaskDeepLink
 from .test_grades import TestGrades
+from .test_job_runner import TestJobRunner
+from .test_gradebook import TestGradebook
+from .test_grade_outbox import TestDjangoGradeOutbox, TestGradeOutbox
 from .test_names_roles import TestNamesRolesProvisioningService
 from .test_resource_link import TestDjangoResourceLink, TestFlaskResourceLink
-from .test_tool_conf import TestToolConf
+from .test_tool_conf import TestDjangoCachedDbToolConf, TestToolConf
 from .test_privacy_launch import TestDjangoPrivacyLaunch, TestFlaskPrivacyLaunch
 from .test_submission_review_launch import (
     TestDjangoSubmissionReviewLaunch,
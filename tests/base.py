@@ -23,9 +23,12 @@ class TestLinkBase(unittest.TestCase):
         key_set_url_response=None,
         force_validation=False,
         cache=False,
+        setup_launch=None,
     ):
         obj = self._get_launch_obj(request, tool_conf, cache=cache)
         obj.set_jwt_verify_options({"verify_aud": False, "verify_exp": False})
+        if setup_launch:
+            setup_launch(obj)
 
         with patch("socket.gethostbyname", return_value="127.0.0.1"):
             with requests_mock.Mocker() as m:
@@ -40,11 +43,15 @@ class TestLinkBase(unittest.TestCase):
                     return obj.validate()
                 return obj.get_launch_data()
 
-    def _launch_with_invalid_jwt_body(self, side_effect, request, tool_conf):
+    def _launch_with_invalid_jwt_body(
+        self, side_effect, request, tool_conf, setup_launch=None
+    ):
         launch_cls = self._get_launch_cls()
         with patch.object(launch_cls, "_get_jwt_body", autospec=True) as get_jwt_body:
             get_jwt_body.side_effect = side_effect
-            return self._launch(request, tool_conf, force_validation=True)
+            return self._launch(
+                request, tool_conf, force_validation=True, setup_launch=setup_launch
+            )
 
 
 class TestServicesBase(unittest.TestCase):
@@ -13,6 +13,19 @@ class Cache:
     def set(self, key, value, exp=None):  # pylint: disable=unused-argument
         self._data[key] = value
 
+    def delete(self, key):
+        self._data.pop(key, None)
+
+    def get_many(self, keys):
+        return {key: self._data[key] for key in keys if key in self._data}
+
+    def set_many(self, data, exp=None):  # pylint: disable=unused-argument
+        self._data.update(data)
+
+    def delete_many(self, keys):
+        for key in keys:
+            self.delete(key)
+
 
 class FakeCacheDataStorage(CacheDataStorage):
     def __init__(self, *args, **kwargs):
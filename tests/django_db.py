@@ -0,0 +1,38 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+DJANGO_DB_APPS = [
+    "pylti1p3.contrib.django.lti1p3_tool_config",
+    "pylti1p3.contrib.django.lti1p3_grade_outbox",
+]
+
+
+def setup_django_db():
+    # pylint: disable=import-outside-toplevel
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    if settings.configured:
+        return
+
+    # file database: in-memory sqlite database isn't shared between the threads
+    tmp_dir = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, tmp_dir, True)
+    settings.configure(
+        INSTALLED_APPS=DJANGO_DB_APPS,
+        DATABASES={
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": os.path.join(tmp_dir, "db.sqlite3"),
+            }
+        },
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        USE_TZ=True,
+    )
+    django.setup()
+    call_command("migrate", verbosity=0)
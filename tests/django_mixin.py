@@ -50,7 +50,7 @@ class DjangoMixin:
             request = FakeRequest(post=self.post_login_data, secure=secure)
             login_data = self.post_login_data.copy()
 
-        with patch("django.shortcuts.redirect") as mock_redirect:
+        with patch("pylti1p3.contrib.django.redirect.redirect") as mock_redirect:
             from pylti1p3.contrib.django import DjangoOIDCLogin
 
             with patch.object(
@@ -0,0 +1,134 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import requests_mock
+from pylti1p3.context_snapshot import ContextService, ContextSnapshot
+from pylti1p3.exception import LtiException
+from .cache import FakeCacheDataStorage
+from .request import FakeRequest
+from .tool_config import get_test_tool_conf
+from .base import TestServicesBase
+
+
+class TestContextSnapshot(TestServicesBase):
+    members_url = "http://canvas.docker/api/lti/courses/1/names_and_roles"
+    lineitems_url = "http://canvas.docker/api/lti/courses/1/line_items"
+
+    def _mock_services(self, m):
+        m.post(
+            self._get_auth_token_url(),
+            text=json.dumps(self._get_auth_token_response()),
+        )
+        m.get(
+            self.members_url,
+            text=json.dumps(
+                {
+                    "members": [
+                        {
+                            "user_id": "user-1",
+                            "roles": ["Learner"],
+                            "group_enrollments": [{"group_id": "g1"}],
+                        }
+                    ]
+                }
+            ),
+        )
+        m.get(
+            self.context_groups_url,
+            text=json.dumps({"groups": [{"id": "g1", "name": "G1", "set_id": "s1"}]}),
+        )
+        m.get(
+            self.context_group_sets_url,
+            text=json.dumps({"sets": [{"id": "s1", "name": "S1"}]}),
+        )
+        m.get(
+            self.lineitems_url,
+            text=json.dumps([{"id": "li-1", "label": "Quiz", "scoreMaximum": 10}]),
+        )
+
+    def test_get_context_snapshot(self):
+        # pylint: disable=import-outside-toplevel
+        from pylti1p3.contrib.flask import FlaskMessageLaunch
+
+        tool_conf = get_test_tool_conf()
+
+        with patch.object(
+            FlaskMessageLaunch, "_get_jwt_body", autospec=True
+        ) as get_jwt_body:
+            message_launch = FlaskMessageLaunch(FakeRequest(), tool_conf)
+            get_jwt_body.side_effect = lambda x: self._get_jwt_body()
+            with patch("socket.gethostbyname", return_value="127.0.0.1"):
+                with requests_mock.Mocker() as m:
+                    self._mock_services(m)
+                    message_launch = message_launch.validate_registration()
+
+                    snapshot = message_launch.get_context_snapshot()
+                    self.assertEqual(
+                        [mb["user_id"] for mb in snapshot.get_members()], ["user-1"]
+                    )
+                    self.assertEqual(len(snapshot.get_roster()), 1)
+                    self.assertEqual(
+                        [
+                            g["id"]
+                            for g in snapshot.get_groups_index().get_user_groups(
+                                "user-1"
+                            )
+                        ],
+                        ["g1"],
+                    )
+                    self.assertEqual(
+                        [ln.get_id() for ln in snapshot.get_lineitems()], ["li-1"]
+                    )
+
+                    restored = ContextSnapshot(
+                        json.loads(json.dumps(snapshot.get_data()))
+                    )
+                    self.assertEqual(restored.get_sets(), snapshot.get_sets())
+
+                    m.reset_mock()
+                    snapshot = message_launch.get_context_snapshot(
+                        services=[ContextService.NRPS]
+                    )
+                    self.assertTrue(snapshot.has_members())
+                    self.assertFalse(snapshot.has_groups())
+                    self.assertFalse(snapshot.has_lineitems())
+                    self.assertEqual(snapshot.get_lineitems(), [])
+
+    def test_prefetch_context_snapshot(self):
+        # pylint: disable=import-outside-toplevel
+        from pylti1p3.contrib.flask import FlaskMessageLaunch
+
+        tool_conf = get_test_tool_conf()
+        launch_data_storage = FakeCacheDataStorage()
+
+        with patch.object(
+            FlaskMessageLaunch, "_get_jwt_body", autospec=True
+        ) as get_jwt_body:
+            get_jwt_body.side_effect = lambda x: self._get_jwt_body()
+            message_launch = FlaskMessageLaunch(FakeRequest(), tool_conf)
+            with patch("socket.gethostbyname", return_value="127.0.0.1"):
+                with requests_mock.Mocker() as m, ThreadPoolExecutor(1) as executor:
+                    self._mock_services(m)
+                    message_launch = message_launch.validate_registration()
+
+                    with self.assertRaises(LtiException):
+                        message_launch.set_prefetch_policy([ContextService.NRPS])
+                    self.assertIsNone(message_launch.start_prefetch())
+
+                    message_launch.set_launch_data_storage(launch_data_storage)
+                    message_launch.set_prefetch_policy(
+                        [ContextService.NRPS, ContextService.AGS], executor=executor
+                    )
+                    self.assertIsNone(message_launch.get_prefetched_context_snapshot())
+                    message_launch.start_prefetch().result()
+
+            restored_launch = FlaskMessageLaunch(
+                FakeRequest(), tool_conf, launch_data_storage=launch_data_storage
+            ).set_launch_id(message_launch.get_launch_id())
+            snapshot = restored_launch.get_prefetched_context_snapshot()
+            self.assertIsNotNone(snapshot)
+            self.assertEqual(
+                [mb["user_id"] for mb in snapshot.get_members()], ["user-1"]
+            )
+            self.assertTrue(snapshot.has_lineitems())
+            self.assertFalse(snapshot.has_groups())
@@ -1,6 +1,7 @@
 import json
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 import requests_mock
+from pylti1p3.course_groups import CourseGroupsService
 from .request import FakeRequest
 from .tool_config import get_test_tool_conf
 from .base import TestServicesBase
@@ -134,3 +135,86 @@ class TestCourseGroups(TestServicesBase):
 
                     sets_with_groups = cgs.get_sets(include_groups=True)
                     self.assertEqual(sets_with_groups, sets_with_groups_data)
+
+    def test_course_groups_without_sets(self):
+        service_connector = Mock()
+        cgs = CourseGroupsService(
+            service_connector,
+            {
+                "scope": [
+                    "https://purl.imsglobal.org/spec/lti-gs/scope/contextgroup.readonly"
+                ],
+                "context_groups_url": self.context_groups_url,
+            },
+        )
+        self.assertFalse(cgs.has_sets())
+        self.assertEqual(cgs.get_sets(include_groups=True), [])
+        service_connector.make_service_request.assert_not_called()
+
+    def test_course_groups_index(self):
+        # pylint: disable=import-outside-toplevel
+        from pylti1p3.contrib.flask import FlaskMessageLaunch
+
+        tool_conf = get_test_tool_conf()
+
+        with patch.object(
+            FlaskMessageLaunch, "_get_jwt_body", autospec=True
+        ) as get_jwt_body:
+            message_launch = FlaskMessageLaunch(FakeRequest(), tool_conf)
+            get_jwt_body.side_effect = lambda x: self._get_jwt_body()
+            with patch("socket.gethostbyname", return_value="127.0.0.1"):
+                with requests_mock.Mocker() as m:
+                    m.post(
+                        self._get_auth_token_url(),
+                        text=json.dumps(self._get_auth_token_response()),
+                    )
+                    m.get(
+                        self.context_groups_url,
+                        text=json.dumps(
+                            {
+                                "groups": [
+                                    {"id": "g1", "name": "Group 1", "set_id": "s1"},
+                                    {"id": "g2", "name": "Group 2", "set_id": "s1"},
+                                    {"id": "g3", "name": "Group 3"},
+                                ]
+                            }
+                        ),
+                    )
+                    m.get(
+                        self.context_group_sets_url,
+                        text=json.dumps(
+                            {
+                                "sets": [
+                                    {"id": "s1", "name": "Set 1"},
+                                    {"id": "s2", "name": "Set 2"},
+                                ]
+                            }
+                        ),
+                    )
+
+                    cgs = message_launch.validate_registration().get_cgs()
+                    index = cgs.get_index(
+                        members=[
+                            {
+                                "user_id": "user-1",
+                                "group_enrollments": [
+                                    {"group_id": "g1"},
+                                    {"group_id": "g3"},
+                                ],
+                            },
+                            {"user_id": "user-2"},
+                        ]
+                    )
+
+                    self.assertEqual(
+                        [g["id"] for g in index.get_set_groups("s1")], ["g1", "g2"]
+                    )
+                    self.assertEqual(index.get_set_groups("s2"), [])
+                    self.assertEqual(index.get_group_set("g2")["name"], "Set 1")
+                    self.assertIsNone(index.get_group_set("g3"))
+                    self.assertEqual(
+                        [g["id"] for g in index.get_user_groups("user-1")], ["g1", "g3"]
+                    )
+                    self.assertEqual(index.get_user_groups("user-2"), [])
+                    # auth + sets + groups
+                    self.assertEqual(len(m.request_history), 3)
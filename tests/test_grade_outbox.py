@@ -0,0 +1,240 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import requests_mock
+
+from pylti1p3.grade import Grade
+from pylti1p3.grade_outbox.drainer import GradeOutboxDrainer
+from pylti1p3.grade_outbox.sqlite import SqliteGradeOutbox
+from pylti1p3.lineitem import LineItem
+from .base import TestServicesBase
+from .django_db import DJANGO_DB_APPS, setup_django_db
+from .request import FakeRequest
+from .tool_config import get_test_tool_conf
+
+
+class TestGradeOutbox(TestServicesBase):
+    # pylint: disable=import-outside-toplevel
+
+    score_url = "http://canvas.docker/api/lti/courses/1/line_items/1/scores"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.outbox = SqliteGradeOutbox(os.path.join(self.tmp_dir, "outbox.db"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _enqueue_grades(self, tool_conf, scores):
+        from pylti1p3.contrib.django import DjangoMessageLaunch
+
+        with patch.object(
+            DjangoMessageLaunch, "_get_jwt_body", autospec=True
+        ) as get_jwt_body:
+            message_launch = DjangoMessageLaunch(FakeRequest(), tool_conf)
+            get_jwt_body.side_effect = lambda x: self._get_jwt_body()
+            ags = message_launch.validate_registration().get_ags()
+            ags.set_grade_outbox(self.outbox)
+
+            line_item = LineItem(
+                {"id": "http://canvas.docker/api/lti/courses/1/line_items/1"}
+            )
+            for user_id, score in scores:
+                grade = Grade()
+                grade.set_score_given(score).set_score_maximum(100).set_user_id(user_id)
+                ags.enqueue_grade(grade, line_item)
+
+    def test_enqueue_coalesces_and_drains(self):
+        tool_conf = get_test_tool_conf()
+        self._enqueue_grades(
+            tool_conf, [("user-1", 10), ("user-2", 20), ("user-1", 30)]
+        )
+
+        items = self.outbox.get_due_items(10, time.time())
+        self.assertEqual(len(items), 2)
+
+        drainer = GradeOutboxDrainer(self.outbox, tool_conf, max_workers=1)
+        with patch("socket.gethostbyname", return_value="127.0.0.1"):
+            with requests_mock.Mocker() as m:
+                m.post(
+                    self._get_auth_token_url(),
+                    text=json.dumps(self._get_auth_token_response()),
+                )
+                m.post(self.score_url, text="{}")
+                self.assertEqual(drainer.drain(), 2)
+
+                scores = [
+                    r.json() for r in m.request_history if r.url == self.score_url
+                ]
+                self.assertEqual(len(scores), 2)
+                self.assertIn(
+                    {"scoreGiven": 30, "scoreMaximum": 100, "userId": "user-1"}, scores
+                )
+
+        self.assertEqual(self.outbox.get_due_items(10, time.time() + 3600), [])
+
+    def test_drain_retries_failed_scores(self):
+        tool_conf = get_test_tool_conf()
+        self._enqueue_grades(tool_conf, [("user-1", 10), ("user-2", 20)])
+
+        drainer = GradeOutboxDrainer(
+            self.outbox, tool_conf, retry_delay=60, max_workers=1
+        )
+        with patch("socket.gethostbyname", return_value="127.0.0.1"):
+            with requests_mock.Mocker() as m:
+                m.post(
+                    self._get_auth_token_url(),
+                    text=json.dumps(self._get_auth_token_response()),
+                )
+                m.post(
+                    self.score_url,
+                    [
+                        {"status_code": 503, "text": "unavailable"},
+                        {"status_code": 400, "text": "bad request"},
+                    ],
+                )
+                self.assertEqual(drainer.drain(), 0)
+
+        # the first score will be retried later, the second one is rejected by the platform
+        self.assertEqual(self.outbox.get_due_items(10, time.time()), [])
+        items = self.outbox.get_due_items(10, time.time() + 3600)
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0]["attempts"], 1)
+        self.assertEqual(items[0]["user_id"], "user-1")
+
+    def test_drainers_claim_scores_with_lease(self):
+        tool_conf = get_test_tool_conf()
+        self._enqueue_grades(tool_conf, [("user-1", 10), ("user-2", 20)])
+        other_outbox = SqliteGradeOutbox(os.path.join(self.tmp_dir, "outbox.db"))
+
+        now = time.time()
+        items = self.outbox.get_due_items(1, now, lease_time=60)
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0]["next_attempt_at"], now + 60)
+        # the claimed score is hidden from the other drainers until the lease expires
+        other_items = other_outbox.get_due_items(10, now, lease_time=60)
+        self.assertEqual(len(other_items), 1)
+        self.assertNotEqual(items[0]["key"], other_items[0]["key"])
+        self.assertEqual(other_outbox.get_due_items(10, now, lease_time=60), [])
+        self.assertEqual(len(other_outbox.get_due_items(10, now + 61)), 2)
+
+        self.outbox.mark_sent(items[0])
+        self.assertEqual(len(other_outbox.get_due_items(10, now + 61)), 1)
+
+
+class TestDjangoGradeOutbox(unittest.TestCase):
+    # pylint: disable=import-outside-toplevel
+
+    score_url = "http://canvas.docker/api/lti/courses/1/line_items/1/scores"
+
+    @classmethod
+    def setUpClass(cls):
+        setup_django_db()
+
+    def setUp(self):
+        from pylti1p3.contrib.django import DjangoDbGradeOutbox
+        from pylti1p3.contrib.django.lti1p3_grade_outbox.models import (
+            LtiGradeOutboxItem,
+        )
+
+        LtiGradeOutboxItem.objects.all().delete()  # pylint: disable=no-member
+        self.outbox = DjangoDbGradeOutbox()
+
+    def _enqueue(self, user_id, score):
+        payload = json.dumps({"scoreGiven": score, "userId": user_id})
+        self.outbox.enqueue(
+            "https://canvas.instructure.com",
+            "10000000000004",
+            self.score_url,
+            ["https://purl.imsglobal.org/spec/lti-ags/scope/score"],
+            user_id,
+            payload,
+        )
+
+    def test_migrations_are_up_to_date(self):
+        from django.core.management import call_command
+
+        for app in DJANGO_DB_APPS:
+            # raises SystemExit if the models have changes without migration
+            call_command(
+                "makemigrations",
+                app.rsplit(".", maxsplit=1)[-1],
+                check=True,
+                dry_run=True,
+                verbosity=0,
+            )
+
+    def test_enqueue_coalesces_and_claims(self):
+        self._enqueue("user-1", 10)
+        self._enqueue("user-2", 20)
+        self._enqueue("user-1", 30)
+
+        now = time.time()
+        items = self.outbox.get_due_items(10, now)
+        self.assertEqual(len(items), 2)
+        user_1 = [item for item in items if item["user_id"] == "user-1"][0]
+        self.assertEqual(json.loads(user_1["payload"])["scoreGiven"], 30)
+        self.assertEqual(
+            user_1["scope"], ["https://purl.imsglobal.org/spec/lti-ags/scope/score"]
+        )
+
+        claimed = self.outbox.get_due_items(1, now, lease_time=60)
+        self.assertEqual(len(claimed), 1)
+        self.assertAlmostEqual(claimed[0]["next_attempt_at"], now + 60, places=3)
+        self.assertEqual(len(self.outbox.get_due_items(10, now, lease_time=60)), 1)
+        self.assertEqual(self.outbox.get_due_items(10, now, lease_time=60), [])
+        self.assertEqual(len(self.outbox.get_due_items(10, now + 61)), 2)
+
+    def test_claim_with_skip_locked(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self._enqueue("user-1", 10)
+        self._enqueue("user-2", 20)
+        self._enqueue("user-3", 30)
+
+        now = time.time()
+        # SQLite doesn't lock rows, so only the single UPDATE of the claimed items is checked here
+        with patch.object(
+            connection.features, "has_select_for_update_skip_locked", True
+        ):
+            with CaptureQueriesContext(connection) as ctx:
+                claimed = self.outbox.get_due_items(2, now, lease_time=60)
+        self.assertEqual(len(claimed), 2)
+        statements = [
+            query["sql"].split()[0]
+            for query in ctx.captured_queries
+            if query["sql"].startswith(("SELECT", "UPDATE"))
+        ]
+        self.assertEqual(statements, ["SELECT", "UPDATE"])
+        self.assertEqual(
+            {item["next_attempt_at"] for item in claimed},
+            {claimed[0]["next_attempt_at"]},
+        )
+        self.assertAlmostEqual(claimed[0]["next_attempt_at"], now + 60, places=3)
+        self.assertEqual(len(self.outbox.get_due_items(10, now, lease_time=60)), 1)
+
+    def test_mark_sent_and_failed(self):
+        self._enqueue("user-1", 10)
+        self._enqueue("user-2", 20)
+        now = time.time()
+        items = sorted(self.outbox.get_due_items(10, now), key=lambda i: i["user_id"])
+
+        # score replaced in the meantime isn't removed
+        self._enqueue("user-1", 15)
+        self.outbox.mark_sent(items[0])
+        self.outbox.mark_failed(items[1], "error", now + 60)
+
+        items = self.outbox.get_due_items(10, now + 61)
+        self.assertEqual(len(items), 2)
+        user_2 = [item for item in items if item["user_id"] == "user-2"][0]
+        self.assertEqual(user_2["attempts"], 1)
+        self.assertEqual(user_2["last_error"], "error")
+
+        self.outbox.mark_failed(user_2, "error", None)
+        self.assertEqual(len(self.outbox.get_due_items(10, now + 3600)), 1)
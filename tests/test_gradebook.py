@@ -0,0 +1,150 @@
+import io
+import json
+import math
+from unittest.mock import patch
+
+import requests_mock
+
+from pylti1p3.gradebook import GradebookExporter
+from .base import TestServicesBase
+from .request import FakeRequest
+from .tool_config import get_test_tool_conf
+
+
+class TestGradebook(TestServicesBase):
+    # pylint: disable=import-outside-toplevel
+
+    line_items_url = "http://canvas.docker/api/lti/courses/1/line_items"
+
+    def _mock_gradebook(self, m):
+        m.post(
+            self._get_auth_token_url(),
+            text=json.dumps(self._get_auth_token_response()),
+        )
+        m.get(
+            self.line_items_url,
+            text=json.dumps(
+                [
+                    {
+                        "id": self.line_items_url + "/1",
+                        "tag": "score",
+                        "label": "Score",
+                        "scoreMaximum": 100.0,
+                    },
+                    {
+                        "id": self.line_items_url + "/2",
+                        "tag": "time",
+                        "label": "Time",
+                        "scoreMaximum": 10.0,
+                    },
+                ]
+            ),
+        )
+        m.get(
+            self.line_items_url + "/1/results",
+            text=json.dumps(
+                [{"userId": "user-1", "resultScore": 13.0, "resultMaximum": 100.0}]
+            ),
+            headers={"Link": f'<{self.line_items_url}/1/results?page=2>; rel="next"'},
+        )
+        m.get(
+            self.line_items_url + "/1/results?page=2",
+            text=json.dumps(
+                [{"userId": "user-2", "resultScore": 55.0, "resultMaximum": 100.0}]
+            ),
+        )
+        m.get(
+            self.line_items_url + "/2/results",
+            text=json.dumps(
+                [
+                    {
+                        "userId": "user-1",
+                        "resultScore": 3.0,
+                        "resultMaximum": 10.0,
+                        "comment": "Fast",
+                    }
+                ]
+            ),
+        )
+
+    def test_export_gradebook(self):
+        from pylti1p3.contrib.django import DjangoMessageLaunch
+
+        tool_conf = get_test_tool_conf()
+
+        with patch.object(
+            DjangoMessageLaunch, "_get_jwt_body", autospec=True
+        ) as get_jwt_body:
+            message_launch = DjangoMessageLaunch(FakeRequest(), tool_conf)
+            get_jwt_body.side_effect = lambda x: self._get_jwt_body()
+            with patch("socket.gethostbyname", return_value="127.0.0.1"):
+                with requests_mock.Mocker() as m:
+                    self._mock_gradebook(m)
+
+                    ags = message_launch.validate_registration().get_ags()
+                    progress = []
+                    exporter = GradebookExporter(
+                        ags,
+                        max_workers=2,
+                        progress_callback=lambda done, total: progress.append(
+                            (done, total)
+                        ),
+                    )
+
+                    jsonl = io.StringIO()
+                    self.assertEqual(exporter.export_jsonl(jsonl), 3)
+                    rows = [json.loads(line) for line in jsonl.getvalue().splitlines()]
+                    rows.sort(key=lambda r: (r["lineitem_tag"], r["user_id"]))
+                    self.assertEqual(
+                        [
+                            (r["lineitem_tag"], r["user_id"], r["result_score"])
+                            for r in rows
+                        ],
+                        [
+                            ("score", "user-1", 13.0),
+                            ("score", "user-2", 55.0),
+                            ("time", "user-1", 3.0),
+                        ],
+                    )
+                    self.assertEqual(progress, [(1, 2), (2, 2)])
+
+                    csv_data = io.StringIO()
+                    self.assertEqual(exporter.export_csv(csv_data), 3)
+                    self.assertEqual(
+                        csv_data.getvalue().splitlines()[0],
+                        "lineitem_id,lineitem_label,lineitem_tag,user_id,"
+                        "result_score,result_maximum,comment",
+                    )
+
+    def test_gradebook_matrix(self):
+        from pylti1p3.contrib.numpy import GradebookMatrix
+
+        def row(lineitem_id, user_id, score, maximum):
+            return {
+                "lineitem_id": lineitem_id,
+                "lineitem_label": None,
+                "lineitem_tag": None,
+                "user_id": user_id,
+                "result_score": score,
+                "result_maximum": maximum,
+                "comment": None,
+            }
+
+        matrix = GradebookMatrix.from_rows(
+            [
+                row("ln-1", "user-1", 50.0, 100.0),
+                row("ln-1", "user-2", 100.0, 100.0),
+                row("ln-2", "user-1", 3.0, 10.0),
+                row("ln-3", "user-2", None, 10.0),
+            ]
+        )
+
+        self.assertEqual(matrix.user_ids, ["user-1", "user-2"])
+        self.assertEqual(matrix.lineitem_ids, ["ln-1", "ln-2", "ln-3"])
+        self.assertEqual(matrix.get_user_scores("user-1")[:2].tolist(), [50.0, 3.0])
+        self.assertTrue(math.isnan(matrix.get_lineitem_scores("ln-2")[1]))
+
+        stats = matrix.lineitem_stats()
+        self.assertEqual(stats["count"].tolist(), [2, 1, 0])
+        self.assertEqual(stats["mean"][:2].tolist(), [0.75, 0.3])
+        self.assertTrue(math.isnan(stats["mean"][2]))
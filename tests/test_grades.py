@@ -5,9 +5,11 @@ from unittest.mock import patch
 import requests_mock
 from parameterized import parameterized
 
+from pylti1p3.exception import LtiException
 from pylti1p3.grade import Grade
 from pylti1p3.lineitem import LineItem
 from .base import TestServicesBase
+from .cache import Cache, FakeCacheDataStorage
 from .request import FakeRequest
 from .tool_config import get_test_tool_conf
 
@@ -166,6 +168,272 @@ class TestGrades(TestServicesBase):
                     resp = ags.put_grade(sc, sc_line_item)
                     self.assertEqual(expected_result, resp["body"])
 
+    def test_send_scores_bulk(self):
+        from pylti1p3.contrib.django import DjangoMessageLaunch
+
+        tool_conf = get_test_tool_conf()
+
+        with patch.object(
+            DjangoMessageLaunch, "_get_jwt_body", autospec=True
+        ) as get_jwt_body:
+            message_launch = DjangoMessageLaunch(FakeRequest(), tool_conf)
+            get_jwt_body.side_effect = lambda x: self._get_jwt_body()
+            with patch("socket.gethostbyname", return_value="127.0.0.1"):
+                with requests_mock.Mocker() as m:
+                    m.post(
+                        self._get_auth_token_url(),
+                        text=json.dumps(self._get_auth_token_response()),
+                    )
+                    m.get(
+                        "http://canvas.docker/api/lti/courses/1/line_items",
+                        text=json.dumps(
+                            [
+                                {
+                                    "scoreMaximum": 100.0,
+                                    "tag": "score",
+                                    "id": "http://canvas.docker/api/lti/courses/1/line_items/1",
+                                    "label": "Score",
+                                }
+                            ]
+                        ),
+                    )
+                    m.post(
+                        "http://canvas.docker/api/lti/courses/1/line_items/1/scores",
+                        [
+                            {"text": "{}"},
+                            {"status_code": 500, "text": "error"},
+                            {"text": "{}"},
+                        ],
+                    )
+
+                    ags = message_launch.validate_registration().get_ags()
+
+                    grades = []
+                    for i in range(3):
+                        sc = Grade()
+                        sc.set_score_given(i).set_score_maximum(100).set_user_id(
+                            f"user-{i}"
+                        )
+                        sc_line_item = LineItem()
+                        sc_line_item.set_tag("score").set_score_maximum(100)
+                        grades.append((sc, sc_line_item))
+
+                    results = ags.put_grades(grades, max_workers=1)
+
+                    self.assertEqual(len(results), 3)
+                    self.assertEqual(
+                        [res["grade"] for res in results], [g[0] for g in grades]
+                    )
+                    self.assertIsNone(results[0]["error"])
+                    self.assertIsNotNone(results[1]["error"])
+                    self.assertIsNone(results[1]["response"])
+                    self.assertIsNone(results[2]["error"])
+
+                    # Auth, one GET Line items for the same tag, three POST scores
+                    self.assertEqual(len(m.request_history), 5)
+                    self.assertEqual(
+                        [r.method for r in m.request_history],
+                        ["POST", "GET", "POST", "POST", "POST"],
+                    )
+
+    def test_send_scores_bulk_concurrently(self):
+        from pylti1p3.contrib.django import DjangoMessageLaunch
+
+        tool_conf = get_test_tool_conf()
+        score_url = "http://canvas.docker/api/lti/courses/1/line_items/1/scores"
+
+        def score_response(request, context):
+            if request.json()["userId"] == "user-3":
+                context.status_code = 500
+                return "error"
+            return "{}"
+
+        with patch.object(
+            DjangoMessageLaunch, "_get_jwt_body", autospec=True
+        ) as get_jwt_body:
+            message_launch = DjangoMessageLaunch(FakeRequest(), tool_conf)
+            get_jwt_body.side_effect = lambda x: self._get_jwt_body()
+            with patch("socket.gethostbyname", return_value="127.0.0.1"):
+                with requests_mock.Mocker() as m:
+                    m.post(
+                        self._get_auth_token_url(),
+                        text=json.dumps(self._get_auth_token_response()),
+                    )
+                    m.post(score_url, text=score_response)
+
+                    ags = message_launch.validate_registration().get_ags()
+
+                    grades = []
+                    for i in range(8):
+                        sc = Grade()
+                        sc.set_score_given(i).set_score_maximum(100).set_user_id(
+                            f"user-{i}"
+                        )
+                        sc_line_item = LineItem()
+                        sc_line_item.set_id(score_url[: -len("/scores")])
+                        grades.append((sc, sc_line_item))
+
+                    results = ags.put_grades(grades, max_workers=4)
+
+                    self.assertEqual(
+                        [res["grade"] for res in results], [g[0] for g in grades]
+                    )
+                    self.assertEqual(
+                        [i for i, res in enumerate(results) if res["error"]], [3]
+                    )
+                    self.assertIsNone(results[3]["response"])
+                    self.assertTrue(
+                        all(res["response"] for i, res in enumerate(results) if i != 3)
+                    )
+
+                    # access token is requested once and shared by all workers
+                    self.assertEqual(
+                        [r.url for r in m.request_history].count(
+                            self._get_auth_token_url()
+                        ),
+                        1,
+                    )
+                    self.assertEqual(len(m.request_history), 9)
+
+    def test_send_unchanged_scores_skipped(self):
+        from pylti1p3.contrib.django import DjangoMessageLaunch
+
+        tool_conf = get_test_tool_conf()
+        score_url = "http://canvas.docker/api/lti/courses/1/line_items/1/scores"
+
+        with patch.object(
+            DjangoMessageLaunch, "_get_jwt_body", autospec=True
+        ) as get_jwt_body:
+            message_launch = DjangoMessageLaunch(FakeRequest(), tool_conf)
+            get_jwt_body.side_effect = lambda x: self._get_jwt_body()
+            with patch("socket.gethostbyname", return_value="127.0.0.1"):
+                with requests_mock.Mocker() as m:
+                    m.post(
+                        self._get_auth_token_url(),
+                        text=json.dumps(self._get_auth_token_response()),
+                    )
+                    m.post(score_url, text="{}")
+
+                    ags = message_launch.validate_registration().get_ags()
+                    ags.set_score_deduplication(FakeCacheDataStorage())
+                    line_item = LineItem(
+                        {"id": "http://canvas.docker/api/lti/courses/1/line_items/1"}
+                    )
+
+                    for score, timestamp in [
+                        (5, "2023-01-01T00:00:00+0000"),
+                        (5.0, "2023-01-02T00:00:00+0000"),
+                        (7, "2023-01-03T00:00:00+0000"),
+                    ]:
+                        sc = Grade()
+                        sc.set_score_given(score).set_score_maximum(100).set_timestamp(
+                            timestamp
+                        ).set_user_id("user-1")
+                        ags.put_grade(sc, line_item)
+
+                    # the second score is the same as the first one
+                    sent_scores = [
+                        r.json()["scoreGiven"]
+                        for r in m.request_history
+                        if r.url == score_url
+                    ]
+                    self.assertEqual(sent_scores, [5, 7])
+
+    def test_lineitems_response_cache(self):
+        from pylti1p3.contrib.django import DjangoMessageLaunch
+
+        tool_conf = get_test_tool_conf()
+        line_items_url = "http://canvas.docker/api/lti/courses/1/line_items"
+        line_item_url = "http://canvas.docker/api/lti/courses/1/line_items/1"
+        cache = FakeCacheDataStorage()
+
+        with patch.object(
+            DjangoMessageLaunch, "_get_jwt_body", autospec=True
+        ) as get_jwt_body:
+            get_jwt_body.side_effect = lambda x: self._get_jwt_body()
+            with patch("socket.gethostbyname", return_value="127.0.0.1"):
+                with requests_mock.Mocker() as m:
+                    m.post(
+                        self._get_auth_token_url(),
+                        text=json.dumps(self._get_auth_token_response()),
+                    )
+                    m.get(
+                        line_items_url,
+                        text=json.dumps([{"id": line_item_url, "label": "Quiz"}]),
+                    )
+                    m.put(
+                        line_item_url,
+                        text=json.dumps({"id": line_item_url, "label": "Quiz 2"}),
+                    )
+
+                    def get_ags():
+                        return (
+                            DjangoMessageLaunch(FakeRequest(), tool_conf)
+                            .set_service_response_cache(cache)
+                            .validate_registration()
+                            .get_ags()
+                        )
+
+                    def lineitems_requests_count():
+                        return len(
+                            [
+                                r
+                                for r in m.request_history
+                                if r.method == "GET" and r.url == line_items_url
+                            ]
+                        )
+
+                    ags = get_ags()
+                    self.assertEqual(ags.get_lineitems()[0]["label"], "Quiz")
+                    # the second launch (i.e. another worker) gets the cached response
+                    # with one round trip to the cache
+                    with patch.object(
+                        Cache, "get_many", autospec=True, side_effect=Cache.get_many
+                    ) as cache_get_many, patch.object(
+                        Cache, "get", autospec=True, side_effect=Cache.get
+                    ) as cache_get:
+                        self.assertEqual(get_ags().get_lineitems()[0]["label"], "Quiz")
+                    self.assertEqual(cache_get_many.call_count, 1)
+                    self.assertEqual(cache_get.call_count, 0)
+                    self.assertEqual(lineitems_requests_count(), 1)
+
+                    ags.update_lineitem(
+                        LineItem({"id": line_item_url, "label": "Quiz 2"})
+                    )
+                    get_ags().get_lineitems()
+                    self.assertEqual(lineitems_requests_count(), 2)
+
+    def test_cached_frozen_models(self):
+        grade = Grade().set_score_given(5).set_score_maximum(10).set_user_id("user-1")
+        self.assertFalse(hasattr(grade, "__dict__"))
+        value = grade.get_value()
+        self.assertIs(grade.get_value(), value)
+        grade.set_score_given(7)
+        self.assertEqual(json.loads(grade.get_value())["scoreGiven"], 7)
+        grade.freeze()
+        with self.assertRaises(LtiException):
+            grade.set_score_given(8)
+        self.assertEqual(json.loads(grade.get_value())["scoreGiven"], 7)
+
+        extra_claims = {"https://canvas.instructure.com/lti/submission": {"new": 1}}
+        grade = Grade().set_score_given(5).set_extra_claims(extra_claims)
+        value = grade.get_value()
+        extra_claims["https://canvas.instructure.com/lti/submission"]["new"] = 2
+        self.assertEqual(grade.get_value(), value)
+
+        line_item = LineItem(
+            {"id": "http://canvas.docker/api/lti/courses/1/line_items/1", "tag": "quiz"}
+        )
+        self.assertFalse(hasattr(line_item, "__dict__"))
+        value = line_item.get_value()
+        self.assertIs(line_item.get_value(), value)
+        line_item.set_label("Quiz")
+        self.assertEqual(json.loads(line_item.get_value())["label"], "Quiz")
+        line_item.freeze()
+        with self.assertRaises(LtiException):
+            line_item.set_tag("other")
+        self.assertEqual(line_item.get_tag(), "quiz")
+
     def test_delete_lineitem(self):
         from pylti1p3.contrib.django import DjangoMessageLaunch
 
@@ -271,6 +539,72 @@ class TestGrades(TestServicesBase):
                     self.assertEqual(m.request_history[2].method, 'POST')
                     self.assertEqual(m.request_history[2].url, line_items_url)
 
+    def test_find_or_create_lineitems(self):
+        from pylti1p3.contrib.django import DjangoMessageLaunch
+
+        tool_conf = get_test_tool_conf()
+        line_items_url = "http://canvas.docker/api/lti/courses/1/line_items"
+
+        def create_lineitem(request, context):  # pylint: disable=unused-argument
+            data = request.json()
+            data["id"] = line_items_url + "/" + data["tag"]
+            return json.dumps(data)
+
+        with patch.object(
+            DjangoMessageLaunch, "_get_jwt_body", autospec=True
+        ) as get_jwt_body:
+            message_launch = DjangoMessageLaunch(FakeRequest(), tool_conf)
+            get_jwt_body.side_effect = lambda x: self._get_jwt_body()
+            with patch("socket.gethostbyname", return_value="127.0.0.1"):
+                with requests_mock.Mocker() as m:
+                    m.post(
+                        self._get_auth_token_url(),
+                        text=json.dumps(self._get_auth_token_response()),
+                    )
+                    m.get(
+                        line_items_url,
+                        text=json.dumps(
+                            [{"id": line_items_url + "/1", "tag": "a", "label": "A"}]
+                        ),
+                    )
+                    m.post(line_items_url, text=create_lineitem)
+
+                    ags = message_launch.validate_registration().get_ags()
+                    new_lineitems = []
+                    for tag in ["b", "a", "b", "c"]:
+                        new_lineitems.append(
+                            LineItem()
+                            .set_tag(tag)
+                            .set_label(tag.upper())
+                            .set_score_maximum(10)
+                        )
+
+                    lineitems = ags.find_or_create_lineitems(new_lineitems)
+                    self.assertEqual(
+                        [ln.get_id() for ln in lineitems],
+                        [
+                            line_items_url + "/b",
+                            line_items_url + "/1",
+                            line_items_url + "/b",
+                            line_items_url + "/c",
+                        ],
+                    )
+                    # Auth, one GET Line items, POST Line items for "b" and "c"
+                    self.assertEqual(
+                        sorted(r.method for r in m.request_history),
+                        ["GET", "POST", "POST", "POST"],
+                    )
+
+                    with self.assertRaises(LtiException):
+                        ags.find_or_create_lineitems([LineItem().set_label("No tag")])
+
+                    # pylint: disable=protected-access
+                    errors = ags._find_or_create_lineitems(
+                        [LineItem(), LineItem()], "tag", max_workers=2
+                    )
+                    self.assertIsInstance(errors[0], LtiException)
+                    self.assertIsNot(errors[0], errors[1])
+
     def test_update_lineitem(self):
         from pylti1p3.contrib.django import DjangoMessageLaunch
 
@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import requests_mock
+
+from pylti1p3.job_runner import ServiceJobRunner, ServiceJobTarget
+from .tool_config import get_test_tool_conf
+
+
+class TestJobRunner(unittest.TestCase):
+    iss = "https://canvas.instructure.com"
+    auth_token_url = "http://canvas.docker/login/oauth2/token"
+
+    def _get_members_url(self, course_id):
+        return f"http://canvas.docker/api/lti/courses/{course_id}/names_and_roles"
+
+    def _get_targets(self):
+        registration = get_test_tool_conf().find_registration(self.iss)
+        return [
+            ServiceJobTarget(
+                f"course-{course_id}",
+                registration,
+                {
+                    "https://purl.imsglobal.org/spec/lti-nrps/claim/namesroleservice": {
+                        "context_memberships_url": self._get_members_url(course_id)
+                    }
+                },
+            )
+            for course_id in range(1, 4)
+        ]
+
+    def test_run_and_resume(self):
+        def count_members(target, connector):
+            return len(target.get_nrps(connector).get_members())
+
+        members_response = json.dumps({"members": [{"user_id": "1"}, {"user_id": "2"}]})
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint_path = os.path.join(tmp_dir, "checkpoint.jsonl")
+            runner = ServiceJobRunner(
+                max_workers=4,
+                max_workers_per_platform=2,
+                checkpoint_path=checkpoint_path,
+            )
+
+            with patch("socket.gethostbyname", return_value="127.0.0.1"):
+                with requests_mock.Mocker() as m:
+                    m.post(
+                        self.auth_token_url, text=json.dumps({"access_token": "token"})
+                    )
+                    m.get(self._get_members_url(1), text=members_response)
+                    m.get(self._get_members_url(2), status_code=500, text="error")
+                    m.get(self._get_members_url(3), text=members_response)
+
+                    res = runner.run(count_members, self._get_targets())
+                    self.assertEqual(res["results"], {"course-1": 2, "course-3": 2})
+                    self.assertEqual(list(res["errors"]), ["course-2"])
+                    self.assertEqual(res["resumed"], [])
+                    # all targets of the registration share one access token
+                    self.assertEqual(
+                        len(
+                            [
+                                r
+                                for r in m.request_history
+                                if r.url == self.auth_token_url
+                            ]
+                        ),
+                        1,
+                    )
+
+                with requests_mock.Mocker() as m:
+                    m.post(
+                        self.auth_token_url, text=json.dumps({"access_token": "token"})
+                    )
+                    m.get(self._get_members_url(2), text=members_response)
+
+                    # only the failed target is run again
+                    res = runner.run(count_members, self._get_targets())
+                    self.assertEqual(
+                        res["results"], {"course-1": 2, "course-2": 2, "course-3": 2}
+                    )
+                    self.assertEqual(res["errors"], {})
+                    self.assertEqual(sorted(res["resumed"]), ["course-1", "course-3"])
+
+            with open(checkpoint_path, encoding="utf-8") as f:
+                # one line per completed target
+                self.assertEqual(len(f.readlines()), 3)
+
+            runner.reset_checkpoint()
+            self.assertFalse(os.path.exists(checkpoint_path))
+
+    def test_checkpoint_with_not_serializable_result(self):
+        results = {"course-1": 1, "course-2": object(), "course-3": 3}
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint_path = os.path.join(tmp_dir, "checkpoint.jsonl")
+            runner = ServiceJobRunner(max_workers=1, checkpoint_path=checkpoint_path)
+            res = runner.run(
+                lambda target, connector: results[target.get_key()], self._get_targets()
+            )
+            self.assertEqual(res["results"], {"course-1": 1, "course-3": 3})
+            self.assertEqual(list(res["errors"]), ["course-2"])
+            self.assertEqual(os.listdir(tmp_dir), ["checkpoint.jsonl"])
+
+            # interrupted write of the last line
+            with open(checkpoint_path, "a", encoding="utf-8") as f:
+                f.write('{"key": "course-2", "res')
+            res = runner.run(lambda target, connector: 2, self._get_targets())
+            self.assertEqual(
+                res["results"], {"course-1": 1, "course-2": 2, "course-3": 3}
+            )
+            # dropped line doesn't break the next appends
+            res = runner.run(lambda target, connector: 0, self._get_targets())
+            self.assertEqual(
+                sorted(res["resumed"]), ["course-1", "course-2", "course-3"]
+            )
@@ -1,6 +1,9 @@
 import json
+import time
 from unittest.mock import patch
 import requests_mock
+from pylti1p3.roles import StudentRole
+from pylti1p3.utils import map_concurrently
 from .request import FakeRequest
 from .tool_config import get_test_tool_conf
 from .base import TestServicesBase
@@ -87,3 +90,134 @@ class TestNamesRolesProvisioningService(TestServicesBase):
                             ],
                         },
                     )
+
+    def test_get_roster(self):
+        # pylint: disable=import-outside-toplevel
+        from pylti1p3.contrib.django import DjangoMessageLaunch
+
+        tool_conf = get_test_tool_conf()
+        members_url = self._get_jwt_body()[
+            "https://purl.imsglobal.org/spec/lti-nrps/claim/namesroleservice"
+        ]["context_memberships_url"]
+        learner = "http://purl.imsglobal.org/vocab/lis/v2/membership#Learner"
+        instructor = "http://purl.imsglobal.org/vocab/lis/v2/membership#Instructor"
+
+        with patch.object(
+            DjangoMessageLaunch, "_get_jwt_body", autospec=True
+        ) as get_jwt_body:
+            message_launch = DjangoMessageLaunch(FakeRequest(), tool_conf)
+            get_jwt_body.side_effect = lambda x: self._get_jwt_body()
+            with patch("socket.gethostbyname", return_value="127.0.0.1"):
+                with requests_mock.Mocker() as m:
+                    m.post(
+                        self._get_auth_token_url(),
+                        text=json.dumps(self._get_auth_token_response()),
+                    )
+                    m.get(
+                        members_url,
+                        text=json.dumps(
+                            {
+                                "members": [
+                                    {
+                                        "status": "Active",
+                                        "user_id": "user-1",
+                                        "lis_person_sourcedid": "sis-1",
+                                        "roles": [learner],
+                                        "message": [{"custom": "data"}],
+                                    },
+                                    {
+                                        "status": "Active",
+                                        "user_id": "user-2",
+                                        "roles": [instructor],
+                                    },
+                                ]
+                            }
+                        ),
+                        headers={"Link": f'<{members_url}?page=2>; rel="next"'},
+                    )
+                    m.get(
+                        members_url + "?page=2",
+                        text=json.dumps(
+                            {
+                                "members": [
+                                    {
+                                        "status": "Inactive",
+                                        "user_id": "user-3",
+                                        "roles": [learner],
+                                    }
+                                ]
+                            }
+                        ),
+                    )
+                    roster = (
+                        message_launch.validate_registration().get_nrps().get_roster()
+                    )
+
+                    self.assertEqual(len(roster), 3)
+                    self.assertIn("user-2", roster)
+                    self.assertEqual(roster.get_by_sourcedid("sis-1").user_id, "user-1")
+                    self.assertIsNone(roster.get_by_user_id("user-1").message)
+                    self.assertIs(
+                        roster.get_by_user_id("user-1").roles,
+                        roster.get_by_user_id("user-3").roles,
+                    )
+                    self.assertEqual(
+                        [mb.user_id for mb in roster.filter_by_role(StudentRole)],
+                        ["user-1", "user-3"],
+                    )
+                    self.assertEqual(
+                        [mb.user_id for mb in roster.filter_by_role(instructor)],
+                        ["user-2"],
+                    )
+                    self.assertDictEqual(
+                        roster.get_by_user_id("user-2").to_dict(),
+                        {
+                            "status": "Active",
+                            "user_id": "user-2",
+                            "roles": [instructor],
+                        },
+                    )
+
+    def test_get_members_coalesced(self):
+        # pylint: disable=import-outside-toplevel
+        from pylti1p3.contrib.django import DjangoMessageLaunch
+
+        tool_conf = get_test_tool_conf()
+        members_url = self._get_jwt_body()[
+            "https://purl.imsglobal.org/spec/lti-nrps/claim/namesroleservice"
+        ]["context_memberships_url"]
+
+        def slow_members_response(request, context):  # pylint: disable=unused-argument
+            time.sleep(0.5)
+            return json.dumps({"members": [{"user_id": "user-1", "roles": []}]})
+
+        with patch.object(
+            DjangoMessageLaunch, "_get_jwt_body", autospec=True
+        ) as get_jwt_body:
+            get_jwt_body.side_effect = lambda x: self._get_jwt_body()
+            with patch("socket.gethostbyname", return_value="127.0.0.1"):
+                with requests_mock.Mocker() as m:
+                    m.post(
+                        self._get_auth_token_url(),
+                        text=json.dumps(self._get_auth_token_response()),
+                    )
+                    m.get(members_url, text=slow_members_response)
+
+                    def get_members(_):
+                        return (
+                            DjangoMessageLaunch(FakeRequest(), tool_conf)
+                            .set_coalesce_service_requests()
+                            .validate_registration()
+                            .get_nrps()
+                            .get_members()
+                        )
+
+                    results = map_concurrently(get_members, range(3))
+                    self.assertEqual(results[0], [{"user_id": "user-1", "roles": []}])
+                    self.assertEqual(results[0], results[1])
+                    self.assertEqual(results[0], results[2])
+                    self.assertIsNot(results[0], results[1])
+                    members_requests = [
+                        r for r in m.request_history if r.url == members_url
+                    ]
+                    self.assertEqual(len(members_requests), 1)
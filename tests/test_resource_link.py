@@ -1,7 +1,12 @@
+import json
+import time
+from unittest.mock import patch
 from parameterized import parameterized
+import requests_mock
 from pylti1p3.exception import LtiException
+from pylti1p3.session import SessionService
 from .base import TestLinkBase
-from .cache import FakeCacheDataStorage
+from .cache import Cache, FakeCacheDataStorage
 from .django_mixin import DjangoMixin
 from .flask_mixin import FlaskMixin
 
@@ -181,6 +186,7 @@ class ResourceLinkBase(TestLinkBase):
         tool_conf_extended=False,
         enable_check_cookies=False,
         use_cache=False,
+        setup_launch=None,
     ):
         cache = FakeCacheDataStorage() if use_cache else False
         tool_conf, login_request, login_response = self._make_oidc_login(
@@ -193,7 +199,9 @@ class ResourceLinkBase(TestLinkBase):
         launch_request = self._get_request(
             login_request, login_response, request_is_secure=secure
         )
-        message_launch_data = self._launch(launch_request, tool_conf, cache=cache)
+        message_launch_data = self._launch(
+            launch_request, tool_conf, cache=cache, setup_launch=setup_launch
+        )
         self.assertDictEqual(message_launch_data, self.expected_message_launch_data)
 
     @parameterized.expand(
@@ -360,6 +368,134 @@ class ResourceLinkBase(TestLinkBase):
                 self._get_data_with_invalid_message, launch_request, tool_conf
             )
 
+    def test_res_link_launch_stale_key_set(self):
+        tool_conf, login_request, login_response = self._make_oidc_login()
+        launch_request = self._get_request(login_request, login_response)
+        self._launch(launch_request, tool_conf)
+
+        registration = tool_conf.find_registration_by_issuer(self.iss)
+        self.assertIsNotNone(registration.get_key_set())
+        # platform has revoked its keys
+        revoked_key_set = json.dumps({"keys": []})
+        self._launch(launch_request, tool_conf, revoked_key_set)
+
+        registration.set_key_set_fetched_at(time.time() - 7200)
+        with self.assertRaisesRegex(LtiException, "Unable to find public key"):
+            self._launch(launch_request, tool_conf, revoked_key_set)
+
+    def test_res_link_launch_pre_validation(self):
+        def pre_validation(launch):
+            launch.set_pre_validation()
+
+        self._launch_success(setup_launch=pre_validation)
+
+        tool_conf, login_request, login_response = self._make_oidc_login()
+        launch_request = self._get_request(login_request, login_response)
+
+        with patch.object(
+            SessionService, "check_state_and_nonce"
+        ) as check_state_and_nonce:
+            with self.assertRaisesRegex(LtiException, "Incorrect version"):
+                self._launch_with_invalid_jwt_body(
+                    self._get_data_with_invalid_message,
+                    launch_request,
+                    tool_conf,
+                    pre_validation,
+                )
+            with self.assertRaisesRegex(LtiException, "id_token is too large"):
+                self._launch(
+                    launch_request,
+                    tool_conf,
+                    setup_launch=lambda launch: launch.set_pre_validation(
+                        max_id_token_size=10
+                    ),
+                )
+            # junk launches were rejected before the lookups in the storage
+            check_state_and_nonce.assert_not_called()
+
+        # deployment is checked after the signature check
+        with self.assertRaisesRegex(LtiException, "Unable to find deployment"):
+            self._launch_with_invalid_jwt_body(
+                self._get_data_with_invalid_deployment,
+                launch_request,
+                tool_conf,
+                pre_validation,
+            )
+
+    def test_res_link_launch_concurrent_validation(self):
+        def concurrent_validation(launch):
+            launch.set_concurrent_validation()
+
+        def concurrent_pre_validation(launch):
+            launch.set_concurrent_validation().set_pre_validation()
+
+        self._launch_success(setup_launch=concurrent_validation)
+        self._launch_success(use_cache=True, setup_launch=concurrent_validation)
+        self._launch_success(use_cache=True, setup_launch=concurrent_pre_validation)
+
+        tool_conf, login_request, login_response = self._make_oidc_login()
+        launch_request = self._get_request(
+            login_request, login_response, empty_session=True
+        )
+        with self.assertRaisesRegex(LtiException, "Invalid Nonce"):
+            self._launch(launch_request, tool_conf, setup_launch=concurrent_validation)
+
+    def test_res_link_launch_public_key_caching(self):
+        key_set_url = "https://canvas.instructure.com/api/lti/security/jwks"
+        tool_conf, login_request, login_response = self._make_oidc_login()
+        launch_request = self._get_request(login_request, login_response)
+        launch = self._get_launch_obj(launch_request, tool_conf, cache=False)
+
+        # the same storage is used for the launch data
+        storage = FakeCacheDataStorage()
+        storage.set_session_id("session-1")
+        launch.set_public_key_caching(storage)
+        session_ids = []
+
+        def key_set_response(request, context):  # pylint: disable=unused-argument
+            session_ids.append(storage.get_session_id())
+            return json.dumps(self.jwt_canvas_keys)
+
+        with requests_mock.Mocker() as m:
+            m.get(key_set_url, text=key_set_response)
+            self.assertEqual(launch.fetch_public_key(key_set_url), self.jwt_canvas_keys)
+            self.assertEqual(launch.fetch_public_key(key_set_url), self.jwt_canvas_keys)
+        # storage of the launch isn't changed during the fetch (it could be done concurrently)
+        self.assertEqual(session_ids, ["session-1"])
+
+    def test_res_link_launch_batched_data_storage(self):
+        get_many, set_many = Cache.get_many, Cache.set_many
+        with patch.object(
+            Cache, "get_many", autospec=True, side_effect=get_many
+        ) as cache_get_many, patch.object(
+            Cache, "set_many", autospec=True, side_effect=set_many
+        ) as cache_set_many:
+            self._launch_success(use_cache=True)
+        # state and nonce are checked with one lookup
+        self.assertEqual(cache_get_many.call_count, 1)
+        # login: nonce and state params, launch: launch data and valid state
+        self.assertEqual(cache_set_many.call_count, 2)
+
+        # overridden hooks aren't skipped
+        launch_cls = self._get_launch_cls()
+        with patch.object(
+            launch_cls,
+            "validate_nonce",
+            autospec=True,
+            side_effect=launch_cls.validate_nonce,
+        ) as validate_nonce, patch.object(
+            Cache, "get_many", autospec=True, side_effect=get_many
+        ) as cache_get_many:
+            self._launch_success(use_cache=True)
+        validate_nonce.assert_called_once()
+        cache_get_many.assert_not_called()
+
+        storage = FakeCacheDataStorage()
+        storage.set_many({"a": 1, "b": 2})
+        self.assertEqual(storage.get_many(["a", "b", "c"]), {"a": 1, "b": 2})
+        storage.delete_many(["a", "c"])
+        self.assertEqual(storage.get_many(["a", "b"]), {"b": 2})
+
 
 class TestDjangoResourceLink(DjangoMixin, ResourceLinkBase):
     pass
@@ -1,5 +1,26 @@
+import copy
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from pylti1p3.exception import LtiException
+from pylti1p3.jwks import JwksPublisher
+from pylti1p3.registration import Registration
+from pylti1p3.tool_config import (
+    ReloadingToolConfJsonFile,
+    ToolConfDict,
+    ToolConfSqlite,
+)
 from .base import TestServicesBase
-from .tool_config import get_test_tool_conf
+from .django_db import setup_django_db
+from .tool_config import (
+    PRIVATE_KEY,
+    PUBLIC_KEY,
+    TOOL_CONFIG_ONE_ISSUES_MANY_CLIENTS,
+    get_test_tool_conf,
+)
 
 
 class TestToolConf(TestServicesBase):
@@ -33,3 +54,336 @@ class TestToolConf(TestServicesBase):
             "https://canvas.instructure.com", client_id="10000000000004"
         )
         self.assertEqual(jwks, expected_jwks)
+
+    def test_find_registration_and_deployment(self):
+        iss = "https://canvas.instructure.com"
+        tc = get_test_tool_conf(tool_conf_extended=True)
+
+        self.assertEqual(tc.find_registration(iss).get_client_id(), "10000000000004")
+        self.assertEqual(
+            tc.find_registration_by_params(iss, "10000000000000").get_client_id(),
+            "10000000000000",
+        )
+        with self.assertRaises(Exception):
+            tc.find_registration_by_params(iss, "unknown-client-id")
+
+        deployment = tc.find_deployment_by_params(iss, "6:xxxx", "10000000000000")
+        self.assertEqual(deployment.get_deployment_id(), "6:xxxx")
+        self.assertIsNone(tc.find_deployment_by_params(iss, "6:xxxx", "10000000000004"))
+        self.assertIsNotNone(
+            tc.find_deployment(iss, "6:8865aa05b4b79b64a91a86042e43af5ea8ae79eb")
+        )
+
+    def test_deployment_ids_index(self):
+        iss = "https://canvas.instructure.com"
+        item = {
+            "client_id": "10000000000004",
+            "auth_login_url": "http://canvas.docker/api/lti/authorize_redirect",
+            "auth_token_url": "http://canvas.docker/login/oauth2/token",
+            "key_set_url": "http://canvas.docker/api/lti/security/jwks",
+            "deployment_ids": ["1:first"],
+        }
+        default_item = dict(copy.deepcopy(item), deployment_ids=["2:default"])
+        default_item["default"] = True
+        tc = ToolConfDict({iss: [item, default_item]})
+        tc.set_private_key(iss, PRIVATE_KEY, client_id="10000000000004")
+
+        # the first item wins the client_id lookup, the default one is used without client_id
+        self.assertIsNotNone(
+            tc.find_deployment_by_params(iss, "1:first", "10000000000004")
+        )
+        self.assertIsNone(
+            tc.find_deployment_by_params(iss, "2:default", "10000000000004")
+        )
+        self.assertIsNotNone(tc.find_deployment(iss, "2:default"))
+        self.assertIsNone(tc.find_deployment(iss, "1:first"))
+
+    def test_registrations_cache(self):
+        iss = "https://canvas.instructure.com"
+        tc = get_test_tool_conf(tool_conf_extended=True)
+
+        reg = tc.find_registration_by_params(iss, "10000000000000")
+        self.assertIs(tc.find_registration_by_params(iss, "10000000000000"), reg)
+        self.assertIsNot(tc.find_registration(iss), reg)
+        self.assertEqual(reg.get_kid(), "NtQYzsKs_TWLQ0p3bLmfM7fOwY0nEBVVH3z3Q-zJ06Y")
+
+        reg.set_key_set({"keys": []})
+        self.assertEqual(
+            tc.find_registration_by_params(iss, "10000000000000").get_key_set(),
+            {"keys": []},
+        )
+
+        # config was changed
+        tc.set_public_key(iss, reg.get_tool_public_key(), client_id="10000000000000")
+        new_reg = tc.find_registration_by_params(iss, "10000000000000")
+        self.assertIsNot(new_reg, reg)
+
+        tc.set_registrations_cache_size(0)
+        self.assertIsNot(tc.find_registration_by_params(iss, "10000000000000"), new_reg)
+
+        # unrelated tool configs don't block each other
+        other_tc = get_test_tool_conf(tool_conf_extended=True)
+        # pylint: disable=protected-access
+        self.assertIsNot(
+            tc._get_registrations_cache_lock(), other_tc._get_registrations_cache_lock()
+        )
+        self.assertIs(
+            tc._get_registrations_cache_lock(), tc._get_registrations_cache_lock()
+        )
+
+    def test_jwks_publisher(self):
+        iss = "https://canvas.instructure.com"
+        tc = get_test_tool_conf()
+        publisher = JwksPublisher(tc, max_age=600)
+
+        with patch.object(
+            Registration, "get_jwk", wraps=Registration.get_jwk
+        ) as get_jwk:
+            res = publisher.get_response()
+            self.assertEqual(res["status"], 200)
+            self.assertEqual(res["headers"]["Cache-Control"], "public, max-age=600")
+            self.assertEqual(json.loads(res["body"].decode("utf-8")), tc.get_jwks())
+            etag = res["headers"]["ETag"]
+
+            res = publisher.get_response(if_none_match=etag)
+            self.assertEqual(res["status"], 304)
+            self.assertEqual(res["body"], b"")
+            res = publisher.get_response(if_none_match='"other", W/' + etag)
+            self.assertEqual(res["status"], 304)
+            # tc.get_jwks() above + the only build by the publisher
+            self.assertEqual(get_jwk.call_count, 2)
+
+        # keys were changed
+        tc.set_public_key(iss, tc.find_registration(iss).get_tool_public_key() + "\n")
+        res = publisher.get_response(if_none_match=etag)
+        self.assertEqual(res["status"], 200)
+
+    def test_reloading_json_file(self):
+        iss = "https://canvas.instructure.com"
+        config = json.loads(json.dumps(TOOL_CONFIG_ONE_ISSUES_MANY_CLIENTS))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config_file = os.path.join(tmp_dir, "config.json")
+            with open(os.path.join(tmp_dir, "private.key"), "w", encoding="utf-8") as f:
+                f.write(PRIVATE_KEY)
+            with open(config_file, "w", encoding="utf-8") as f:
+                json.dump(config, f)
+
+            tc = ReloadingToolConfJsonFile(config_file, check_interval=0)
+            reg1 = tc.find_registration_by_params(iss, "10000000000000")
+            reg2 = tc.find_registration_by_params(iss, "10000000000004")
+            self.assertIsNone(
+                tc.find_deployment_by_params(iss, "new-id", "10000000000000")
+            )
+            # files weren't changed, so the reload isn't started
+            with patch("pylti1p3.tool_config.json_file.threading.Thread") as thread_cls:
+                tc.find_registration_by_params(iss, "10000000000000")
+            thread_cls.assert_not_called()
+
+            config[iss][0]["deployment_ids"].append("new-id")
+            config[iss][1][
+                "auth_token_url"
+            ] = "http://canvas.docker/login/oauth2/token2"
+            with open(config_file, "w", encoding="utf-8") as f:
+                json.dump(config, f)
+
+            # config is reloaded in the background thread
+            deadline = time.monotonic() + 5
+            while tc.find_deployment_by_params(iss, "new-id", "10000000000000") is None:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+            self.assertIsNone(tc.get_reload_error())
+
+            # registration of the first client wasn't changed, so it is kept with the fetched data
+            self.assertIs(tc.find_registration_by_params(iss, "10000000000000"), reg1)
+            new_reg2 = tc.find_registration_by_params(iss, "10000000000004")
+            self.assertIsNot(new_reg2, reg2)
+            self.assertEqual(
+                new_reg2.get_auth_token_url(),
+                "http://canvas.docker/login/oauth2/token2",
+            )
+
+    def test_sqlite_tool_conf(self):
+        iss = "https://canvas.instructure.com"
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tc = ToolConfSqlite(os.path.join(tmp_dir, "tool_conf.sqlite3"))
+            for iss_conf in TOOL_CONFIG_ONE_ISSUES_MANY_CLIENTS[iss]:
+                tc.set_iss_config(iss, iss_conf, PRIVATE_KEY, PUBLIC_KEY)
+
+            reg = tc.find_registration_by_params(iss, "10000000000000")
+            self.assertEqual(reg.get_client_id(), "10000000000000")
+            self.assertEqual(reg.get_tool_private_key(), PRIVATE_KEY)
+            self.assertIs(tc.find_registration_by_params(iss, "10000000000000"), reg)
+            # default client
+            self.assertEqual(
+                tc.find_registration_by_params(iss, None).get_client_id(),
+                "10000000000004",
+            )
+            with self.assertRaises(LtiException):
+                tc.find_registration_by_params(iss, "unknown-client-id")
+
+            self.assertIsNotNone(
+                tc.find_deployment_by_params(iss, "6:xxxx", "10000000000000")
+            )
+            self.assertIsNone(
+                tc.find_deployment_by_params(iss, "6:xxxx", "10000000000004")
+            )
+            self.assertEqual(len(tc.get_jwks()["keys"]), 1)
+
+            tc.delete_iss_config(iss, "10000000000000")
+            with self.assertRaises(LtiException):
+                tc.find_registration_by_params(iss, "10000000000000")
+
+    def test_negative_lookup_cache(self):
+        iss = "https://canvas.instructure.com"
+        tc = get_test_tool_conf(tool_conf_extended=True)
+
+        self.assertTrue(tc.check_registration_is_unknown("https://unknown.example"))
+        self.assertFalse(tc.check_registration_is_unknown(iss, "unknown-client-id"))
+        with self.assertRaises(Exception):
+            tc.find_registration_by_params(iss, "unknown-client-id")
+        self.assertTrue(tc.check_registration_is_unknown(iss, "unknown-client-id"))
+        self.assertFalse(tc.check_registration_is_unknown(iss, "10000000000000"))
+
+        # config was changed
+        tc.set_public_key(iss, PUBLIC_KEY, client_id="10000000000000")
+        self.assertFalse(tc.check_registration_is_unknown(iss, "unknown-client-id"))
+
+        tc.set_negative_lookup_cache(ttl=0)
+        with self.assertRaises(Exception):
+            tc.find_registration_by_params(iss, "unknown-client-id")
+        self.assertFalse(tc.check_registration_is_unknown(iss, "unknown-client-id"))
+
+
+class TestDjangoCachedDbToolConf(unittest.TestCase):
+    # pylint: disable=import-outside-toplevel
+
+    iss = "https://canvas.instructure.com"
+
+    @classmethod
+    def setUpClass(cls):
+        setup_django_db()
+
+    def setUp(self):
+        from pylti1p3.contrib.django import DjangoCachedDbToolConf
+        from pylti1p3.contrib.django.lti1p3_tool_config.models import (
+            LtiTool,
+            LtiToolKey,
+        )
+
+        # pylint: disable=no-member
+        LtiTool.objects.all().delete()
+        LtiToolKey.objects.all().delete()
+        tool_key = LtiToolKey.objects.create(
+            name="test", private_key=PRIVATE_KEY, public_key=PUBLIC_KEY
+        )
+        self.lti_tool = LtiTool.objects.create(
+            title="test",
+            issuer=self.iss,
+            client_id="10000000000004",
+            use_by_default=True,
+            auth_login_url="http://canvas.docker/api/lti/authorize_redirect",
+            auth_token_url="http://canvas.docker/login/oauth2/token",
+            key_set_url="http://canvas.docker/api/lti/security/jwks",
+            tool_key=tool_key,
+            deployment_ids='["deployment-1"]',
+        )
+        self.tool_key = tool_key
+        self.tool_conf_cls = DjangoCachedDbToolConf
+
+    def _add_tool(self, client_id):
+        from pylti1p3.contrib.django.lti1p3_tool_config.models import LtiTool
+
+        self.lti_tool.pk = None
+        self.lti_tool.client_id = client_id
+        self.lti_tool.use_by_default = False
+        LtiTool.save(self.lti_tool)
+
+    def test_snapshot(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        tc = self.tool_conf_cls()
+        reg = tc.find_registration_by_params(self.iss, "10000000000004")
+        self.assertEqual(reg.get_client_id(), "10000000000004")
+        self.assertIsNotNone(
+            tc.find_deployment_by_params(self.iss, "deployment-1", None)
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            # new instance (i.e. next request) uses the snapshot of the process
+            tc2 = self.tool_conf_cls()
+            self.assertIn(self.iss, tc2.get_known_issuers())
+            self.assertIsNone(
+                tc2.find_deployment_by_params(self.iss, "deployment-2", None)
+            )
+            self.assertIs(
+                tc2.find_registration_by_params(
+                    self.iss, "10000000000004"
+                ).get_tool_private_key(),
+                reg.get_tool_private_key(),
+            )
+        self.assertEqual(len(queries), 0)
+
+    def test_signal_invalidation(self):
+        tc = self.tool_conf_cls()
+        tc.version_check_interval = 0
+        reg = tc.find_registration_by_params(self.iss, "10000000000004")
+        with self.assertRaises(LtiException):
+            tc.find_registration_by_params(self.iss, "10000000000005")
+        self.assertTrue(tc.check_registration_is_unknown(self.iss, "10000000000005"))
+
+        # long-lived instance sees the changes after the post_save signal
+        self._add_tool("10000000000005")
+        self.assertFalse(tc.check_registration_is_unknown(self.iss, "10000000000005"))
+        self.assertEqual(
+            tc.find_registration_by_params(self.iss, "10000000000005").get_client_id(),
+            "10000000000005",
+        )
+        self.tool_key.public_key = None
+        self.tool_key.save()
+        reg2 = tc.find_registration_by_params(self.iss, "10000000000004")
+        self.assertIsNot(reg2, reg)
+        self.assertIsNone(reg2.get_tool_public_key())
+
+        self.lti_tool.delete()
+        with self.assertRaises(LtiException):
+            tc.find_registration_by_params(self.iss, "10000000000005")
+
+    def test_version_key(self):
+        from django.core.cache import caches
+        from pylti1p3.contrib.django.lti1p3_tool_config.models import LtiTool
+
+        tc = self.tool_conf_cls()
+        tc.version_check_interval = 60
+        tc.find_registration_by_params(self.iss, "10000000000004")
+
+        # changes made by the other process without the signals
+        # pylint: disable=no-member
+        LtiTool.objects.filter(pk=self.lti_tool.pk).update(
+            auth_token_url="http://canvas.docker/login/oauth2/token2"
+        )
+        caches["default"].set(tc.version_cache_key, "new-version", None)
+        self.assertEqual(
+            tc.find_registration_by_params(
+                self.iss, "10000000000004"
+            ).get_auth_token_url(),
+            "http://canvas.docker/login/oauth2/token",
+        )
+        self.assertEqual(
+            self.tool_conf_cls()
+            .find_registration_by_params(self.iss, "10000000000004")
+            .get_auth_token_url(),
+            "http://canvas.docker/login/oauth2/token2",
+        )
+
+        # long-lived instance rechecks the version after the interval
+        with patch("time.monotonic", return_value=time.monotonic() + 60):
+            self.assertEqual(
+                tc.find_registration_by_params(
+                    self.iss, "10000000000004"
+                ).get_auth_token_url(),
+                "http://canvas.docker/login/oauth2/token2",
+            )
+        self.assertEqual(tc.get_jwks_version(), "new-version")
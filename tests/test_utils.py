@@ -1,5 +1,17 @@
 import unittest
-from pylti1p3.utils import add_param_to_url
+import requests
+from pylti1p3.json_codec import (
+    get_json_codec,
+    json_dumps,
+    json_loads,
+    json_loads_response,
+    set_json_codec,
+)
+from pylti1p3.launch_data_storage.base import LaunchDataStorage
+from pylti1p3.session import SessionService
+from pylti1p3.utils import add_param_to_url, is_overridden
+from .cache import FakeCacheDataStorage
+from .request import FakeRequest
 
 
 class TestUtils(unittest.TestCase):
@@ -28,3 +40,74 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(
             res, "https://lms.example.com/class/2923/groups/sets?user_id=123"
         )
+
+    def test_json_codec(self):
+        data = {"label": "Quiz / é", "scoreMaximum": 10, "tags": [None, True]}
+        try:
+            for codec_name in ("json", "auto"):
+                codec = set_json_codec(codec_name)
+                self.assertIs(get_json_codec(), codec)
+                self.assertEqual(json_loads(json_dumps(data)), data)
+                self.assertEqual(json_loads(json_dumps(data).encode("utf-8")), data)
+            with self.assertRaises(ValueError):
+                set_json_codec("unknown")
+        finally:
+            set_json_codec("json")
+
+    def test_json_loads_response(self):
+        data = {"label": "Quiz / é"}
+        for charset, content in [
+            (None, json_dumps(data).encode("utf-8")),
+            ("utf-8", json_dumps(data).encode("utf-8")),
+            ("iso-8859-1", '{"label": "Quiz / \u00e9"}'.encode("iso-8859-1")),
+        ]:
+            response = requests.Response()
+            response.headers["Content-Type"] = "application/json" + (
+                f"; charset={charset}" if charset else ""
+            )
+            response.encoding = charset
+            # pylint: disable=protected-access
+            response._content = content
+            self.assertEqual(json_loads_response(response), data)
+
+    def test_is_overridden(self):
+        calls = []
+
+        class CustomSessionService(SessionService):
+            def check_nonce(self, nonce):
+                calls.append("check_nonce")
+                return super().check_nonce(nonce)
+
+            def set_state_valid(self, state, id_token_hash):
+                calls.append("set_state_valid")
+                return super().set_state_valid(state, id_token_hash)
+
+        self.assertFalse(
+            is_overridden(SessionService(FakeRequest()), SessionService, "check_nonce")
+        )
+        session_service = CustomSessionService(FakeRequest())
+        self.assertTrue(
+            is_overridden(session_service, SessionService, "check_nonce", "save_nonce")
+        )
+
+        # batched methods call the overridden hooks
+        session_service.set_data_storage(FakeCacheDataStorage())
+        session_service.save_nonce_and_state_params("nonce-1", "state-1")
+        session_service.save_launch_data_and_state_valid(
+            "launch-1", {"nonce": "nonce-1"}, "state-1", "hash-1"
+        )
+        self.assertEqual(
+            session_service.check_state_and_nonce("state-1", "hash-1", "nonce-1"),
+            (True, True),
+        )
+        self.assertEqual(
+            session_service.get_launch_data("launch-1"), {"nonce": "nonce-1"}
+        )
+        self.assertEqual(calls, ["set_state_valid", "check_nonce"])
+
+        storage = FakeCacheDataStorage()
+        storage.set_value("key", "value")
+        # default implementation
+        LaunchDataStorage.delete_value(storage, "key")
+        self.assertFalse(storage.check_value("key"))
+        self.assertEqual(storage.get_many(["key"]), {})